@@ -1,96 +1,465 @@
 import os
 import json
 import time
+import asyncio
+import threading
 import jwt
 import datetime
-import bcrypt
-from flask import Flask, request, jsonify, g, send_file
+from flask import Flask, Blueprint, current_app, request, jsonify, g, send_file, Response, stream_with_context
 from flask_cors import CORS
-from datetime import datetime, timedelta
-from pypdf import PdfReader
-from docx import Document
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId
 from functools import wraps
-import google.generativeai as genai
+from llm_cache import build_llm_cache, make_cache_key
+from gemini_client import build_model_registry, classify_error, ERROR_THROTTLED, ERROR_CLIENT
+from streaming import sse_event, IncrementalJSONFields, IncrementalJSONString
+from job_queue import build_job_queue, QueueFullError, TERMINAL_STATES
+from rate_limiter import build_governor, estimate_tokens, RateLimitExceeded, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from ats_scorer import quick_score
+from document_extractor import ExtractionLimits, DocumentTooLarge, PDF_MIME_TYPES, DOCX_MIME_TYPES
+from parse_pool import build_parse_pool, ParseTimeout, ParseCrashed, ParsePoolBusy
+from document_cache import build_document_cache, hash_stream
+from db_indexes import ensure_indexes
+from auth_cache import UserStateCache, USER_DELETED
+from password_hashing import build_password_hasher, HasherBusy
+from blob_store import TextBlobStore, analysis_texts
+from token_budget import (
+    build_token_accountant, fit_documents, fit_job_description, normalize_whitespace, response_token_counts
+)
+from observability import (
+    registry, log_event, timed_stage, record_stage, server_timing, new_request_id, MongoCommandTimer,
+    current_route, current_request_id, current_trace, ContextThreadPoolExecutor,
+    REQUEST_SECONDS, GEMINI_ATTEMPT_SECONDS, LLM_CACHE_LOOKUPS, GEMINI_RETRIES, GEMINI_FAILURES, GEMINI_HEDGES,
+    LLM_OUTPUT_REPAIRS
+)
+from resilience import (
+    current_deadline, backoff_delay, run_hedged, run_hedged_async, build_circuit_breaker, build_hedge_policy,
+    GeminiUnavailable, GeminiDeadlineExceeded
+)
+from schema_validation import SchemaValidator, SchemaViolation
+from batch_analysis import pack_batches, run_bounded, rank_results, MODE_JOB_DESCRIPTIONS, MODE_RESUMES
+from jd_index import build_jd_index
+from lazy import LazyResource
+from resume_sections import split_sections, normalize_section, fingerprint, merge_section_results, PREAMBLE_SECTION
 
 load_dotenv()
 
 API_KEY = os.environ.get("GEMINI_API_KEY")
-genai.configure(api_key=API_KEY, transport='rest')
+# Shares models + a pooled HTTP session across requests; the SDK is imported on first use
+model_registry = build_model_registry(API_KEY)
 MONGO_URI = os.environ.get("MONGO_URI")
 JWT_SECRET = os.environ.get("JWT_SECRET")
-
-app = Flask(__name__)
-CORS(app)
+# Return X-Request-ID and Server-Timing stage breakdowns on every response (clients can also ask per request with "X-Trace: 1")
+TRACE_ALL_REQUESTS = os.environ.get("TRACE_ALL_REQUESTS", "0") == "1"
+# Feed the local keyword pre-scan into the analysis prompt as a reference point
+ANALYSIS_LOCAL_PREFILTER = os.environ.get("ANALYSIS_LOCAL_PREFILTER", "1") == "1"
+# Share per-JD derived work (requirement extraction) across near-duplicate postings (jd_index.py)
+JD_DEDUP = os.environ.get("JD_DEDUP", "0") == "1"
+
+# Routes live on this blueprint; create_app() (bottom of the file) builds the Flask app around it.
+api = Blueprint('api', __name__)
+
+extraction_limits = ExtractionLimits()
+# CPU-bound PDF/DOCX parsing runs in separate processes with hard per-file timeouts
+parse_pool = build_parse_pool()
+
+# Everything below that opens connections, files or threads is a LazyResource: it is built on
+# first use inside the worker process (or by warm_up() from gunicorn's post_fork hook), so
+# importing this module is cheap and forked workers never inherit a live MongoClient.
+
+def connect_database():
+    client = MongoClient(MONGO_URI, event_listeners=[MongoCommandTimer()])
+    database = client.get_database("hireready") # Default DB name
+    # Unique user indexes + the history index; safe to re-run on every boot
+    ensure_indexes(database)
+    return database
 
 # Database Setup
-client = MongoClient(MONGO_URI)
-db = client.get_database("hireready") # Default DB name
-users_collection = db.users
-analyses_collection = db.resume_analyses
+db = LazyResource(connect_database)
+users_collection = LazyResource(lambda: db.users)
+analyses_collection = LazyResource(lambda: db.resume_analyses)
+# Saved analyses reference deduplicated, compressed resume/JD texts stored here
+text_blobs = TextBlobStore(LazyResource(lambda: db.text_blobs))
+
+# LLM Response Cache
+# Per-schema TTLs in seconds. Schemas left out fall back to LLM_CACHE_TTL.
+LLM_CACHE_TTLS = {
+    "ANALYSIS_SCHEMA": 3600,
+    "BATCH_ANALYSIS_SCHEMA": 3600,
+    "TEMPLATE_RECOMMENDATION_SCHEMA": 6 * 3600,
+    "SUGGESTION_SCHEMA": 1800,
+    "INITIAL_DRAFT_SCHEMA": 1800,
+    "JD_REQUIREMENTS_SCHEMA": 24 * 3600,
+    "SECTION_ANALYSIS_SCHEMA": 6 * 3600,
+    "SECTIONS_ANALYSIS_SCHEMA": 6 * 3600,
+    "INCREMENTAL_ANCHOR": 6 * 3600,
+}
+llm_cache = LazyResource(lambda: build_llm_cache(db, LLM_CACHE_TTLS))
+
+# Extracted upload text keyed by file SHA-256, so re-uploads skip parsing and
+# AI routes can take resume_hash instead of the full resume body
+document_cache = LazyResource(lambda: build_document_cache(db))
+
+# MinHash/LSH index mapping near-identical job postings to one canonical id. Prompts always use
+# the caller's own text; the id only keys derived work such as the JD requirement extraction.
+jd_index = LazyResource(lambda: build_jd_index(db))
+
+# Bounded pool for fanning out independent Gemini calls inside a single request (/full_report).
+# Tasks inherit the request's contextvars so their Gemini calls are accounted to its route.
+pipeline_executor = ContextThreadPoolExecutor(
+    max_workers=int(os.environ.get("PIPELINE_MAX_WORKERS", 4)),
+    thread_name_prefix="pipeline"
+)
+
+# Background seeding for /analyze_resume/incremental (seed_incremental_analysis) gets its own
+# small pool, so a burst of first runs can't queue ahead of /full_report's fan-out. A seed that
+# finds every slot busy is dropped; that resume's next run falls back and tries again.
+INCREMENTAL_SEED_WORKERS = int(os.environ.get("INCREMENTAL_SEED_WORKERS", 2))
+seed_executor = ContextThreadPoolExecutor(max_workers=INCREMENTAL_SEED_WORKERS, thread_name_prefix="incremental-seed")
+seed_slots = threading.BoundedSemaphore(INCREMENTAL_SEED_WORKERS)
+
+# Prompt budgets in estimated input tokens per schema. Documents are whitespace-normalized and
+# JD boilerplate is dropped everywhere; past the budget the JD is cut by section priority.
+PROMPT_TOKEN_BUDGETS = {
+    "ANALYSIS_SCHEMA": 12000,
+    "SUGGESTION_SCHEMA": 10000,
+    "TEMPLATE_RECOMMENDATION_SCHEMA": 6000,
+    "INITIAL_DRAFT_SCHEMA": 12000,
+    "JD_REQUIREMENTS_SCHEMA": 6000,
+}
+# Per-call and per-route input/output token counts (see /token_usage/stats)
+token_accountant = build_token_accountant()
+
+# /analyze_batch: items packed per Gemini call, and packed calls in flight per request
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 50))
+BATCH_PACK_MAX_ITEMS = int(os.environ.get("BATCH_PACK_MAX_ITEMS", 4))
+BATCH_PACK_MAX_CHARS = int(os.environ.get("BATCH_PACK_MAX_CHARS", 40000))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", 3))
+
+# Gemini rate limiting: shared RPM/TPM buckets + in-flight cap.
+# Long draft generation yields to interactive analysis when capacity is tight.
+gemini_governor = LazyResource(build_governor)
+SCHEMA_PRIORITIES = {
+    "INITIAL_DRAFT_SCHEMA": PRIORITY_BACKGROUND,
+    # Prefetch for the next incremental analysis; nobody is waiting on it.
+    "SECTIONS_ANALYSIS_SCHEMA": PRIORITY_BACKGROUND,
+}
+
+# Gemini deadlines: each request gets one budget (seconds) for all of its Gemini work, by route,
+# and every attempt is capped on its own so a single hung call can't spend the whole budget.
+GEMINI_DEADLINE = float(os.environ.get("GEMINI_DEADLINE", 40))
+ROUTE_DEADLINES = {
+    "full_report": 90,
+    "analyze_resume_incremental": 60,
+    "analyze_batch": 120,
+    "analyze_batch_stream": 120,
+    "generate_initial_draft": 60,
+    "generate_initial_draft_stream": 60,
+}
+GEMINI_ATTEMPT_TIMEOUT = float(os.environ.get("GEMINI_ATTEMPT_TIMEOUT", 20))
+SCHEMA_ATTEMPT_TIMEOUTS = {
+    "INITIAL_DRAFT_SCHEMA": 45,
+    "BATCH_ANALYSIS_SCHEMA": 45,
+}
+# Don't start an attempt (or a backoff) that couldn't finish before the deadline.
+GEMINI_MIN_ATTEMPT_SECONDS = 2
+GEMINI_MAX_ATTEMPTS = int(os.environ.get("GEMINI_MAX_ATTEMPTS", 3))
+GEMINI_BACKOFF_BASE = float(os.environ.get("GEMINI_BACKOFF_BASE", 0.5))
+GEMINI_BACKOFF_CAP = float(os.environ.get("GEMINI_BACKOFF_CAP", 8))
+# Fails fast with 503 while Gemini is mostly failing; see /gemini/stats
+circuit_breaker = build_circuit_breaker()
+# Optional hedged requests (GEMINI_HEDGE=1); the sync path races attempts on this pool
+hedge_policy = build_hedge_policy()
+hedge_executor = ContextThreadPoolExecutor(
+    max_workers=int(os.environ.get("GEMINI_HEDGE_WORKERS", 32)),
+    thread_name_prefix="gemini-hedge"
+)
+
+def start_deadline(route):
+    current_deadline.set(time.monotonic() + ROUTE_DEADLINES.get(route, GEMINI_DEADLINE))
+
+# Background AI jobs (opt-in per request with ?async=1 or "Prefer: respond-async")
+job_queue = LazyResource(lambda: build_job_queue(db))
 
 # JWT Helper
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(" ")[1]
-        
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        
-        try:
-            data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+JWT_LIFETIME = timedelta(days=7)
+
+def load_token_version(user_id):
+    user = users_collection.find_one({'_id': ObjectId(user_id)}, {'token_version': 1})
+    if not user:
+        return USER_DELETED
+    return user.get('token_version', 0)
+
+# bcrypt runs on a small dedicated pool so sign-in bursts can't starve the request threads
+password_hasher = build_password_hasher()
+
+# Lets token_required trust signed claims and only touch Mongo once per USER_STATE_TTL per user
+user_state_cache = UserStateCache(load_token_version, ttl=int(os.environ.get("USER_STATE_TTL", 60)))
+
+def issue_token(user_id, username, token_version=0):
+    return jwt.encode({
+        'user_id': str(user_id),
+        'username': username,
+        'tv': token_version,
+        'exp': datetime.utcnow() + JWT_LIFETIME
+    }, JWT_SECRET, algorithm="HS256")
+
+def authenticate_request():
+    """
+    Checks the request's bearer token and sets g.user. Returns None on success,
+    or the 401 response to send.
+    """
+    token = None
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        if auth_header.startswith('Bearer '):
+            token = auth_header.split(" ")[1]
+
+    if not token:
+        return jsonify({'error': 'Token is missing!'}), 401
+
+    try:
+        data = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        if 'username' in data and 'tv' in data:
+            # Stateless path: identity comes from the signed claims; only the
+            # revocation check may hit Mongo, and that is cached.
+            if user_state_cache.is_revoked(data['user_id'], data['tv']):
+                return jsonify({'error': 'Token has been revoked!'}), 401
+            g.user = {'user_id': data['user_id'], 'username': data['username']}
+        else:
+            # Tokens issued before claims carried the username.
             current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
             if not current_user:
                 return jsonify({'error': 'User not found!'}), 401
             # Add user info to global context
             g.user = {'user_id': str(current_user['_id']), 'username': current_user['username']}
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token has expired!'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token!'}), 401
-        except Exception as e:
-            return jsonify({'error': str(e)}), 401
-            
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Token has expired!'}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'error': 'Invalid token!'}), 401
+    except Exception as e:
+        return jsonify({'error': str(e)}), 401
+    return None
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        error = authenticate_request()
+        if error:
+            return error
         return f(*args, **kwargs)
     return decorated
 
+def wants_async():
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+# Async Job Helper
+def async_job_capable(f):
+    """
+    Lets an AI route run as a background job. The view is replayed on the job pool
+    with the same JSON body, and its response is stored as the job result.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not wants_async():
+            return f(*args, **kwargs)
+
+        # A signed-in caller owns the job: only they can read it back from /jobs/<id>.
+        owner = None
+        if 'Authorization' in request.headers:
+            error = authenticate_request()
+            if error:
+                return error
+            owner = g.user['user_id']
+
+        body = request.get_json(silent=True) or {}
+        path = request.path
+        flask_app = current_app._get_current_object()
+
+        def run():
+            current_route.set(f.__name__)
+            start_deadline(f.__name__)
+            with flask_app.test_request_context(path, method='POST', json=body):
+                response = flask_app.make_response(f(*args, **kwargs))
+                return {"status_code": response.status_code, "body": response.get_json()}
+
+        try:
+            job_id = job_queue.submit(f.__name__, run, owner=owner)
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 503
+
+        return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+    return decorated
+
+def resolve_resume_text(data):
+    """Resume text from the request body, or from document_cache when only resume_hash is sent."""
+    resume_text = data.get('resume', '')
+    if not resume_text and data.get('resume_hash'):
+        resume_text = document_cache.get_text(data['resume_hash']) or ''
+    return resume_text
+
+def canonical_jd_id(job_description):
+    """Id shared by a posting's near-duplicates (see jd_index.py), or None when JD_DEDUP is off."""
+    if not JD_DEDUP or not job_description:
+        return None
+    with timed_stage("jd_index"):
+        return jd_index.canonicalize(job_description)
+
+def rate_limited_response(e):
+    response = jsonify({"error": str(e), "retry_after": e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+def hasher_busy_response(e):
+    response = jsonify({"error": str(e)})
+    response.headers['Retry-After'] = '2'
+    return response, 503
+
 def get_user_id_from_context():
     return g.user.get('user_id') if g.user else None
-def extract_text_from_pdf(file_path):
-    text = ""
-    try:
-        reader = PdfReader(file_path)
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error reading PDF: {e}")
-        return None
-    return text.strip()
 
-def extract_text_from_docx(file_path):
-    text = ""
-    try:
-        document = Document(file_path)
-        for paragraph in document.paragraphs:
-            text += paragraph.text + "\n"
-    except Exception as e:
-        print(f"Error reading DOCX: {e}")
-        return None
-    return text.strip()
+@api.before_app_request
+def start_request_context():
+    current_route.set((request.endpoint or "unknown").rsplit('.', 1)[-1])
+    start_deadline(current_route.get())
+    current_request_id.set(request.headers.get('X-Request-ID') or new_request_id())
+    tracing = TRACE_ALL_REQUESTS or request.headers.get('X-Trace') == '1'
+    current_trace.set([] if tracing else None)
+    g.request_started = time.perf_counter()
+
+@api.after_app_request
+def finish_request_context(response):
+    started = g.get('request_started')
+    if started is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=current_route.get(), method=request.method, status=response.status_code
+        )
+    trace = current_trace.get()
+    if trace is not None:
+        response.headers['X-Request-ID'] = current_request_id.get()
+        if trace:
+            response.headers['Server-Timing'] = server_timing(trace)
+    return response
+
+def fit_prompt_documents(resume_text, job_description, schema_name):
+    """Resume and JD normalized and trimmed to the schema's prompt budget."""
+    resume_text, job_description, trimmed = fit_documents(
+        resume_text, job_description, PROMPT_TOKEN_BUDGETS.get(schema_name)
+    )
+    if trimmed:
+        token_accountant.record_trim()
+    return resume_text, job_description
 
+@api.app_errorhandler(413)
+def payload_too_large(e):
+    return jsonify({"error": f"File is larger than {extraction_limits.max_bytes // (1024 * 1024)} MB."}), 413
 
-@app.route("/")
+@api.route("/")
 def health():
     return {"status": "HireReady backend is live 🚀"}
 
-@app.route('/upload_file', methods=['POST'])
+@api.route("/metrics")
+def metrics():
+    """Prometheus text exposition for this worker process."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route("/llm_cache/stats")
+def llm_cache_stats():
+    return jsonify(llm_cache.stats()), 200
+
+@api.route("/gemini/stats")
+def gemini_stats():
+    return jsonify({
+        "circuit_breaker": circuit_breaker.stats(),
+        "hedging": hedge_policy.stats(),
+        "models": model_registry.stats()
+    }), 200
+
+@api.route("/token_usage/stats")
+def token_usage_stats():
+    return jsonify(token_accountant.stats()), 200
+
+def load_owned_job(job_id):
+    """
+    (job, None) when the caller may read the job, else (None, error response).
+    Jobs submitted with a bearer token need the same user's token; anonymous jobs
+    are reachable through their unguessable id, like the route that created them.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return None, (jsonify({"error": "Job not found or expired."}), 404)
+    owner = job.pop('owner', None)
+    if owner:
+        error = authenticate_request()
+        if error:
+            return None, error
+        if g.user['user_id'] != owner:
+            return None, (jsonify({"error": "Job not found or expired."}), 404)
+    return job, None
+
+@api.route("/jobs/<job_id>")
+def get_job(job_id):
+    job, error = load_owned_job(job_id)
+    if error:
+        return error
+    return jsonify(job), 200
+
+@api.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """
+    SSE alternative to polling /jobs/<id>: emits a 'status' event on every state change.
+    Each connection lasts at most JOB_EVENTS_WINDOW seconds so it can't pin a sync worker;
+    EventSource then reconnects with Last-Event-ID and only sees changes it hasn't had.
+    """
+    job, error = load_owned_job(job_id)
+    if error:
+        return error
+    window = float(os.environ.get("JOB_EVENTS_WINDOW", 15))
+    last_status = request.headers.get('Last-Event-ID')
+
+    def events():
+        nonlocal job, last_status
+        yield "retry: 1000\n\n"
+        deadline = time.time() + window
+        while True:
+            # A terminal status is always sent, so a client that reconnects after it can stop.
+            if job['status'] != last_status or job['status'] in TERMINAL_STATES:
+                last_status = job['status']
+                yield sse_event("status", job, event_id=last_status)
+            if job['status'] in TERMINAL_STATES or time.time() >= deadline:
+                return
+            time.sleep(0.5)
+            job = job_queue.get(job_id)
+            if not job:
+                yield sse_event("error", {"error": "Job not found or expired."})
+                return
+            job.pop('owner', None)
+
+    return sse_response(events())
+
+@api.route("/jd_index/stats")
+def jd_index_stats():
+    return jsonify(jd_index.stats()), 200
+
+@api.route("/document_cache/stats")
+def document_cache_stats():
+    return jsonify(document_cache.stats()), 200
+
+@api.route("/password_hasher/stats")
+def password_hasher_stats():
+    return jsonify(password_hasher.stats()), 200
+
+@api.route("/parse_pool/stats")
+def parse_pool_stats():
+    return jsonify(parse_pool.stats()), 200
+
+@api.route('/upload_file', methods=['POST'])
 def upload_file():
     if 'file' not in request.files:
         return jsonify({"error": "No file part in the request."}), 400
@@ -99,31 +468,40 @@ def upload_file():
     if file.filename == '':
         return jsonify({"error": "No selected file."}), 400
 
-    filename = file.filename
-    temp_path = os.path.join('/tmp', filename) 
-    file.save(temp_path)
-    
-    extracted_text = ""
     mime_type = file.mimetype
-    
+    if mime_type not in PDF_MIME_TYPES + DOCX_MIME_TYPES:
+        return jsonify({"error": "Unsupported file type. Please upload a PDF or DOCX."}), 415
+
+    resume_hash = hash_stream(file.stream)
+    cached = document_cache.get_for_upload(resume_hash)
+    if cached:
+        return jsonify({"extracted_text": cached['text'], "truncated": cached['truncated'], "resume_hash": resume_hash}), 200
+
+    # Parse straight from the upload stream. Werkzeug keeps small uploads in memory
+    # and spools bigger ones to an anonymous temp file, so nothing lands in /tmp by name.
     try:
-        if mime_type == 'application/pdf':
-            extracted_text = extract_text_from_pdf(temp_path)
-        elif mime_type in ['application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'application/msword']:
-            extracted_text = extract_text_from_docx(temp_path)
-        else:
-            return jsonify({"error": "Unsupported file type. Please upload a PDF or DOCX."}), 415
+        with timed_stage("document_parse"):
+            extracted_text, truncated = parse_pool.extract(file.stream, mime_type, extraction_limits)
+    except DocumentTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except ParsePoolBusy as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except (ParseTimeout, ParseCrashed) as e:
+        log_event("Document parse aborted", level="warning", mime_type=mime_type, error=str(e))
+        return jsonify({"error": f"{e} Try copy/pasting instead."}), 422
+    except Exception as e:
+        log_event("Error reading document", level="error", mime_type=mime_type, error=str(e))
+        extracted_text, truncated = None, False
 
-        if not extracted_text:
-            return jsonify({"error": "Could not extract text from the file. Try copy/pasting instead."}), 500
-        
-        return jsonify({"extracted_text": extracted_text}), 200
+    if not extracted_text:
+        return jsonify({"error": "Could not extract text from the file. Try copy/pasting instead."}), 500
 
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    document_cache.put(resume_hash, extracted_text, truncated)
+    return jsonify({"extracted_text": extracted_text, "truncated": truncated, "resume_hash": resume_hash}), 200
 
-@app.route('/signup', methods=['POST'])
+@api.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
     username = data.get('username')
@@ -137,21 +515,18 @@ def signup():
         return jsonify({"error": "Username or Email already exists."}), 409
     
     try:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        hashed_password = password_hasher.hash(password)
         
         user_id = users_collection.insert_one({
             "username": username,
             "email": email,
             "password_hash": hashed_password,
+            "token_version": 0,
             "created_at": datetime.utcnow()
         }).inserted_id
         
         # Generate JWT
-        token = jwt.encode({
-            'user_id': str(user_id),
-            'exp': datetime.utcnow() + timedelta(days=7)
-        }, JWT_SECRET, algorithm="HS256")
+        token = issue_token(user_id, username)
 
         return jsonify({
             "message": "User created successfully.", 
@@ -159,12 +534,17 @@ def signup():
             "username": username, 
             "token": token
         }), 201
-        
+
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup; the unique indexes caught it.
+        return jsonify({"error": "Username or Email already exists."}), 409
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
-        print(f"Error during signup: {e}")
+        log_event("Error during signup", level="error", error=str(e))
         return jsonify({"error": "Database error during signup."}), 500
 
-@app.route('/signin', methods=['POST'])
+@api.route('/signin', methods=['POST'])
 def signin():
     data = request.get_json()
     email = data.get('email')
@@ -176,12 +556,18 @@ def signin():
     try:
         user = users_collection.find_one({"email": email})
         
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+        if user and password_hasher.check(password, user['password_hash']):
+            if password_hasher.needs_rehash(user['password_hash']):
+                # Cost factor changed since this hash was made; upgrade it transparently.
+                user_id = user['_id']
+                old_hash = user['password_hash']
+                password_hasher.rehash_in_background(password, lambda new_hash: users_collection.update_one(
+                    {"_id": user_id, "password_hash": old_hash},
+                    {"$set": {"password_hash": new_hash}}
+                ))
+
             # Generate JWT
-            token = jwt.encode({
-                'user_id': str(user['_id']),
-                'exp': datetime.utcnow() + timedelta(days=7)
-            }, JWT_SECRET, algorithm="HS256")
+            token = issue_token(user['_id'], user['username'], user.get('token_version', 0))
             
             return jsonify({
                 "message": "Sign in successful.", 
@@ -191,12 +577,38 @@ def signin():
             }), 200
         else:
             return jsonify({"error": "Invalid email or password."}), 401
-            
+
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
-        print(f"Error during signin: {e}")
+        log_event("Error during signin", level="error", error=str(e))
         return jsonify({"error": "Database error during signin."}), 500
 
-@app.route('/save_analysis', methods=['POST'])
+@api.route('/signout_all', methods=['POST'])
+@token_required
+def signout_all():
+    """Revokes every token issued so far for the current user by bumping token_version."""
+    user_id = get_user_id_from_context()
+
+    try:
+        user = users_collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"token_version": 1}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not user:
+            return jsonify({"error": "User not found!"}), 404
+
+        # This worker stops accepting old tokens immediately; others within USER_STATE_TTL.
+        user_state_cache.set(user_id, user['token_version'])
+        return jsonify({"message": "Signed out of all sessions."}), 200
+
+    except Exception as e:
+        log_event("Error during sign out", level="error", error=str(e))
+        return jsonify({"error": "Database error during sign out."}), 500
+
+@api.route('/save_analysis', methods=['POST'])
 @token_required
 def save_analysis():
     data = request.get_json()
@@ -211,11 +623,14 @@ def save_analysis():
     if not analysis_result:
         return jsonify({"error": "Missing analysis results to save."}), 400
 
+    acquired = []
     try:
+        for text in (resume_text, job_description):
+            acquired.append(text_blobs.put(text))
         inserted = analyses_collection.insert_one({
             "user_id": ObjectId(user_id),
-            "resume_text": resume_text,
-            "job_description": job_description,
+            "resume_blob_id": acquired[0],
+            "job_description_blob_id": acquired[1],
             "ats_score": ats_score,
             "analysis_json": analysis_result,
             "target_job_title": target_job_title,
@@ -225,35 +640,113 @@ def save_analysis():
         return jsonify({"message": "Analysis saved successfully!", "id": str(inserted.inserted_id)}), 201
         
     except Exception as e:
-        print(f"Error during save: {e}")
+        log_event("Error during save", level="error", error=str(e))
+        # No analysis references the blobs this save took refs on; give them back.
+        for blob_id in acquired:
+            try:
+                text_blobs.release(blob_id)
+            except Exception as release_error:
+                log_event("Could not release text blob", level="warning", blob_id=blob_id, error=str(release_error))
         return jsonify({"error": "Database error during save operation."}), 500
 
-@app.route('/get_history', methods=['POST'])
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+HISTORY_LIST_PROJECTION = {"target_job_title": 1, "ats_score": 1, "created_at": 1}
+
+def encode_history_cursor(doc):
+    # created_at is stored as naive UTC; Mongo keeps millisecond precision, so ms round-trips exactly.
+    created_ms = int(doc['created_at'].replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return f"{created_ms}_{doc['_id']}"
+
+def decode_history_cursor(cursor):
+    created_ms, doc_id = cursor.split('_', 1)
+    created_ms = int(created_ms)
+    created_at = datetime.utcfromtimestamp(created_ms // 1000) + timedelta(milliseconds=created_ms % 1000)
+    return created_at, ObjectId(doc_id)
+
+@api.route('/get_history', methods=['POST'])
 @token_required
 def get_history():
+    """
+    Lightweight, newest-first list of saved analyses, paginated by a (created_at, _id) cursor.
+    Full documents are fetched one at a time from /get_analysis/<id>.
+    """
+    data = request.get_json(silent=True) or {}
     user_id = get_user_id_from_context()
-    
+
     try:
-        cursor = analyses_collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1)
+        limit = min(max(int(data.get('limit', HISTORY_PAGE_SIZE)), 1), HISTORY_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit must be a number."}), 400
+
+    query = {"user_id": ObjectId(user_id)}
+    if data.get('cursor'):
+        try:
+            created_at, doc_id = decode_history_cursor(data['cursor'])
+        except Exception:
+            return jsonify({"error": "Invalid cursor."}), 400
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}}
+        ]
+
+    try:
+        cursor = (
+            analyses_collection.find(query, HISTORY_LIST_PROJECTION)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        docs = list(cursor)
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+
         history = []
-        for doc in cursor:
+        for doc in docs:
             history.append({
                 "id": str(doc['_id']),
                 "ats_score": doc['ats_score'],
                 "target_job_title": doc.get('target_job_title', 'Untitled'),
-                "created_at": doc['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
-                "resume_text": doc.get('resume_text', ''),
-                "job_description": doc.get('job_description', ''),
-                "analysis_json": doc.get('analysis_json', {})
+                "created_at": doc['created_at'].strftime('%Y-%m-%d %H:%M:%S')
             })
-            
-        return jsonify({"history": history}), 200
+
+        next_cursor = encode_history_cursor(docs[-1]) if has_more else None
+        return jsonify({"history": history, "next_cursor": next_cursor}), 200
         
     except Exception as e:
-        print(f"Error during history retrieval: {e}")
+        log_event("Error during history retrieval", level="error", error=str(e))
         return jsonify({"error": "Database error during history retrieval."}), 500
 
-@app.route('/delete_analysis', methods=['POST'])
+@api.route('/get_analysis/<analysis_id>', methods=['GET'])
+@token_required
+def get_analysis(analysis_id):
+    user_id = get_user_id_from_context()
+
+    try:
+        doc_id = ObjectId(analysis_id)
+    except Exception:
+        return jsonify({"error": "Invalid analysis ID."}), 400
+
+    try:
+        doc = analyses_collection.find_one({"_id": doc_id, "user_id": ObjectId(user_id)})
+        if not doc:
+            return jsonify({"error": "Draft not found or unauthorized."}), 404
+
+        resume_text, job_description = analysis_texts(doc, text_blobs)
+        return jsonify({
+            "id": str(doc['_id']),
+            "ats_score": doc['ats_score'],
+            "target_job_title": doc.get('target_job_title', 'Untitled'),
+            "created_at": doc['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "analysis_json": doc.get('analysis_json', {})
+        }), 200
+
+    except Exception as e:
+        log_event("Error during analysis retrieval", level="error", error=str(e))
+        return jsonify({"error": "Database error during analysis retrieval."}), 500
+
+@api.route('/delete_analysis', methods=['POST'])
 @token_required
 def delete_analysis():
     data = request.get_json()
@@ -264,15 +757,22 @@ def delete_analysis():
         return jsonify({"error": "Draft ID is required."}), 400
 
     try:
-        result = analyses_collection.delete_one({"_id": ObjectId(draft_id), "user_id": ObjectId(user_id)})
+        deleted = analyses_collection.find_one_and_delete(
+            {"_id": ObjectId(draft_id), "user_id": ObjectId(user_id)},
+            projection={"resume_blob_id": 1, "job_description_blob_id": 1}
+        )
         
-        if result.deleted_count == 0:
+        if not deleted:
              return jsonify({"error": "Draft not found or unauthorized."}), 404
+
+        for blob_field in ("resume_blob_id", "job_description_blob_id"):
+            if blob_field in deleted:
+                text_blobs.release(deleted[blob_field])
              
         return jsonify({"message": "Draft deleted successfully!"}), 200
         
     except Exception as e:
-        print(f"Error during deletion: {e}")
+        log_event("Error during deletion", level="error", error=str(e))
         return jsonify({"error": "Database error during deletion."}), 500
 
 ANALYSIS_SCHEMA = {
@@ -322,6 +822,23 @@ ANALYSIS_SCHEMA = {
     }
 }
 
+# Several analyses from one call; 'index' ties each entry back to its numbered JD/resume.
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "results": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "index": {"type": "INTEGER", "description": "The number of the job description (or resume) this entry analyzes."},
+                    **ANALYSIS_SCHEMA["properties"]
+                }
+            }
+        }
+    }
+}
+
 BULLET_POINT_SCHEMA = {
     "type": "OBJECT",
     "properties": {
@@ -399,46 +916,426 @@ SECTION_REFINEMENT_SCHEMA = {
     "propertyOrdering": ["section_title", "suggested_rewrites"]
 }
 
-def call_gemini_with_retry(payload, schema_name):
+JD_REQUIREMENTS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "requirements": {
+            "type": "ARRAY",
+            "description": "The distinct skills, tools and qualifications the job description asks for.",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "keyword": {"type": "STRING", "description": "Short canonical name of the requirement, e.g. 'Kubernetes'."},
+                    "importance": {"type": "INTEGER", "description": "1 (nice to have) to 5 (hard requirement)."}
+                }
+            }
+        }
+    }
+}
+
+INITIAL_DRAFT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "modified_draft": {"type": "STRING"}
+    }
+}
+
+def section_analysis_schema(requirement_keywords):
+    """Per-section analysis schema; covered requirements are constrained to the JD's own keywords."""
+    covered_items = {"type": "STRING"}
+    if requirement_keywords:
+        covered_items["enum"] = requirement_keywords
+    advice_items = ANALYSIS_SCHEMA["properties"]["feedback"]["properties"]["content_improvements"]["items"]
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "covered_requirements": {
+                "type": "ARRAY",
+                "description": "Requirements from the list that this section clearly demonstrates.",
+                "items": covered_items
+            },
+            "content_improvements": {
+                "type": "ARRAY",
+                "description": "Actionable content advice specific to this section.",
+                "items": advice_items
+            },
+            "formatting_advice": {
+                "type": "ARRAY",
+                "description": "Readability and formatting advice specific to this section.",
+                "items": advice_items
+            },
+            "quality_score": {"type": "INTEGER", "description": "1-100 quality of this section for the target job."}
+        }
+    }
+
+# Ranges the schemas only state in their descriptions; the validator clamps answers into them.
+FIELD_BOUNDS = {
+    "ats_score": (1, 100),
+    "compatibility_score": (1, 100),
+    "quality_score": (1, 100),
+    "importance": (1, 5),
+}
+
+SCHEMA_VALIDATORS = {
+    name: SchemaValidator(schema, FIELD_BOUNDS) for name, schema in [
+        ("ANALYSIS_SCHEMA", ANALYSIS_SCHEMA),
+        ("BATCH_ANALYSIS_SCHEMA", BATCH_ANALYSIS_SCHEMA),
+        ("BULLET_POINT_SCHEMA", BULLET_POINT_SCHEMA),
+        ("SUGGESTION_SCHEMA", SUGGESTION_SCHEMA),
+        ("TEMPLATE_RECOMMENDATION_SCHEMA", TEMPLATE_RECOMMENDATION_SCHEMA),
+        ("SECTION_REFINEMENT_SCHEMA", SECTION_REFINEMENT_SCHEMA),
+        ("JD_REQUIREMENTS_SCHEMA", JD_REQUIREMENTS_SCHEMA),
+        ("INITIAL_DRAFT_SCHEMA", INITIAL_DRAFT_SCHEMA),
+    ]
+}
+
+def schema_validator(schema_name, response_schema):
+    """The precompiled validator for a *_SCHEMA, or a fresh one for per-call schemas (sections, re-asks)."""
+    validator = SCHEMA_VALIDATORS.get(schema_name)
+    if validator is None or validator.schema is not response_schema:
+        validator = SchemaValidator(response_schema or {"type": "OBJECT"}, FIELD_BOUNDS)
+    return validator
+
+def observe_gemini_attempt(schema_name, started_at, outcome):
+    if started_at is None:
+        return
+    seconds = time.perf_counter() - started_at
+    GEMINI_ATTEMPT_SECONDS.observe(seconds, schema=schema_name, outcome=outcome)
+    record_stage("gemini_attempt", seconds)
+
+class GeminiCall:
+    """
+    Bookkeeping for one logical Gemini request: cache lookup, deadline, per-attempt timing
+    and the retry policy. call_gemini_with_retry and call_gemini_async only differ in how
+    they wait, so everything else lives here.
+    """
+
+    def __init__(self, payload, schema_name, use_cache=True, reask=True):
+        # Extract params from the old payload structure to fit the SDK method signature
+        self.schema_name = schema_name
+        self.user_message = payload['contents'][0]['parts'][0]['text']
+        self.system_instruction = payload['systemInstruction']['parts'][0]['text']
+        self.generation_config = payload['generationConfig']
+        self.cache_key = None
+        if use_cache:
+            self.cache_key = make_cache_key(schema_name, self.system_instruction, self.user_message, self.generation_config)
+        self.priority = SCHEMA_PRIORITIES.get(schema_name, PRIORITY_INTERACTIVE)
+        self.prompt_tokens = estimate_tokens(self.system_instruction, self.user_message)
+        self.deadline = current_deadline.get() or time.monotonic() + GEMINI_DEADLINE
+        self.max_attempt_seconds = SCHEMA_ATTEMPT_TIMEOUTS.get(schema_name, GEMINI_ATTEMPT_TIMEOUT)
+        self.hedge_after = hedge_policy.hedge_after(schema_name)
+        self.validator = schema_validator(schema_name, self.generation_config.get('response_schema'))
+        self.reask = reask
+
+    def cached(self):
+        if not self.cache_key:
+            llm_cache.record_bypass(self.schema_name)
+            LLM_CACHE_LOOKUPS.inc(schema=self.schema_name, result="bypass")
+            return None
+        cached = llm_cache.get(self.cache_key, self.schema_name)
+        LLM_CACHE_LOOKUPS.inc(schema=self.schema_name, result="hit" if cached is not None else "miss")
+        return cached
+
+    def attempt_timeout(self):
+        """Seconds the next attempt may take: the per-attempt cap or what is left of the deadline."""
+        remaining = self.deadline - time.monotonic()
+        if remaining < GEMINI_MIN_ATTEMPT_SECONDS:
+            raise GeminiDeadlineExceeded("Gemini deadline exceeded.")
+        return min(self.max_attempt_seconds, remaining)
+
+    def attempt_done(self, started, error=None):
+        """
+        Times one attempt and reports it to the circuit breaker and hedge policy.
+        started is None when the attempt never reached Gemini (budget, deadline).
+        """
+        if started is None:
+            circuit_breaker.record(None)
+            return
+        kind = classify_error(error) if error else None
+        observe_gemini_attempt(self.schema_name, started, "ok" if not error else "throttled" if kind == ERROR_THROTTLED else "error")
+        # 429s and other 4xx answers mean Gemini is up; only transient failures trip the breaker.
+        circuit_breaker.record(None if kind in (ERROR_THROTTLED, ERROR_CLIENT) else error is not None)
+        if not error:
+            hedge_policy.observe(self.schema_name, time.perf_counter() - started)
+
+    def succeeded(self, response, response_text, hedge):
+        if hedge:
+            GEMINI_HEDGES.inc(schema=self.schema_name, result=hedge)
+        token_accountant.record(self.schema_name, *response_token_counts(
+            response, self.system_instruction + self.user_message, response_text
+        ))
+        return self.parse(response_text)
+
+    def parse(self, response_text):
+        """
+        Validates and locally repairs the answer. Returns (result, missing): missing names
+        top-level fields repair couldn't supply. Raises SchemaViolation (retried like any
+        transient failure) when the answer is unusable.
+        """
+        try:
+            with timed_stage("json_decode"):
+                result, missing, fixes = self.validator.validate(response_text)
+            if missing and not self.reask:
+                raise SchemaViolation(f"Model output is missing {', '.join(missing)}.")
+        except SchemaViolation:
+            LLM_OUTPUT_REPAIRS.inc(schema=self.schema_name, result="invalid")
+            raise
+        if fixes or missing:
+            LLM_OUTPUT_REPAIRS.inc(schema=self.schema_name, result="reask" if missing else "local")
+            log_event("Repaired Gemini output", schema=self.schema_name, fixes=fixes, missing=missing)
+        return result, missing
+
+    def reask_payload(self, result, missing):
+        """A follow-up request for just the missing fields, with the partial answer as context."""
+        user_message = (
+            f"{self.user_message}\n\n"
+            f"Your previous answer was incomplete:\n{json.dumps(result, separators=(',', ':'))}\n\n"
+            f"Return only the missing fields: {', '.join(missing)}."
+        )
+        return {
+            "contents": [{"parts": [{"text": user_message}]}],
+            "systemInstruction": {"parts": [{"text": self.system_instruction}]},
+            "generationConfig": {**self.generation_config, "response_schema": self.validator.missing_schema(missing)}
+        }
+
+    def store(self, result):
+        if self.cache_key:
+            llm_cache.set(self.cache_key, result, self.schema_name)
+
+    def over_budget(self, error):
+        # Over budget or breaker open: fail fast instead of holding the worker in backoff.
+        reason = "circuit_open" if isinstance(error, GeminiUnavailable) else "budget"
+        GEMINI_FAILURES.inc(schema=self.schema_name, reason=reason)
+
+    def failed(self, error, attempt):
+        """
+        Books a failed attempt and returns the seconds to back off before the next one.
+        Raises instead for errors a retry can't fix (4xx, deadline) and once attempts run out.
+        """
+        schema_name = self.schema_name
+        if isinstance(error, GeminiDeadlineExceeded):
+            GEMINI_FAILURES.inc(schema=schema_name, reason="deadline")
+            raise error
+        kind = classify_error(error)
+        if kind == ERROR_CLIENT:
+            GEMINI_FAILURES.inc(schema=schema_name, reason="client")
+            log_event("Gemini rejected the request", level="error", schema=schema_name, error=str(error))
+            raise Exception(f"Failed to process LLM response: {error}")
+
+        base = GEMINI_BACKOFF_BASE
+        if kind == ERROR_THROTTLED:
+            # Gemini 429: also drain the shared bucket so every worker slows down, not just this call.
+            reason = "throttled"
+            base *= 2
+            log_event("Gemini rate limited", level="warning", schema=schema_name, attempt=attempt + 1, error=str(error))
+            gemini_governor.report_throttled()
+        else:
+            reason = "error"
+            log_event("Gemini SDK error", level="warning", schema=schema_name, attempt=attempt + 1, error=str(error))
+
+        delay = backoff_delay(attempt, base, GEMINI_BACKOFF_CAP)
+        if attempt == GEMINI_MAX_ATTEMPTS - 1 or time.monotonic() + delay + GEMINI_MIN_ATTEMPT_SECONDS > self.deadline:
+            GEMINI_FAILURES.inc(schema=schema_name, reason=reason)
+            log_event("Gemini call failed", level="error", schema=schema_name, attempts=attempt + 1)
+            raise Exception(f"Failed to process LLM response: {error}")
+        GEMINI_RETRIES.inc(schema=schema_name, reason=reason)
+        return delay
+
+def call_gemini_with_retry(payload, schema_name, use_cache=True, reask=True):
     """
-    Calls the Gemini API using the google-generativeai SDK with exponential backoff.
+    Calls the Gemini API using the google-generativeai SDK with jittered exponential backoff.
     Payload is expected to contain 'contents', 'systemInstruction', and 'generationConfig'.
+    Identical requests are served from llm_cache unless use_cache is False.
+    Attempts are bounded by the route's deadline; with GEMINI_HEDGE=1 a slow attempt is raced
+    by a second one on hedge_executor. Answers are repaired against the schema locally, and
+    fields that can't be repaired are re-asked for on their own (once, unless reask is False).
     """
-    max_retries = 3
-    retry_delay = 1
-    
-    # Extract params from the old payload structure to fit the SDK method signature
-    user_message = payload['contents'][0]['parts'][0]['text']
-    system_instruction = payload['systemInstruction']['parts'][0]['text']
-    generation_config = payload['generationConfig']
-    
-    model = genai.GenerativeModel(
-        model_name='gemini-2.5-flash',
-        system_instruction=system_instruction
-    )
+    call = GeminiCall(payload, schema_name, use_cache, reask)
+    cached = call.cached()
+    if cached is not None:
+        return cached
+
+    model = model_registry.get_model(call.system_instruction)
 
-    for attempt in range(max_retries):
+    def attempt():
+        circuit_breaker.allow()
+        started = None
         try:
-            response = model.generate_content(
-                user_message,
-                generation_config=generation_config
-            )
-            
-            # SDK returns a GenerateContentResponse object
-            # We need to extract the text and parse it as JSON
-            response_text = response.text
-            return json.loads(response_text)
+            with gemini_governor.acquire(call.priority, call.prompt_tokens):
+                timeout = call.attempt_timeout()
+                started = time.perf_counter()
+                response = model.generate_content(
+                    call.user_message,
+                    generation_config=call.generation_config,
+                    request_options={"timeout": timeout}
+                )
+                # SDK returns a GenerateContentResponse object
+                # We need to extract the text and parse it as JSON
+                response_text = response.text
+        except Exception as e:
+            call.attempt_done(started, e)
+            raise
+        call.attempt_done(started)
+        return response, response_text
 
+    for attempt_number in range(GEMINI_MAX_ATTEMPTS):
+        try:
+            if call.hedge_after is None:
+                (response, response_text), hedge = attempt(), None
+            else:
+                (response, response_text), hedge = run_hedged(hedge_executor, attempt, call.hedge_after, hedge_policy)
+            result, missing = call.succeeded(response, response_text, hedge)
+            if missing:
+                followup = call.reask_payload(result, missing)
+                result = {**result, **call_gemini_with_retry(followup, schema_name, use_cache=False, reask=False)}
+            call.store(result)
+            return result
+
+        except RateLimitExceeded as e:
+            call.over_budget(e)
+            raise
         except Exception as e:
-            print(f"Gemini SDK Error (Attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                retry_delay *= 2
+            delay = call.failed(e, attempt_number)
+            with timed_stage("retry_backoff"):
+                time.sleep(delay)
+
+async def call_gemini_async(payload, schema_name, use_cache=True, reask=True):
+    """
+    call_gemini_with_retry for the ASGI app (asgi.py): awaits generate_content_async and
+    backs off with asyncio.sleep, so a waiting call costs a coroutine instead of a thread.
+    Cache reads/writes may hit SQLite or Mongo and run in a worker thread.
+    """
+    call = GeminiCall(payload, schema_name, use_cache, reask)
+    cached = await asyncio.to_thread(call.cached)
+    if cached is not None:
+        return cached
+
+    model = model_registry.get_async_model(call.system_instruction)
+
+    async def attempt():
+        circuit_breaker.allow()
+        started = None
+        try:
+            async with gemini_governor.acquire_async(call.priority, call.prompt_tokens):
+                timeout = call.attempt_timeout()
+                started = time.perf_counter()
+                response = await model.generate_content_async(
+                    call.user_message,
+                    generation_config=call.generation_config,
+                    request_options={"timeout": timeout}
+                )
+                response_text = response.text
+        except asyncio.CancelledError:
+            # Lost a hedge race; still frees a half-open breaker probe.
+            call.attempt_done(None)
+            raise
+        except Exception as e:
+            call.attempt_done(started, e)
+            raise
+        call.attempt_done(started)
+        return response, response_text
+
+    for attempt_number in range(GEMINI_MAX_ATTEMPTS):
+        try:
+            if call.hedge_after is None:
+                (response, response_text), hedge = await attempt(), None
             else:
-                print(f"API call failed after {max_retries} attempts.")
-                raise Exception(f"Failed to process LLM response: {e}")
+                (response, response_text), hedge = await run_hedged_async(attempt, call.hedge_after, hedge_policy)
+            result, missing = call.succeeded(response, response_text, hedge)
+            if missing:
+                followup = call.reask_payload(result, missing)
+                result = {**result, **await call_gemini_async(followup, schema_name, use_cache=False, reask=False)}
+            await asyncio.to_thread(call.store, result)
+            return result
+
+        except RateLimitExceeded as e:
+            call.over_budget(e)
+            raise
+        except Exception as e:
+            delay = call.failed(e, attempt_number)
+            with timed_stage("retry_backoff"):
+                await asyncio.sleep(delay)
+
+def stream_gemini_events(payload, schema_name, field_names=(), text_field=None):
+    """
+    Streams a Gemini generation as SSE frames.
+    'field' events carry each of field_names as soon as its value is complete,
+    'delta' events carry new text of text_field while it is still being written,
+    and a final 'result' event carries the parsed object. No retries here: once
+    bytes are on the wire the client owns the request, so failures become 'error' events.
+    """
+    call = GeminiCall(payload, schema_name)
+    cached = call.cached()
+    if cached is not None:
+        yield sse_event("result", cached)
+        return
+
+    fields = IncrementalJSONFields(field_names)
+    text_stream = IncrementalJSONString(text_field) if text_field else None
+    buffer = ""
+
+    try:
+        model = model_registry.get_model(call.system_instruction)
+        circuit_breaker.allow()
+        started = None
+        try:
+            with gemini_governor.acquire(call.priority, call.prompt_tokens):
+                # For a stream the timeout bounds each wait for the next chunk, not the whole answer.
+                timeout = call.attempt_timeout()
+                started = time.perf_counter()
+                response = model.generate_content(
+                    call.user_message,
+                    generation_config=call.generation_config,
+                    stream=True,
+                    request_options={"timeout": timeout}
+                )
+                last_chunk = None
+                for chunk in response:
+                    last_chunk = chunk
+                    buffer += chunk.text
+                    for name, value in fields.feed(buffer):
+                        yield sse_event("field", {"name": name, "value": value})
+                    if text_stream:
+                        delta = text_stream.feed(buffer)
+                        if delta:
+                            yield sse_event("delta", {"name": text_field, "text": delta})
+        except GeneratorExit:
+            # Client went away mid-stream.
+            call.attempt_done(None)
+            raise
+        except Exception as e:
+            call.attempt_done(started, e)
+            raise
+        call.attempt_done(started)
+
+        # Usage metadata arrives with the final chunk.
+        token_accountant.record(schema_name, *response_token_counts(
+            last_chunk, call.system_instruction + call.user_message, buffer
+        ))
+        result, missing = call.parse(buffer)
+        if missing:
+            followup = call.reask_payload(result, missing)
+            result = {**result, **call_gemini_with_retry(followup, schema_name, use_cache=False, reask=False)}
+        call.store(result)
+        yield sse_event("result", result)
+
+    except RateLimitExceeded as e:
+        call.over_budget(e)
+        yield sse_event("error", {"error": str(e), "retry_after": e.retry_after})
+    except Exception as e:
+        GEMINI_FAILURES.inc(schema=schema_name, reason="error")
+        log_event("Gemini streaming error", level="error", schema=schema_name, error=str(e))
+        yield sse_event("error", {"error": f"AI Server Error: {str(e)}"})
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-def call_gemini_analysis(resume_text, job_description):
+def build_analysis_payload(resume_text, job_description, local_scan=None):
+    resume_text, job_description = fit_prompt_documents(resume_text, job_description, "ANALYSIS_SCHEMA")
     system_prompt = (
         "You are a world-class resume analyzer and Applicant Tracking System (ATS). "
         "Your task is to compare the provided resume text against the target job description. "
@@ -452,6 +1349,13 @@ def call_gemini_analysis(resume_text, job_description):
         f"Job Description: ```{job_description}```\n\n"
         f"Provide a structured analysis and an ATS score (1-100)."
     )
+    if local_scan:
+        user_query += (
+            f"\n\nA deterministic keyword pre-scan found these job-description skills "
+            f"present: {', '.join(local_scan['feedback']['keyword_strengths']) or 'none'}; "
+            f"missing: {', '.join(local_scan['feedback']['keyword_gaps']) or 'none'}. "
+            f"Use it as a starting point; confirm or correct it from the full text."
+        )
     
     payload = {
         "contents": [{ "parts": [{ "text": user_query }] }],
@@ -461,9 +1365,341 @@ def call_gemini_analysis(resume_text, job_description):
             "response_schema": ANALYSIS_SCHEMA
         }
     }
-    return call_gemini_with_retry(payload, "ANALYSIS_SCHEMA")
+    return payload
+
+# The call_gemini_* helpers build the prompt and hand it to call_gemini. asgi.py passes
+# call_gemini_async, in which case they return a coroutine for the caller to await.
+def call_gemini_analysis(resume_text, job_description, call_gemini=call_gemini_with_retry):
+    local_scan = quick_score(resume_text, job_description) if ANALYSIS_LOCAL_PREFILTER else None
+    payload = build_analysis_payload(resume_text, job_description, local_scan)
+    return call_gemini(payload, "ANALYSIS_SCHEMA")
+
+def call_gemini_jd_requirements(job_description):
+    system_prompt = (
+        "You are an expert technical recruiter. Extract the concrete requirements from the job description: "
+        "skills, tools, certifications and qualifications. Merge duplicates, skip generic boilerplate, "
+        "and rate how essential each one is."
+    )
+    job_description = fit_job_description(job_description, PROMPT_TOKEN_BUDGETS["JD_REQUIREMENTS_SCHEMA"])
+    user_query = f"Job Description: ```{job_description}```\n\nList the requirements."
+
+    payload = {
+        "contents": [{ "parts": [{ "text": user_query }] }],
+        "systemInstruction": { "parts": [{ "text": system_prompt }] },
+        "generationConfig": {
+            "response_mime_type": "application/json",
+            "response_schema": JD_REQUIREMENTS_SCHEMA,
+            "temperature": 0
+        }
+    }
+    # Near-duplicates of an already extracted posting reuse its requirements.
+    jd_id = canonical_jd_id(job_description)
+    shared_key = f"jd_requirements:{jd_id}" if jd_id else None
+    if shared_key:
+        shared = llm_cache.get(shared_key, "JD_REQUIREMENTS_SCHEMA")
+        if shared is not None:
+            return shared
+    result = call_gemini_with_retry(payload, "JD_REQUIREMENTS_SCHEMA")
+    if shared_key:
+        llm_cache.set(shared_key, result, "JD_REQUIREMENTS_SCHEMA")
+    return result
+
+def build_section_analysis_payload(section_name, section_text, requirement_keywords):
+    system_prompt = (
+        "You are a world-class resume analyzer and Applicant Tracking System (ATS). "
+        "You are shown ONE section of a resume and the requirements extracted from the target job description. "
+        "Report which requirements this section clearly demonstrates and give critical, specific, actionable "
+        "content and formatting advice for this section only."
+    )
+    # Only the extracted requirements are sent, not the full JD, to keep per-section prompts small.
+    user_query = (
+        f"Job Requirements: {json.dumps(requirement_keywords)}\n\n"
+        f"Resume Section '{section_name}': ```{section_text}```"
+    )
+
+    payload = {
+        "contents": [{ "parts": [{ "text": user_query }] }],
+        "systemInstruction": { "parts": [{ "text": system_prompt }] },
+        "generationConfig": {
+            "response_mime_type": "application/json",
+            "response_schema": section_analysis_schema(requirement_keywords),
+            "temperature": 0
+        }
+    }
+    return payload
+
+def build_sections_analysis_payload(sections, requirement_keywords):
+    """All of a resume's sections in one prompt, numbered; each entry has the SECTION_ANALYSIS_SCHEMA fields."""
+    system_prompt = (
+        "You are a world-class resume analyzer and Applicant Tracking System (ATS). "
+        "You are shown the numbered sections of a resume and the requirements extracted from the target job description. "
+        "Analyze each section independently, as if it were the only one: report which requirements it clearly "
+        "demonstrates and give critical, specific, actionable content and formatting advice for that section only. "
+        "Return exactly one entry per number in 'sections', with that number in 'index'."
+    )
+    parts = [f"Job Requirements: {json.dumps(requirement_keywords)}"]
+    parts += [f"Resume Section {index} '{name}': ```{text}```" for index, (name, text) in enumerate(sections)]
+
+    item_schema = section_analysis_schema(requirement_keywords)
+    item_schema = {**item_schema, "properties": {"index": {"type": "INTEGER"}, **item_schema["properties"]}}
+    payload = {
+        "contents": [{ "parts": [{ "text": "\n\n".join(parts) }] }],
+        "systemInstruction": { "parts": [{ "text": system_prompt }] },
+        "generationConfig": {
+            "response_mime_type": "application/json",
+            "response_schema": {"type": "OBJECT", "properties": {"sections": {"type": "ARRAY", "items": item_schema}}},
+            "temperature": 0
+        }
+    }
+    return payload
+
+def payload_cache_key(payload, schema_name):
+    return make_cache_key(
+        schema_name,
+        payload['systemInstruction']['parts'][0]['text'],
+        payload['contents'][0]['parts'][0]['text'],
+        payload['generationConfig']
+    )
+
+def section_payload_is_cached(payload):
+    return llm_cache.contains(payload_cache_key(payload, "SECTION_ANALYSIS_SCHEMA"))
+
+def incremental_anchor_key(resume_sections, job_description):
+    """
+    Identifies one resume being edited against one JD: the contact preamble (or, without one,
+    the first section) rarely changes between edits, unlike the sections being worked on.
+    """
+    identity = next((text for name, text in resume_sections if name == PREAMBLE_SECTION), None)
+    if identity is None:
+        identity = resume_sections[0][1] if resume_sections else ""
+    return "incremental_anchor:" + make_cache_key("INCREMENTAL_ANCHOR", fingerprint(identity), job_description, None)
+
+def seed_incremental_analysis(resume_sections, job_description, ats_score):
+    """
+    Background half of a first incremental run. Extracts the JD requirements and analyzes every
+    section in one packed call, caching each result under the key its own SECTION_ANALYSIS_SCHEMA
+    call would use. The anchor stored with them is the gap between the full analysis's ats_score
+    and the merged section score, so later incremental scores land on the full route's scale.
+    """
+    try:
+        requirements = call_gemini_jd_requirements(job_description).get('requirements', [])
+        requirement_keywords = [r['keyword'] for r in requirements if r.get('keyword')]
+        sections = [(name, normalize_section(text)) for name, text in resume_sections if name != PREAMBLE_SECTION]
+        packed = call_gemini_with_retry(
+            build_sections_analysis_payload(sections, requirement_keywords), "SECTIONS_ANALYSIS_SCHEMA"
+        )
+        by_index = {entry.get('index'): entry for entry in packed.get('sections', [])}
+        section_results = []
+        for index, (name, text) in enumerate(sections):
+            if index not in by_index:
+                continue
+            result = {key: value for key, value in by_index[index].items() if key != 'index'}
+            payload = build_section_analysis_payload(name, text, requirement_keywords)
+            llm_cache.set(payload_cache_key(payload, "SECTION_ANALYSIS_SCHEMA"), result, "SECTION_ANALYSIS_SCHEMA")
+            section_results.append((name, text, result))
+
+        if len(section_results) < len(sections):
+            log_event("Packed section analysis skipped sections", level="warning",
+                      expected=len(sections), received=len(section_results))
+            return
+        merged = merge_section_results(requirements, section_results)
+        llm_cache.set(
+            incremental_anchor_key(resume_sections, job_description),
+            {"offset": ats_score - merged['ats_score']},
+            "INCREMENTAL_ANCHOR"
+        )
+    except Exception as e:
+        log_event("Seeding incremental analysis failed", level="warning", error=str(e))
+
+def run_incremental_analysis(resume_text, job_description):
+    """
+    Analyzes a resume section by section. Section results are content-addressed in
+    llm_cache, so after an edit only the sections whose text changed go to Gemini;
+    the rest are reused and everything is merged back into the ANALYSIS_SCHEMA shape.
+    The first run for a resume and JD has nothing to reuse: it answers with the single-call
+    analysis and seeds the section cache in the background (see seed_incremental_analysis).
+    """
+    resume_sections = split_sections(resume_text)
+    sections = [
+        (name, normalize_section(text))
+        for name, text in resume_sections
+        if name != PREAMBLE_SECTION
+    ]
+    anchor = llm_cache.get(incremental_anchor_key(resume_sections, job_description), "INCREMENTAL_ANCHOR")
+
+    if anchor is None:
+        analysis = call_gemini_analysis(resume_text, job_description)
+        # A single section would be re-analyzed whole on every edit anyway.
+        if len(sections) > 1 and isinstance(analysis.get('ats_score'), int) and seed_slots.acquire(blocking=False):
+            seed = seed_executor.submit(seed_incremental_analysis, resume_sections, job_description, analysis['ats_score'])
+            seed.add_done_callback(lambda _: seed_slots.release())
+        section_info = [{"name": name, "fingerprint": fingerprint(text), "reused": False} for name, text in sections]
+        return {**analysis, "sections": section_info}
+
+    requirements = call_gemini_jd_requirements(job_description).get('requirements', [])
+    requirement_keywords = [r['keyword'] for r in requirements if r.get('keyword')]
+
+    jobs = []
+    for name, text in sections:
+        payload = build_section_analysis_payload(name, text, requirement_keywords)
+        reused = section_payload_is_cached(payload)
+        future = pipeline_executor.submit(call_gemini_with_retry, payload, "SECTION_ANALYSIS_SCHEMA")
+        jobs.append((name, text, reused, future))
+
+    section_results = []
+    section_info = []
+    for name, text, reused, future in jobs:
+        section_results.append((name, text, future.result()))
+        section_info.append({"name": name, "fingerprint": fingerprint(text), "reused": reused})
+
+    analysis = merge_section_results(requirements, section_results)
+    analysis["ats_score"] = max(1, min(100, analysis["ats_score"] + anchor["offset"]))
+    analysis["sections"] = section_info
+    return analysis
+
+def build_batch_analysis_payload(shared_text, group, mode):
+    """
+    One prompt for several analyses: the shared resume (or JD) is sent once, followed
+    by the numbered JDs (or resumes) in group = [(index, text, local_scan)].
+    """
+    if mode == MODE_JOB_DESCRIPTIONS:
+        shared_label, item_label = "Resume", "Job Description"
+    else:
+        shared_label, item_label = "Job Description", "Resume"
 
-def call_gemini_bullet_generator(job_title, task_description):
+    system_prompt = (
+        "You are a world-class resume analyzer and Applicant Tracking System (ATS). "
+        f"You are given one {shared_label.lower()} and several numbered {item_label.lower()}s. "
+        "Analyze each resume/job description pair independently, as if it were the only one, "
+        "and return exactly one entry per number in 'results', with that number in 'index'. "
+        "Each analysis must focus on ATS compatibility, keyword matching, and content quality (using action verbs and quantifiable results). "
+        "Be critical, specific, and actionable."
+    )
+    budget = PROMPT_TOKEN_BUDGETS["ANALYSIS_SCHEMA"]
+    if mode == MODE_JOB_DESCRIPTIONS:
+        shared_text = normalize_whitespace(shared_text)
+        group = [(i, fit_documents(shared_text, text, budget)[1], scan) for i, text, scan in group]
+    else:
+        shared_text = fit_job_description(shared_text, budget // 2)
+        group = [(i, fit_documents(text, shared_text, budget)[0], scan) for i, text, scan in group]
+
+    parts = [f"{shared_label}: ```{shared_text}```"]
+    for index, text, local_scan in group:
+        part = f"{item_label} {index}: ```{text}```"
+        if local_scan:
+            part += (
+                f"\nKeyword pre-scan for {index}: present: "
+                f"{', '.join(local_scan['feedback']['keyword_strengths']) or 'none'}; "
+                f"missing: {', '.join(local_scan['feedback']['keyword_gaps']) or 'none'}."
+            )
+        parts.append(part)
+    parts.append(f"Provide a structured analysis and an ATS score (1-100) for each {item_label.lower()}.")
+
+    return {
+        "contents": [{ "parts": [{ "text": "\n\n".join(parts) }] }],
+        "systemInstruction": { "parts": [{ "text": system_prompt }] },
+        "generationConfig": {
+            "response_mime_type": "application/json",
+            "response_schema": BATCH_ANALYSIS_SCHEMA
+        }
+    }
+
+def batch_item_result(index, analysis=None, error=None, retry_after=None):
+    if analysis is None:
+        item = {"index": index, "status": "error", "error": error}
+        if retry_after:
+            item["retry_after"] = retry_after
+        return item
+    return {"index": index, "status": "ok", "ats_score": analysis.get('ats_score', 0), "analysis": analysis}
+
+def analyze_batch_group(shared_text, group, mode):
+    """
+    Runs one packed call for group = [(index, text)] and returns one batch item per entry.
+    Each result is also stored under the single-pair /analyze_resume cache key. Entries the
+    packed call failed or skipped fall back to individual analyses, so one bad item
+    can't fail its neighbours.
+    """
+    def pair(text):
+        return (shared_text, text) if mode == MODE_JOB_DESCRIPTIONS else (text, shared_text)
+
+    scans = {index: quick_score(*pair(text)) if ANALYSIS_LOCAL_PREFILTER else None for index, text in group}
+    results = {}
+
+    if len(group) > 1:
+        try:
+            payload = build_batch_analysis_payload(shared_text, [(i, t, scans[i]) for i, t in group], mode)
+            packed = call_gemini_with_retry(payload, "BATCH_ANALYSIS_SCHEMA")
+            texts = dict(group)
+            for entry in packed.get('results', []):
+                index = entry.get('index')
+                if index not in texts or index in results or not isinstance(entry.get('ats_score'), int):
+                    continue
+                analysis = {"ats_score": entry['ats_score'], "feedback": entry.get('feedback', {})}
+                single_payload = build_analysis_payload(*pair(texts[index]), scans[index])
+                llm_cache.set(payload_cache_key(single_payload, "ANALYSIS_SCHEMA"), analysis, "ANALYSIS_SCHEMA")
+                results[index] = batch_item_result(index, analysis)
+        except RateLimitExceeded as e:
+            # Individual retries would hit the same budget.
+            return [batch_item_result(index, error=str(e), retry_after=e.retry_after) for index, _ in group]
+        except Exception as e:
+            log_event("Packed batch analysis failed, falling back to single calls", level="warning", error=str(e))
+
+    for index, text in group:
+        if index in results:
+            continue
+        try:
+            payload = build_analysis_payload(*pair(text), scans[index])
+            results[index] = batch_item_result(index, call_gemini_with_retry(payload, "ANALYSIS_SCHEMA"))
+        except RateLimitExceeded as e:
+            results[index] = batch_item_result(index, error=str(e), retry_after=e.retry_after)
+        except Exception as e:
+            log_event("Batch item failed", level="error", index=index, error=str(e))
+            results[index] = batch_item_result(index, error=str(e))
+
+    return [results[index] for index, _ in group]
+
+def parse_batch_request(data):
+    """
+    Returns (mode, shared text, [(index, text)]) for either one resume + 'job_descriptions'
+    or one 'job_description' + 'resumes'. Raises ValueError with a client-facing message.
+    """
+    if isinstance(data.get('job_descriptions'), list):
+        mode, shared_text, texts = MODE_JOB_DESCRIPTIONS, resolve_resume_text(data), data['job_descriptions']
+    elif isinstance(data.get('resumes'), list):
+        mode, shared_text, texts = MODE_RESUMES, data.get('job_description', ''), data['resumes']
+    else:
+        raise ValueError("Send a resume with 'job_descriptions', or a job_description with 'resumes'.")
+
+    if not shared_text:
+        raise ValueError("Both resume and job description are required.")
+    if not texts or len(texts) > BATCH_MAX_ITEMS:
+        raise ValueError(f"A batch needs between 1 and {BATCH_MAX_ITEMS} items.")
+    if not all(isinstance(text, str) and text.strip() for text in texts):
+        raise ValueError("Every batch item must be non-empty text.")
+    return mode, shared_text, list(enumerate(texts))
+
+def iter_batch_results(mode, shared_text, items):
+    """
+    Yields batch items as they complete. Pairs already in the /analyze_resume cache come
+    back first; the rest are packed into as few calls as the prompt budget allows and
+    run BATCH_MAX_CONCURRENCY at a time.
+    """
+    uncached = []
+    for index, text in items:
+        pair = (shared_text, text) if mode == MODE_JOB_DESCRIPTIONS else (text, shared_text)
+        local_scan = quick_score(*pair) if ANALYSIS_LOCAL_PREFILTER else None
+        cached = llm_cache.get(payload_cache_key(build_analysis_payload(*pair, local_scan), "ANALYSIS_SCHEMA"), "ANALYSIS_SCHEMA")
+        if cached is not None:
+            yield batch_item_result(index, cached)
+        else:
+            uncached.append((index, text))
+
+    groups = pack_batches(uncached, len(shared_text), BATCH_PACK_MAX_CHARS, BATCH_PACK_MAX_ITEMS)
+    calls = ((analyze_batch_group, shared_text, group, mode) for group in groups)
+    for group_results in run_bounded(pipeline_executor, calls, BATCH_MAX_CONCURRENCY):
+        yield from group_results
+
+def call_gemini_bullet_generator(job_title, task_description, call_gemini=call_gemini_with_retry):
     system_prompt = (
         "You are a professional resume writer specializing in generating impactful, quantifiable, "
         "and results-oriented bullet points. Use strong action verbs and metrics. "
@@ -482,9 +1718,11 @@ def call_gemini_bullet_generator(job_title, task_description):
             "response_schema": BULLET_POINT_SCHEMA
         }
     }
-    return call_gemini_with_retry(payload, "BULLET_POINT_SCHEMA")
+    # Users hit "Generate" again to get different bullets, so never serve these from cache.
+    return call_gemini(payload, "BULLET_POINT_SCHEMA", use_cache=False)
 
-def call_gemini_skill_suggester(resume_text, job_description, keyword_gaps):
+def call_gemini_skill_suggester(resume_text, job_description, keyword_gaps, call_gemini=call_gemini_with_retry):
+    resume_text, job_description = fit_prompt_documents(resume_text, job_description, "SUGGESTION_SCHEMA")
     system_prompt = (
         "You are a strategic career advisor. For each skill listed in the 'keyword_gaps' array, "
         "generate one highly-polished, quantifiable, and action-oriented bullet point that the user "
@@ -508,9 +1746,10 @@ def call_gemini_skill_suggester(resume_text, job_description, keyword_gaps):
             "response_schema": SUGGESTION_SCHEMA
         }
     }
-    return call_gemini_with_retry(payload, "SUGGESTION_SCHEMA")
+    return call_gemini(payload, "SUGGESTION_SCHEMA")
 
-def call_gemini_template_selector(resume_text, job_description):
+def call_gemini_template_selector(resume_text, job_description, call_gemini=call_gemini_with_retry):
+    resume_text, job_description = fit_prompt_documents(resume_text, job_description, "TEMPLATE_RECOMMENDATION_SCHEMA")
     system_prompt = (
         "You are a professional resume strategist. Recommend the best template structure "
         "from the list provided that maximizes the user's appeal to an ATS and a recruiter "
@@ -533,9 +1772,10 @@ def call_gemini_template_selector(resume_text, job_description):
             "temperature": 0.1
         }
     }
-    return call_gemini_with_retry(payload, "TEMPLATE_RECOMMENDATION_SCHEMA")
+    return call_gemini(payload, "TEMPLATE_RECOMMENDATION_SCHEMA")
 
-def call_gemini_initial_draft(resume_text, job_description, analysis_result):
+def build_initial_draft_payload(resume_text, job_description, analysis_result):
+    resume_text, job_description = fit_prompt_documents(resume_text, job_description, "INITIAL_DRAFT_SCHEMA")
     system_prompt = (
         "You are an expert resume editor. Your task is to take the user's raw resume text "
         "and the analysis feedback and produce a single, CLEAN, slightly optimized text draft. "
@@ -547,7 +1787,7 @@ def call_gemini_initial_draft(resume_text, job_description, analysis_result):
     user_query = (
         f"Raw Resume Text:\n```{resume_text}```\n\n"
         f"Target Job Description:\n```{job_description}```\n\n"
-        f"Analysis Feedback to Incorporate:\n{json.dumps(analysis_result.get('feedback', {}), indent=2)}\n\n"
+        f"Analysis Feedback to Incorporate:\n{json.dumps(analysis_result.get('feedback', {}), separators=(',', ':'))}\n\n"
         f"Produce the single, clean, modified resume text."
     )
     
@@ -556,13 +1796,17 @@ def call_gemini_initial_draft(resume_text, job_description, analysis_result):
         "systemInstruction": { "parts": [{ "text": system_prompt }] },
         "generationConfig": {
             "response_mime_type": "application/json",
-            "response_schema": {"type": "OBJECT", "properties": {"modified_draft": {"type": "STRING"}}},
+            "response_schema": INITIAL_DRAFT_SCHEMA,
             "temperature": 0.3
         }
     }
-    return call_gemini_with_retry(payload, "INITIAL_DRAFT_SCHEMA")
+    return payload
 
-def call_gemini_section_refiner(section_text, job_description):
+def call_gemini_initial_draft(resume_text, job_description, analysis_result, call_gemini=call_gemini_with_retry):
+    payload = build_initial_draft_payload(resume_text, job_description, analysis_result)
+    return call_gemini(payload, "INITIAL_DRAFT_SCHEMA")
+
+def call_gemini_section_refiner(section_text, job_description, call_gemini=call_gemini_with_retry):
     system_prompt = (
         "You are a hyper-specific resume refinement tool. For the provided resume section, "
         "generate 2-3 precise, quantifiable, and keyword-rich rewrite suggestions for the "
@@ -586,13 +1830,169 @@ def call_gemini_section_refiner(section_text, job_description):
             "temperature": 0.5
         }
     }
-    return call_gemini_with_retry(payload, "SECTION_REFINEMENT_SCHEMA")
+    # High temperature on purpose: repeated refinements should give fresh suggestions.
+    return call_gemini(payload, "SECTION_REFINEMENT_SCHEMA", use_cache=False)
+
+def stage_info(start, error=None):
+    """Timing and status of one pipeline stage; error is the exception it raised, if any."""
+    stage = {"duration_ms": round((time.perf_counter() - start) * 1000, 1), "status": "error" if error else "ok"}
+    if error:
+        stage["error"] = str(error)
+        if isinstance(error, RateLimitExceeded):
+            stage["retry_after"] = error.retry_after
+    return stage
+
+def failed_stage(fn, start, error):
+    if not isinstance(error, RateLimitExceeded):
+        log_event("Pipeline stage failed", level="error", stage=fn.__name__, error=str(error))
+    return None, stage_info(start, error)
+
+def run_timed_stage(fn, *args):
+    """Runs one pipeline stage and returns (result, stage_info) without raising."""
+    start = time.perf_counter()
+    try:
+        return fn(*args), stage_info(start)
+    except Exception as e:
+        return failed_stage(fn, start, e)
+
+async def run_timed_stage_async(fn, *args):
+    """run_timed_stage for a call_gemini_* helper, run through call_gemini_async."""
+    start = time.perf_counter()
+    try:
+        return await fn(*args, call_gemini=call_gemini_async), stage_info(start)
+    except Exception as e:
+        return failed_stage(fn, start, e)
+
+def full_report_body(analysis, template, suggestions, draft, stages, start):
+    return {
+        "analysis": analysis,
+        "template_recommendation": template,
+        "suggestions": suggestions,
+        "draft": draft,
+        "timings": {
+            "stages": stages,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+    }
+
+def run_full_report(resume_text, job_description, include_suggestions=True, include_draft=True):
+    """
+    Analysis and template recommendation don't depend on each other and run concurrently.
+    Skill suggestions and the draft both need the analysis, so they start once it lands
+    and then run concurrently with each other.
+    """
+    start = time.perf_counter()
+    stages = {}
+
+    analysis_future = pipeline_executor.submit(run_timed_stage, call_gemini_analysis, resume_text, job_description)
+    template_future = pipeline_executor.submit(run_timed_stage, call_gemini_template_selector, resume_text, job_description)
+
+    analysis, stages["analysis"] = analysis_future.result()
+
+    suggestions_future = None
+    draft_future = None
+    if analysis:
+        keyword_gaps = analysis.get('feedback', {}).get('keyword_gaps', [])
+        if include_suggestions and keyword_gaps:
+            suggestions_future = pipeline_executor.submit(
+                run_timed_stage, call_gemini_skill_suggester, resume_text, job_description, keyword_gaps
+            )
+        if include_draft:
+            draft_future = pipeline_executor.submit(
+                run_timed_stage, call_gemini_initial_draft, resume_text, job_description, analysis
+            )
 
-@app.route('/analyze_resume', methods=['POST'])
+    template, stages["template"] = template_future.result()
+    suggestions = None
+    if suggestions_future:
+        suggestions, stages["suggestions"] = suggestions_future.result()
+    draft = None
+    if draft_future:
+        draft, stages["draft"] = draft_future.result()
+
+    return full_report_body(analysis, template, suggestions, draft, stages, start)
+
+async def run_full_report_async(resume_text, job_description, include_suggestions=True, include_draft=True):
+    """run_full_report with tasks on the event loop instead of pipeline_executor threads."""
+    start = time.perf_counter()
+    stages = {}
+
+    analysis_task = asyncio.create_task(run_timed_stage_async(call_gemini_analysis, resume_text, job_description))
+    template_task = asyncio.create_task(run_timed_stage_async(call_gemini_template_selector, resume_text, job_description))
+
+    analysis, stages["analysis"] = await analysis_task
+
+    suggestions_task = None
+    draft_task = None
+    if analysis:
+        keyword_gaps = analysis.get('feedback', {}).get('keyword_gaps', [])
+        if include_suggestions and keyword_gaps:
+            suggestions_task = asyncio.create_task(run_timed_stage_async(
+                call_gemini_skill_suggester, resume_text, job_description, keyword_gaps
+            ))
+        if include_draft:
+            draft_task = asyncio.create_task(run_timed_stage_async(
+                call_gemini_initial_draft, resume_text, job_description, analysis
+            ))
+
+    template, stages["template"] = await template_task
+    suggestions = None
+    if suggestions_task:
+        suggestions, stages["suggestions"] = await suggestions_task
+    draft = None
+    if draft_task:
+        draft, stages["draft"] = await draft_task
+
+    return full_report_body(analysis, template, suggestions, draft, stages, start)
+
+@api.route('/full_report', methods=['POST'])
+@async_job_capable
+def full_report():
+    try:
+        data = request.get_json()
+        resume_text = resolve_resume_text(data)
+        job_description = data.get('job_description', '')
+
+        if not resume_text or not job_description:
+            return jsonify({"error": "Both resume and job description are required."}), 400
+
+        report = run_full_report(
+            resume_text,
+            job_description,
+            include_suggestions=data.get('include_suggestions', True),
+            include_draft=data.get('include_draft', True)
+        )
+        # Without the analysis nothing downstream could run, so treat it as a failed request.
+        if report["analysis"] is None:
+            analysis_stage = report['timings']['stages']['analysis']
+            if analysis_stage.get('retry_after'):
+                return rate_limited_response(RateLimitExceeded(analysis_stage['error'], analysis_stage['retry_after']))
+            return jsonify({"error": f"AI Server Error: {report['timings']['stages']['analysis']['error']}", **report}), 500
+        return jsonify(report), 200
+
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        log_event("An error occurred during full report generation", level="error", error=str(e))
+        return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
+
+@api.route('/quick_score', methods=['POST'])
+def quick_score_route():
+    data = request.get_json()
+    resume_text = resolve_resume_text(data)
+    job_description = data.get('job_description', '')
+
+    if not resume_text or not job_description:
+        return jsonify({"error": "Both resume and job description are required."}), 400
+
+    return jsonify(quick_score(resume_text, job_description)), 200
+
+@api.route('/analyze_resume', methods=['POST'])
+@async_job_capable
 def analyze_resume():
     try:
         data = request.get_json()
-        resume_text = data.get('resume', '')
+        resume_text = resolve_resume_text(data)
         job_description = data.get('job_description', '')
 
         if not resume_text or not job_description:
@@ -601,11 +2001,116 @@ def analyze_resume():
         analysis_result = call_gemini_analysis(resume_text, job_description)
         return jsonify(analysis_result), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during analysis: {e}")
+        log_event("An error occurred during analysis", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
-@app.route('/generate_bullet_points', methods=['POST'])
+@api.route('/analyze_resume/stream', methods=['POST'])
+def analyze_resume_stream():
+    data = request.get_json()
+    resume_text = resolve_resume_text(data)
+    job_description = data.get('job_description', '')
+
+    if not resume_text or not job_description:
+        return jsonify({"error": "Both resume and job description are required."}), 400
+
+    local_scan = quick_score(resume_text, job_description) if ANALYSIS_LOCAL_PREFILTER else None
+    payload = build_analysis_payload(resume_text, job_description, local_scan)
+    return sse_response(stream_gemini_events(
+        payload,
+        "ANALYSIS_SCHEMA",
+        field_names=["ats_score", "keyword_gaps", "keyword_strengths", "content_improvements", "formatting_advice"]
+    ))
+
+@api.route('/analyze_resume/incremental', methods=['POST'])
+@async_job_capable
+def analyze_resume_incremental():
+    try:
+        data = request.get_json()
+        resume_text = resolve_resume_text(data)
+        job_description = data.get('job_description', '')
+
+        if not resume_text or not job_description:
+            return jsonify({"error": "Both resume and job description are required."}), 400
+
+        analysis_result = run_incremental_analysis(resume_text, job_description)
+        return jsonify(analysis_result), 200
+
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        log_event("An error occurred during incremental analysis", level="error", error=str(e))
+        return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
+
+@api.route('/analyze_batch', methods=['POST'])
+@async_job_capable
+def analyze_batch():
+    try:
+        data = request.get_json()
+        try:
+            mode, shared_text, items = parse_batch_request(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        start = time.perf_counter()
+        results = rank_results(list(iter_batch_results(mode, shared_text, items)))
+        succeeded = sum(1 for item in results if item['status'] == 'ok')
+        body = {
+            "mode": mode,
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+        if not succeeded:
+            retry_after = max((item.get('retry_after', 0) for item in results), default=0)
+            if retry_after:
+                return rate_limited_response(RateLimitExceeded(results[0]['error'], retry_after))
+            return jsonify({"error": f"AI Server Error: {results[0]['error']}", **body}), 500
+        return jsonify(body), 200
+
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        log_event("An error occurred during batch analysis", level="error", error=str(e))
+        return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
+
+@api.route('/analyze_batch/stream', methods=['POST'])
+def analyze_batch_stream():
+    """
+    SSE version of /analyze_batch: an 'item' event per resume/JD pair as it finishes,
+    then a 'result' event with every item ranked by ats_score.
+    """
+    data = request.get_json()
+    try:
+        mode, shared_text, items = parse_batch_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def events():
+        completed = []
+        try:
+            for item in iter_batch_results(mode, shared_text, items):
+                completed.append(item)
+                yield sse_event("item", item)
+        except Exception as e:
+            log_event("An error occurred during batch analysis", level="error", error=str(e))
+            yield sse_event("error", {"error": f"AI Server Error: {str(e)}"})
+            return
+        succeeded = sum(1 for item in completed if item['status'] == 'ok')
+        yield sse_event("result", {
+            "mode": mode,
+            "results": rank_results(completed),
+            "succeeded": succeeded,
+            "failed": len(completed) - succeeded
+        })
+
+    return sse_response(events())
+
+@api.route('/generate_bullet_points', methods=['POST'])
+@async_job_capable
 def generate_bullet_points():
     try:
         data = request.get_json()
@@ -618,15 +2123,18 @@ def generate_bullet_points():
         generation_result = call_gemini_bullet_generator(job_title, task_description)
         return jsonify(generation_result), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during bullet generation: {e}")
+        log_event("An error occurred during bullet generation", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
-@app.route('/suggest_skill_bullets', methods=['POST'])
+@api.route('/suggest_skill_bullets', methods=['POST'])
+@async_job_capable
 def suggest_skill_bullets():
     try:
         data = request.get_json()
-        resume_text = data.get('resume', '')
+        resume_text = resolve_resume_text(data)
         job_description = data.get('job_description', '')
         keyword_gaps = data.get('keyword_gaps', [])
 
@@ -636,15 +2144,18 @@ def suggest_skill_bullets():
         generation_result = call_gemini_skill_suggester(resume_text, job_description, keyword_gaps)
         return jsonify({"suggestions": generation_result}), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during skill suggestion generation: {e}")
+        log_event("An error occurred during skill suggestion generation", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
-@app.route('/recommend_template', methods=['POST'])
+@api.route('/recommend_template', methods=['POST'])
+@async_job_capable
 def recommend_template():
     try:
         data = request.get_json()
-        resume_text = data.get('resume', '')
+        resume_text = resolve_resume_text(data)
         job_description = data.get('job_description', '')
 
         if not resume_text or not job_description:
@@ -653,15 +2164,18 @@ def recommend_template():
         recommendations = call_gemini_template_selector(resume_text, job_description)
         return jsonify(recommendations), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during template recommendation: {e}")
+        log_event("An error occurred during template recommendation", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
-@app.route('/generate_initial_draft', methods=['POST'])
+@api.route('/generate_initial_draft', methods=['POST'])
+@async_job_capable
 def generate_initial_draft():
     try:
         data = request.get_json()
-        resume_text = data.get('resume', '')
+        resume_text = resolve_resume_text(data)
         job_description = data.get('job_description', '')
         analysis_result = data.get('analysis_result', {})
 
@@ -671,11 +2185,27 @@ def generate_initial_draft():
         draft_result = call_gemini_initial_draft(resume_text, job_description, analysis_result)
         return jsonify(draft_result), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during draft generation: {e}")
+        log_event("An error occurred during draft generation", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
-@app.route('/refine_section', methods=['POST'])
+@api.route('/generate_initial_draft/stream', methods=['POST'])
+def generate_initial_draft_stream():
+    data = request.get_json()
+    resume_text = resolve_resume_text(data)
+    job_description = data.get('job_description', '')
+    analysis_result = data.get('analysis_result', {})
+
+    if not resume_text or not job_description or not analysis_result:
+        return jsonify({"error": "Resume, JD, and Analysis are required."}), 400
+
+    payload = build_initial_draft_payload(resume_text, job_description, analysis_result)
+    return sse_response(stream_gemini_events(payload, "INITIAL_DRAFT_SCHEMA", text_field="modified_draft"))
+
+@api.route('/refine_section', methods=['POST'])
+@async_job_capable
 def refine_section():
     try:
         data = request.get_json()
@@ -688,10 +2218,41 @@ def refine_section():
         refinement_result = call_gemini_section_refiner(section_text, job_description)
         return jsonify(refinement_result), 200
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"An error occurred during section refinement: {e}")
+        log_event("An error occurred during section refinement", level="error", error=str(e))
         return jsonify({"error": f"AI Server Error: {str(e)}"}), 500
 
+def warm_up():
+    """
+    Builds the lazy resources and imports the Gemini SDK ahead of the first request.
+    gunicorn.conf.py runs it in a background thread right after each worker forks.
+    """
+    start = time.perf_counter()
+    for resource in (db, llm_cache, document_cache, gemini_governor, job_queue):
+        try:
+            resource.resolve()
+        except Exception as e:
+            log_event("Warm-up step failed; it will be retried on first use", level="warning", error=str(e))
+    model_registry.configure()
+    log_event("Worker warmed up", duration_ms=round((time.perf_counter() - start) * 1000, 1))
+
+def create_app():
+    """
+    Builds the Flask app. Cheap by design: no network, no Mongo, no Gemini SDK import.
+    Those happen on first use or in warm_up().
+    """
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    # Werkzeug rejects larger bodies with 413 before they are read; keep small headroom for multipart framing.
+    flask_app.config['MAX_CONTENT_LENGTH'] = extraction_limits.max_bytes + 64 * 1024
+    flask_app.register_blueprint(api)
+    return flask_app
+
+# Module-level app for `gunicorn app:app` and `python app.py`
+app = create_app()
+
 if __name__ == "__main__":
     port = 5000
     if os.getenv("FLASK_ENV") == "production":
@@ -702,5 +2263,3 @@ if __name__ == "__main__":
         port=port,
         debug=False
     )
-
-
@@ -0,0 +1,221 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from functools import wraps
+from json import JSONDecodeError
+from urllib.parse import parse_qs
+from a2wsgi import WSGIMiddleware
+from starlette.routing import Router, Route
+from starlette.responses import JSONResponse
+from starlette.middleware.cors import CORSMiddleware
+from app import (
+    app as flask_app, warm_up, resolve_resume_text, call_gemini_async, run_full_report_async,
+    call_gemini_analysis, call_gemini_bullet_generator, call_gemini_skill_suggester,
+    call_gemini_template_selector, call_gemini_initial_draft, call_gemini_section_refiner,
+    start_deadline, RateLimitExceeded, TRACE_ALL_REQUESTS
+)
+from observability import (
+    log_event, server_timing, new_request_id, current_route, current_request_id, current_trace, REQUEST_SECONDS
+)
+
+# Async serving mode:
+#   uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+#
+# The JSON AI routes below run as coroutines: Gemini calls use generate_content_async and
+# retries back off with asyncio.sleep, so one process can hold hundreds of calls in flight
+# (raise GEMINI_MAX_IN_FLIGHT to match). Every other route, and AI routes asked to run as
+# background jobs, go to the Flask app through a2wsgi on ASGI_WSGI_THREADS threads.
+# `gunicorn app:app` keeps serving everything synchronously, as before.
+
+MAX_BODY_BYTES = flask_app.config['MAX_CONTENT_LENGTH']
+
+
+def native_route(description):
+    """
+    Turns an async handler(data) -> (body, status) into a Starlette endpoint doing what the
+    Flask side gets from its before/after request hooks and each route's try/except.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def endpoint(request):
+            current_route.set(handler.__name__)
+            start_deadline(handler.__name__)
+            current_request_id.set(request.headers.get('X-Request-ID') or new_request_id())
+            tracing = TRACE_ALL_REQUESTS or request.headers.get('X-Trace') == '1'
+            current_trace.set([] if tracing else None)
+            started = time.perf_counter()
+
+            headers = None
+            try:
+                if int(request.headers.get('content-length') or 0) > MAX_BODY_BYTES:
+                    body, status = {"error": "Request body is too large."}, 413
+                else:
+                    body, status = await handler(await request.json())
+            except (JSONDecodeError, UnicodeDecodeError):
+                body, status = {"error": "Request body must be JSON."}, 400
+            except RateLimitExceeded as e:
+                body, status = {"error": str(e), "retry_after": e.retry_after}, 503
+                headers = {'Retry-After': str(e.retry_after)}
+            except Exception as e:
+                log_event(f"An error occurred during {description}", level="error", error=str(e))
+                body, status = {"error": f"AI Server Error: {str(e)}"}, 500
+
+            response = JSONResponse(body, status_code=status, headers=headers)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started, route=handler.__name__, method=request.method, status=status
+            )
+            trace = current_trace.get()
+            if trace is not None:
+                response.headers['X-Request-ID'] = current_request_id.get()
+                if trace:
+                    response.headers['Server-Timing'] = server_timing(trace)
+            return response
+        return endpoint
+    return decorator
+
+
+async def resolve_resume_text_async(data):
+    # Only resume_hash lookups touch the document cache (SQLite or Mongo).
+    if data.get('resume') or not data.get('resume_hash'):
+        return data.get('resume', '')
+    return await asyncio.to_thread(resolve_resume_text, data)
+
+
+@native_route("analysis")
+async def analyze_resume(data):
+    resume_text = await resolve_resume_text_async(data)
+    job_description = data.get('job_description', '')
+
+    if not resume_text or not job_description:
+        return {"error": "Both resume and job description are required."}, 400
+
+    return await call_gemini_analysis(resume_text, job_description, call_gemini=call_gemini_async), 200
+
+
+@native_route("full report generation")
+async def full_report(data):
+    resume_text = await resolve_resume_text_async(data)
+    job_description = data.get('job_description', '')
+
+    if not resume_text or not job_description:
+        return {"error": "Both resume and job description are required."}, 400
+
+    report = await run_full_report_async(
+        resume_text,
+        job_description,
+        include_suggestions=data.get('include_suggestions', True),
+        include_draft=data.get('include_draft', True)
+    )
+    # Without the analysis nothing downstream could run, so treat it as a failed request.
+    if report["analysis"] is None:
+        analysis_stage = report['timings']['stages']['analysis']
+        if analysis_stage.get('retry_after'):
+            raise RateLimitExceeded(analysis_stage['error'], analysis_stage['retry_after'])
+        return {"error": f"AI Server Error: {analysis_stage['error']}", **report}, 500
+    return report, 200
+
+
+@native_route("bullet generation")
+async def generate_bullet_points(data):
+    job_title = data.get('job_title', '').strip()
+    task_description = data.get('task_description', '').strip()
+
+    if not job_title or not task_description:
+        return {"error": "Both job title and task description are required."}, 400
+
+    return await call_gemini_bullet_generator(job_title, task_description, call_gemini=call_gemini_async), 200
+
+
+@native_route("skill suggestion generation")
+async def suggest_skill_bullets(data):
+    resume_text = await resolve_resume_text_async(data)
+    job_description = data.get('job_description', '')
+    keyword_gaps = data.get('keyword_gaps', [])
+
+    if not resume_text or not job_description or not keyword_gaps:
+        return {"error": "Resume, job description, and keyword gaps are required for targeted suggestions."}, 400
+
+    suggestions = await call_gemini_skill_suggester(
+        resume_text, job_description, keyword_gaps, call_gemini=call_gemini_async
+    )
+    return {"suggestions": suggestions}, 200
+
+
+@native_route("template recommendation")
+async def recommend_template(data):
+    resume_text = await resolve_resume_text_async(data)
+    job_description = data.get('job_description', '')
+
+    if not resume_text or not job_description:
+        return {"error": "Both resume and job description are required."}, 400
+
+    return await call_gemini_template_selector(resume_text, job_description, call_gemini=call_gemini_async), 200
+
+
+@native_route("draft generation")
+async def generate_initial_draft(data):
+    resume_text = await resolve_resume_text_async(data)
+    job_description = data.get('job_description', '')
+    analysis_result = data.get('analysis_result', {})
+
+    if not resume_text or not job_description or not analysis_result:
+        return {"error": "Resume, JD, and Analysis are required."}, 400
+
+    return await call_gemini_initial_draft(
+        resume_text, job_description, analysis_result, call_gemini=call_gemini_async
+    ), 200
+
+
+@native_route("section refinement")
+async def refine_section(data):
+    section_text = data.get('section_text', '')
+    job_description = data.get('job_description', '')
+
+    if not section_text or not job_description:
+        return {"error": "Section text and job description are required."}, 400
+
+    return await call_gemini_section_refiner(section_text, job_description, call_gemini=call_gemini_async), 200
+
+
+NATIVE_ROUTES = [
+    Route('/analyze_resume', analyze_resume, methods=['POST']),
+    Route('/full_report', full_report, methods=['POST']),
+    Route('/generate_bullet_points', generate_bullet_points, methods=['POST']),
+    Route('/suggest_skill_bullets', suggest_skill_bullets, methods=['POST']),
+    Route('/recommend_template', recommend_template, methods=['POST']),
+    Route('/generate_initial_draft', generate_initial_draft, methods=['POST']),
+    Route('/refine_section', refine_section, methods=['POST']),
+]
+NATIVE_PATHS = {route.path for route in NATIVE_ROUTES}
+
+
+@asynccontextmanager
+async def lifespan(_):
+    # Same idea as gunicorn.conf.py's post_worker_init: start serving now, warm up alongside.
+    asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+
+
+def wants_job(scope):
+    """app.wants_async() for a raw ASGI scope: these requests go to Flask, which owns the job queue."""
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if query.get('async', [''])[0].lower() in ('1', 'true', 'yes'):
+        return True
+    return any(name == b'prefer' and b'respond-async' in value for name, value in scope['headers'])
+
+
+native_app = CORSMiddleware(
+    Router(routes=NATIVE_ROUTES, lifespan=lifespan),
+    allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
+)
+wsgi_app = WSGIMiddleware(flask_app, workers=int(os.environ.get("ASGI_WSGI_THREADS", 10)))
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan' or (
+        scope['type'] == 'http' and scope['path'] in NATIVE_PATHS and not wants_job(scope)
+    ):
+        await native_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -0,0 +1,253 @@
+import re
+from collections import Counter
+
+# Canonical skill -> aliases seen in resumes and job postings.
+SKILL_SYNONYMS = {
+    "python": ["python3"],
+    "java": [],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": [],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "golang": ["go lang"],
+    "rust": [],
+    "sql": ["t-sql", "pl/sql"],
+    "nosql": [],
+    "react": ["react.js", "reactjs"],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vue.js", "vuejs"],
+    "node.js": ["nodejs"],
+    "express": ["express.js", "expressjs"],
+    "django": [],
+    "flask": [],
+    "fastapi": [],
+    "spring boot": ["spring framework"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "tailwind css": ["tailwind"],
+    "rest api": ["restful", "restful api", "rest apis", "restful apis", "restful services"],
+    "graphql": [],
+    "microservices": ["microservice", "micro-services"],
+    "mongodb": ["mongo"],
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "redis": [],
+    "elasticsearch": ["elastic search"],
+    "kafka": ["apache kafka"],
+    "spark": ["apache spark", "pyspark"],
+    "hadoop": [],
+    "airflow": ["apache airflow"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "terraform": [],
+    "ci/cd": ["cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "jenkins": [],
+    "github actions": [],
+    "git": ["github", "gitlab"],
+    "linux": [],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "artificial intelligence": [],
+    "natural language processing": ["nlp"],
+    "computer vision": [],
+    "large language models": ["llm", "llms"],
+    "tensorflow": [],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pandas": [],
+    "numpy": [],
+    "data analysis": ["data analytics"],
+    "data visualization": [],
+    "tableau": [],
+    "power bi": ["powerbi"],
+    "excel": ["microsoft excel"],
+    "statistics": ["statistical analysis"],
+    "a/b testing": ["ab testing", "a/b tests"],
+    "etl": [],
+    "unit testing": ["unit tests", "pytest", "junit", "jest"],
+    "test automation": ["automated testing", "selenium", "cypress"],
+    "agile": ["scrum", "kanban"],
+    "jira": [],
+    "system design": [],
+    "distributed systems": [],
+    "data structures": [],
+    "algorithms": [],
+    "object-oriented programming": ["oop", "object oriented"],
+    "security": ["cybersecurity", "application security"],
+    "project management": [],
+    "product management": [],
+    "stakeholder management": [],
+    "communication": ["communication skills", "verbal communication", "written communication"],
+    "leadership": ["team lead", "led a team", "mentoring", "mentored"],
+    "problem solving": ["problem-solving"],
+    "collaboration": ["cross-functional", "teamwork"],
+    "figma": [],
+    "ux design": ["user experience", "ux"],
+    "ui design": ["user interface"],
+    "seo": ["search engine optimization"],
+    "salesforce": [],
+    "financial modeling": ["financial modelling"],
+}
+
+# Skill -> generic phrases that only hint at it. One-way: a resume saying "containers" is partial
+# evidence for a posting that asks for Docker, but it is never reported as Docker, and a posting
+# saying "containers" doesn't ask for Docker.
+RELATED_EVIDENCE = {
+    "docker": ["containers", "containerization"],
+    "node.js": ["node"],
+    "git": ["version control"],
+    "linux": ["unix"],
+    "artificial intelligence": ["ai"],
+    "data visualization": ["dashboards", "dashboarding"],
+    "excel": ["spreadsheets"],
+    "a/b testing": ["experimentation"],
+    "etl": ["data pipelines", "data pipeline"],
+    "system design": ["distributed systems"],
+    "data structures": ["algorithms"],
+    "project management": ["program management"],
+    "stakeholder management": ["stakeholders"],
+    "salesforce": ["crm"],
+}
+
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each etc few for from further had has have having he her
+here hers him his how i if in into is it its itself just me more most my no nor not now of off on once only
+or other our ours out over own same she should so some such than that the their theirs them then there these
+they this those through to too under until up very was we were what when where which while who whom why will
+with would you your yours
+""".split())
+
+# Words that appear in almost every posting and say nothing about fit.
+POSTING_BOILERPLATE = set("""
+ability able apply applicant applicants benefits best candidate candidates company competitive culture
+environment equal employer excellent experience experienced familiarity full great ideal including job join
+looking must opportunity plus position preferred qualifications related required requirements responsibilities
+role salary strong team time work working years year skills skill knowledge understanding etc new using use
+well within across help build develop ensure support provide based including highly
+""".split())
+
+# Fixed weights, not corpus statistics: repeats saturate, and a dictionary skill the posting asks
+# for counts more than a plain content word. A generic hint covers RELATED_CREDIT of its skill.
+TF_SATURATION = 1.2
+SKILL_WEIGHT = 2.5
+TERM_WEIGHT = 1.0
+RELATED_CREDIT = 0.5
+MAX_NGRAM = 3
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def normalize(text):
+    return (text or "").lower().replace("’", "'")
+
+
+def _raw_tokens(text):
+    # Trailing sentence dots shouldn't glue onto words, but keep "node.js" intact.
+    return [t.rstrip('.') for t in _TOKEN_PATTERN.findall(normalize(text)) if t.rstrip('.')]
+
+
+def _build_alias_index(synonyms, include_canonical=True):
+    index = {}
+    for canonical, aliases in synonyms.items():
+        for phrase in ([canonical] if include_canonical else []) + aliases:
+            index[tuple(_raw_tokens(phrase))] = canonical
+    return index
+
+
+ALIAS_INDEX = _build_alias_index(SKILL_SYNONYMS)
+RELATED_INDEX = _build_alias_index(RELATED_EVIDENCE, include_canonical=False)
+SKILL_TOKENS = {token for gram in ALIAS_INDEX for token in gram}
+
+
+def tokenize(text):
+    tokens = []
+    for token in _raw_tokens(text):
+        # "python/django" is two skills, but "ci/cd" and "a/b" are one.
+        if '/' in token and token not in SKILL_TOKENS:
+            tokens.extend(part for part in token.split('/') if part)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def extract_skills(tokens, index=ALIAS_INDEX):
+    """Counts canonical skills found as 1..MAX_NGRAM-grams of `index`, longest match first."""
+    found = Counter()
+    i = 0
+    while i < len(tokens):
+        for n in range(MAX_NGRAM, 0, -1):
+            gram = tuple(tokens[i:i + n])
+            if len(gram) == n and gram in index:
+                found[index[gram]] += 1
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def extract_terms(tokens):
+    """Content words outside the skills dictionary, for postings that use domain vocabulary."""
+    return Counter(
+        t for t in tokens
+        if t not in STOPWORDS and t not in POSTING_BOILERPLATE and len(t) > 2 and not t.isdigit()
+    )
+
+
+def _saturated_weight(tf, weight):
+    return weight * (tf * (TF_SATURATION + 1)) / (tf + TF_SATURATION)
+
+
+def quick_score(resume_text, job_description, max_terms=25):
+    """
+    Millisecond, deterministic ATS-style match score.
+    JD skills and terms get fixed weights with saturating term frequency (dictionary skills above
+    plain terms); the score is the weighted share found in the resume. A skill the resume only
+    hints at through RELATED_EVIDENCE earns partial credit and stays a keyword gap.
+    Returns the same shape as the analysis's ats_score / keyword_gaps / keyword_strengths.
+    """
+    resume_tokens = tokenize(resume_text)
+    jd_tokens = tokenize(job_description)
+
+    resume_skills = extract_skills(resume_tokens)
+    resume_related = extract_skills(resume_tokens, RELATED_INDEX)
+    jd_skills = extract_skills(jd_tokens)
+    resume_vocab = set(resume_tokens)
+
+    jd_terms = extract_terms(t for t in jd_tokens if t not in SKILL_TOKENS)
+
+    weights = {}
+    for skill, tf in jd_skills.items():
+        weights[("skill", skill)] = _saturated_weight(tf, SKILL_WEIGHT)
+    for term, tf in jd_terms.most_common(max_terms):
+        weights[("term", term)] = _saturated_weight(tf, TERM_WEIGHT)
+
+    total = sum(weights.values())
+    matched = 0.0
+    gaps = []
+    strengths = []
+    for (kind, name), weight in sorted(weights.items(), key=lambda item: -item[1]):
+        present = resume_skills.get(name) if kind == "skill" else name in resume_vocab
+        if present:
+            matched += weight
+            if kind == "skill":
+                strengths.append(name)
+        elif kind == "skill":
+            if resume_related.get(name):
+                matched += weight * RELATED_CREDIT
+            gaps.append(name)
+
+    coverage = matched / total if total else 0.0
+    return {
+        "ats_score": max(1, min(100, int(round(coverage * 100)))),
+        "feedback": {
+            "keyword_gaps": gaps,
+            "keyword_strengths": strengths
+        },
+        "coverage": round(coverage, 4),
+        "engine": "local"
+    }
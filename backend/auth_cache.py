@@ -0,0 +1,45 @@
+import time
+import threading
+
+USER_DELETED = -1
+
+
+class UserStateCache:
+    """
+    Per-process TTL cache of each user's current token_version, so authenticated
+    requests can be verified from signed JWT claims alone. The loader (a Mongo
+    lookup) only runs when an entry is missing or has expired, which bounds how
+    long a revoked token keeps working on other workers to the TTL.
+    """
+
+    def __init__(self, loader, ttl=60, max_entries=10000):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def token_version(self, user_id):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        version = self.loader(user_id)
+        self.set(user_id, version)
+        return version
+
+    def set(self, user_id, version):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Cheap bound: drop expired entries, or everything if none have expired.
+                now = time.time()
+                self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user_id] = (version, time.time() + self.ttl)
+
+    def is_revoked(self, user_id, token_version):
+        current = self.token_version(user_id)
+        return current == USER_DELETED or token_version < current
@@ -0,0 +1,58 @@
+from concurrent.futures import wait, FIRST_COMPLETED
+
+# Which side of the resume/JD pair varies across the batch.
+MODE_JOB_DESCRIPTIONS = "job_descriptions"
+MODE_RESUMES = "resumes"
+
+
+def pack_batches(items, shared_chars, max_chars, max_items):
+    """
+    Greedily groups (index, text) items so each group fits one prompt: the shared
+    document counts once per group, and a group holds at most max_items items.
+    An item too large to share a prompt gets a group of its own.
+    """
+    groups = []
+    current = []
+    size = shared_chars
+    for index, text in items:
+        if current and (len(current) >= max_items or size + len(text) > max_chars):
+            groups.append(current)
+            current = []
+            size = shared_chars
+        current.append((index, text))
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def run_bounded(executor, calls, limit):
+    """
+    Submits (fn, *args) calls to executor with at most `limit` in flight and
+    yields each result as soon as it finishes.
+    """
+    pending = set()
+    for fn, *args in calls:
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, *args))
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def rank_results(items):
+    """Successful items by ats_score (best first), then failures in input order."""
+    succeeded = sorted(
+        (item for item in items if item['status'] == 'ok'),
+        key=lambda item: (-item['ats_score'], item['index'])
+    )
+    failed = sorted((item for item in items if item['status'] != 'ok'), key=lambda item: item['index'])
+    ranked = []
+    for rank, item in enumerate(succeeded, start=1):
+        ranked.append({**item, "rank": rank})
+    ranked.extend(failed)
+    return ranked
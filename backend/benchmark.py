@@ -0,0 +1,937 @@
+import io
+import os
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Offline load test for every route in app.py.
+# Gemini is replaced by a local fake with configurable latency, error rate and 429
+# injection that returns schema-valid JSON; Mongo is mongomock (or --mongo-uri for a
+# local mongod). Nothing leaves the machine.
+#
+# Usage:
+#   python benchmark.py [--concurrency 8] [--requests 200] [--routes analyze_resume,full_report]
+#                       [--latency lognormal:1.2,4] [--error-rate 0.02] [--rate-429 0.01] [--hang-rate 0.01]
+#                       [--malformed-rate 0.05]
+#                       [--output bench_results.json]
+#   python benchmark.py --gunicorn-workers 4 --threads 8    # same, through a real gunicorn
+#   python benchmark.py --asgi-workers 1                     # same, through uvicorn + asgi.py
+#   python benchmark.py --url http://127.0.0.1:8000         # against a server you started with
+#       BENCH_FAKE_CONFIG='{...}' gunicorn 'benchmark:fake_app()'
+#   python benchmark.py --startup 5                          # cold start: import + first-request latency
+#   python benchmark.py --jd-index 100000                    # near-duplicate JD index: lookup latency and recall
+#
+# Latency specs: fixed:S | uniform:LOW,HIGH | lognormal:MEDIAN,P95 (seconds).
+# --schema-latency INITIAL_DRAFT_SCHEMA=lognormal:4,9 overrides one schema (repeatable).
+
+SAMPLE_RESUME = """Jane Doe
+jane@example.com | github.com/janedoe
+
+Summary
+Backend engineer with 6 years building Python services and data pipelines.
+
+Experience
+Senior Software Engineer, Acme Corp (2020 - present)
+- Built REST APIs in Flask and FastAPI serving 2M requests/day
+- Moved batch ETL to Airflow and cut nightly runtime by 40%
+- Led a team of 4 engineers through a Kubernetes migration
+
+Software Engineer, Beta Inc (2017 - 2020)
+- Developed microservices in Python and Go backed by PostgreSQL and Redis
+- Introduced CI/CD with GitHub Actions and unit testing with pytest
+
+Skills
+Python, Go, SQL, Flask, FastAPI, PostgreSQL, MongoDB, Redis, Docker, Kubernetes, AWS, Airflow
+
+Education
+B.S. Computer Science, State University
+"""
+
+SAMPLE_JD = """Senior Backend Engineer
+
+About us
+We build hiring tools used by thousands of companies.
+
+Requirements
+- 5+ years of Python experience building production APIs
+- Strong SQL and PostgreSQL skills; MongoDB a plus
+- Docker, Kubernetes and AWS in production
+- Experience with Kafka or other streaming systems
+
+Responsibilities
+- Design and own backend services end to end
+- Mentor engineers and lead technical design reviews
+
+We are an equal opportunity employer.
+"""
+
+FAKE_DEFAULTS = {
+    "latency": "lognormal:0.8,2.5",
+    "schema_latency": {},
+    "error_rate": 0.0,
+    "rate_429": 0.0,
+    "hang_rate": 0.0,
+    "hang_seconds": 60.0,
+    "malformed_rate": 0.0,
+    "seed": None,
+}
+
+
+# ---------------------------------------------------------------- fake Gemini
+
+def parse_latency(spec):
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, p95 = values
+        sigma = math.log(p95 / median) / 1.645 if p95 > median else 0.0
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def fake_value(schema, rng, name=""):
+    """Random value that satisfies a Gemini response_schema."""
+    kind = schema.get("type", "STRING").upper()
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "OBJECT":
+        return {key: fake_value(sub, rng, key) for key, sub in schema.get("properties", {}).items()}
+    if kind == "ARRAY":
+        return [fake_value(schema.get("items", {}), rng, name) for _ in range(rng.randint(1, 4))]
+    if kind == "INTEGER":
+        return rng.randint(1, 100)
+    if kind == "NUMBER":
+        return round(rng.uniform(0, 100), 2)
+    if kind == "BOOLEAN":
+        return rng.random() < 0.5
+    words = ["python", "kubernetes", "led", "migration", "reduced", "latency", "by", "40%", "team", "api"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(3, 12 if name != "modified_draft" else 200)))
+
+
+def fake_response(user_message, schema, rng):
+    value = fake_value(schema or {"type": "OBJECT"}, rng)
+    # Packed calls (batch analyses, resume sections) must answer for the numbered items they were given.
+    for key, prop in (schema or {}).get("properties", {}).items():
+        item_schema = prop.get("items", {})
+        if "index" in item_schema.get("properties", {}):
+            numbers = [int(n) for n in re.findall(r"(?:Job Description|Resume|Resume Section) (\d+)\b", user_message)]
+            value[key] = [{**fake_value(item_schema, rng), "index": n} for n in numbers]
+    return json.dumps(value)
+
+
+def damage_response(text, rng):
+    """Schema-breaking output of the kinds Gemini does return: fenced, cut off, out of range, incomplete."""
+    kind = rng.choice(("fenced", "truncated", "out_of_range", "missing_field"))
+    if kind == "fenced":
+        return f"```json\n{text}\n```"
+    if kind == "truncated":
+        return text[:max(1, int(len(text) * rng.uniform(0.5, 0.95)))]
+    value = json.loads(text)
+    if not isinstance(value, dict):
+        return text
+    scalars = [key for key, item in value.items() if not isinstance(item, (list, dict))]
+    if kind == "out_of_range" and "ats_score" in value:
+        value["ats_score"] = rng.choice([0, 140, "85%"])
+    elif kind == "missing_field" and scalars and len(value) > 1:
+        del value[rng.choice(scalars)]
+    return json.dumps(value)
+
+
+class _FakeUsage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+
+
+class _FakeResponse:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+def install_fake_gemini(config):
+    """Swaps google.generativeai's model class for a local fake. Call before importing app."""
+    import google.generativeai as genai
+    from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, DeadlineExceeded
+
+    config = {**FAKE_DEFAULTS, **config}
+    default_latency = parse_latency(config["latency"])
+    schema_latency = {name: parse_latency(spec) for name, spec in config["schema_latency"].items()}
+    seed_rng = random.Random(config["seed"])
+    local = threading.local()
+
+    def rng():
+        if not hasattr(local, "rng"):
+            local.rng = random.Random(seed_rng.random())
+        return local.rng
+
+    def schema_name_for(schema):
+        # Match the response_schema back to its *_SCHEMA name for per-schema latency.
+        import app as app_module
+        for name in schema_latency:
+            if getattr(app_module, name, None) is schema:
+                return name
+        return None
+
+    class FakeGenerativeModel:
+        def __init__(self, model_name=None, system_instruction=None, **kwargs):
+            self.model_name = model_name
+            self.system_instruction = system_instruction or ""
+
+        def _plan(self, user_message, generation_config, request_options):
+            """(delay, error to raise after it, response text, usage) for one call."""
+            r = rng()
+            schema = (generation_config or {}).get("response_schema")
+            latency = schema_latency.get(schema_name_for(schema), default_latency) if schema_latency else default_latency
+            delay = max(0.0, latency(r))
+            if r.random() < config["hang_rate"]:
+                delay = config["hang_seconds"]
+            timeout = (request_options or {}).get("timeout")
+            if timeout and delay > timeout:
+                return timeout, DeadlineExceeded("fake timeout: no response within the request timeout"), None, None
+            roll = r.random()
+            if roll < config["rate_429"]:
+                return min(delay, 0.05), ResourceExhausted("fake 429: quota exceeded"), None, None
+            if roll < config["rate_429"] + config["error_rate"]:
+                return delay / 2, ServiceUnavailable("fake 503: backend error"), None, None
+            text = fake_response(user_message, schema, r)
+            if r.random() < config["malformed_rate"]:
+                text = damage_response(text, r)
+            usage = _FakeUsage((len(self.system_instruction) + len(user_message)) // 4 + 1, len(text) // 4 + 1)
+            return delay, None, text, usage
+
+        def generate_content(self, user_message, generation_config=None, stream=False, request_options=None, **kwargs):
+            delay, error, text, usage = self._plan(user_message, generation_config, request_options)
+            if error:
+                time.sleep(delay)
+                raise error
+            if not stream:
+                time.sleep(delay)
+                return _FakeResponse(text, usage)
+
+            def chunks():
+                pieces = [text[i:i + 40] for i in range(0, len(text), 40)] or [""]
+                for i, piece in enumerate(pieces):
+                    time.sleep(delay / len(pieces))
+                    yield _FakeResponse(piece, usage if i == len(pieces) - 1 else None)
+            return chunks()
+
+        async def generate_content_async(self, user_message, generation_config=None, request_options=None, **kwargs):
+            import asyncio
+            delay, error, text, usage = self._plan(user_message, generation_config, request_options)
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            return _FakeResponse(text, usage)
+
+    genai.GenerativeModel = FakeGenerativeModel
+    genai.configure = lambda **kwargs: None
+
+
+def install_local_mongo(mongo_uri=None):
+    """mongomock in place of MongoClient unless a local mongod URI is given."""
+    if mongo_uri:
+        os.environ["MONGO_URI"] = mongo_uri
+        return
+    try:
+        import mongomock
+    except ImportError:
+        print("❌ mongomock is not installed (pip install -r requirements-dev.txt), or pass --mongo-uri mongodb://localhost")
+        sys.exit(1)
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+
+
+def bench_environment(workdir):
+    """Process-local backends and generous Gemini quotas so the fake, not the limiter, is measured."""
+    defaults = {
+        "GEMINI_API_KEY": "offline-benchmark",
+        "JWT_SECRET": "offline-benchmark-secret-" + "x" * 16,
+        "LLM_CACHE_BACKEND": "memory",
+        "DOCUMENT_CACHE_BACKEND": "memory",
+        "JD_INDEX_BACKEND": "memory",
+        "RATE_LIMIT_BACKEND": "memory",
+        "JOB_STORE_SQLITE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "GEMINI_RPM": "100000",
+        "GEMINI_TPM": "1000000000",
+        "GEMINI_MAX_IN_FLIGHT": "64",
+        "TOKEN_LOG_CALLS": "0",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def fake_app():
+    """gunicorn entry point: gunicorn 'benchmark:fake_app()' with BENCH_FAKE_CONFIG set."""
+    config = json.loads(os.environ.get("BENCH_FAKE_CONFIG", "{}"))
+    bench_environment(os.environ.get("BENCH_WORKDIR", tempfile.gettempdir()))
+    install_local_mongo(config.get("mongo_uri"))
+    install_fake_gemini(config.get("gemini", {}))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    return app_module.app
+
+
+def fake_asgi_app():
+    """uvicorn entry point: uvicorn --factory benchmark:fake_asgi_app with BENCH_FAKE_CONFIG set."""
+    fake_app()
+    import asgi
+    return asgi.app
+
+
+# ---------------------------------------------------------------- scenarios
+
+class Scenario:
+    def __init__(self, name, method, path, body=None, auth=False, stream=False, files=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.auth = auth
+        self.stream = stream
+        self.files = files
+
+
+def sample_docx():
+    from docx import Document
+    document = Document()
+    for line in SAMPLE_RESUME.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_scenarios(state, unique_inputs):
+    def jd():
+        return SAMPLE_JD + (f"\nReq id {uuid.uuid4().hex}" if unique_inputs else "")
+
+    analysis = {"ats_score": 62, "feedback": {"keyword_gaps": ["kafka"], "keyword_strengths": ["python"],
+                                              "content_improvements": [], "formatting_advice": []}}
+    docx_bytes = sample_docx()
+    docx_mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    def pop_saved_id():
+        with state["lock"]:
+            return state["deletable"].pop() if state["deletable"] else state["analysis_id"]
+
+    return [
+        Scenario("health", "GET", "/"),
+        Scenario("metrics", "GET", "/metrics"),
+        Scenario("quick_score", "POST", "/quick_score", lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("upload_file", "POST", "/upload_file",
+                 files=lambda: (docx_bytes + (uuid.uuid4().bytes if unique_inputs else b""), "resume.docx", docx_mime)),
+        Scenario("signup", "POST", "/signup", lambda: {
+            "username": f"bench_{uuid.uuid4().hex[:12]}", "email": f"{uuid.uuid4().hex[:12]}@bench.local", "password": "bench-password"
+        }),
+        Scenario("signin", "POST", "/signin", lambda: {"email": state["email"], "password": state["password"]}),
+        Scenario("save_analysis", "POST", "/save_analysis", lambda: {
+            "analysis_result": analysis, "resume_text": SAMPLE_RESUME, "job_description": jd(), "target_job_title": "Backend"
+        }, auth=True),
+        Scenario("get_history", "POST", "/get_history", lambda: {"limit": 20}, auth=True),
+        Scenario("get_analysis", "GET", lambda: f"/get_analysis/{state['analysis_id']}", auth=True),
+        Scenario("delete_analysis", "POST", "/delete_analysis", lambda: {"draft_id": pop_saved_id()}, auth=True),
+        Scenario("analyze_resume", "POST", "/analyze_resume", lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("analyze_resume_async", "POST", "/analyze_resume?async=1",
+                 lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("analyze_resume_stream", "POST", "/analyze_resume/stream",
+                 lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}, stream=True),
+        Scenario("analyze_resume_incremental", "POST", "/analyze_resume/incremental",
+                 lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("analyze_batch", "POST", "/analyze_batch",
+                 lambda: {"resume": SAMPLE_RESUME, "job_descriptions": [jd() for _ in range(8)]}),
+        Scenario("analyze_batch_stream", "POST", "/analyze_batch/stream",
+                 lambda: {"resume": SAMPLE_RESUME, "job_descriptions": [jd() for _ in range(8)]}, stream=True),
+        Scenario("full_report", "POST", "/full_report", lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("generate_bullet_points", "POST", "/generate_bullet_points", lambda: {
+            "job_title": "Backend Engineer", "task_description": "migrated services to Kubernetes"
+        }),
+        Scenario("suggest_skill_bullets", "POST", "/suggest_skill_bullets", lambda: {
+            "resume": SAMPLE_RESUME, "job_description": jd(), "keyword_gaps": ["kafka", "terraform"]
+        }),
+        Scenario("recommend_template", "POST", "/recommend_template", lambda: {"resume": SAMPLE_RESUME, "job_description": jd()}),
+        Scenario("generate_initial_draft", "POST", "/generate_initial_draft", lambda: {
+            "resume": SAMPLE_RESUME, "job_description": jd(), "analysis_result": analysis
+        }),
+        Scenario("generate_initial_draft_stream", "POST", "/generate_initial_draft/stream", lambda: {
+            "resume": SAMPLE_RESUME, "job_description": jd(), "analysis_result": analysis
+        }, stream=True),
+        Scenario("refine_section", "POST", "/refine_section", lambda: {
+            "section_text": "Built REST APIs in Flask serving 2M requests/day", "job_description": jd()
+        }),
+        # /signout_all is left out: it revokes the shared benchmark token mid-run.
+    ]
+
+
+# ---------------------------------------------------------------- clients
+
+class FlaskClient:
+    """Drives the app in-process through Flask's test client (one client per thread)."""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+
+    def request(self, method, path, json_body=None, headers=None, files=None, stream=False):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        if files:
+            content, filename, mimetype = files
+            response = client.post(path, data={"file": (io.BytesIO(content), filename, mimetype)},
+                                   headers=headers, content_type="multipart/form-data")
+        else:
+            response = client.open(path, method=method, json=json_body, headers=headers)
+        body = response.get_data()
+        return response.status_code, body
+
+
+class HTTPClient:
+    """Drives a running server over HTTP with one keep-alive session per thread."""
+
+    def __init__(self, base_url, timeout=120):
+        import requests
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, json_body=None, headers=None, files=None, stream=False):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        kwargs = {"headers": headers, "timeout": self.timeout, "stream": stream}
+        if files:
+            content, filename, mimetype = files
+            kwargs["files"] = {"file": (filename, content, mimetype)}
+        elif json_body is not None:
+            kwargs["json"] = json_body
+        response = session.request(method, self.base_url + path, **kwargs)
+        body = b"".join(response.iter_content(8192)) if stream else response.content
+        return response.status_code, body
+
+
+# ---------------------------------------------------------------- cold start
+
+# Imports create_app() is meant to keep off the boot path. (bcrypt isn't listed: PyJWT's
+# cryptography backend imports it anyway, and it loads in under a millisecond.)
+HEAVY_MODULES = ["google.generativeai", "google.api_core", "pypdf", "docx", "requests"]
+
+
+def startup_probe():
+    """
+    Runs in a fresh interpreter: times importing app.py and the first request of each kind,
+    which is where lazily built clients get paid for. mongomock (and with it pymongo) is
+    imported before the clock starts.
+    """
+    bench_environment(tempfile.mkdtemp(prefix="hireready_startup_"))
+    install_local_mongo(None)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    app_module = timed("import_app_ms", lambda: __import__("app"))
+    timings["heavy_modules_after_import"] = [m for m in HEAVY_MODULES if m in sys.modules]
+    flask_app = timed("create_app_ms", app_module.create_app)
+    client = flask_app.test_client()
+    body = {"resume": SAMPLE_RESUME, "job_description": SAMPLE_JD}
+    timed("first_request_ms", lambda: client.get("/"))
+    timed("first_quick_score_ms", lambda: client.post("/quick_score", json=body))
+    timed("first_mongo_request_ms", lambda: client.post("/signup", json={
+        "username": "startup", "email": "startup@bench.local", "password": "bench-password"
+    }))
+
+    def first_ai_request():
+        # Includes importing the Gemini SDK, which the fake pulls in just like the real client would.
+        install_fake_gemini({"latency": "fixed:0"})
+        return client.post("/analyze_resume", json=body)
+    timed("first_ai_request_ms", first_ai_request)
+    timed("second_ai_request_ms", lambda: client.post("/analyze_resume", json={**body, "job_description": SAMPLE_JD + " "}))
+    print(json.dumps(timings))
+
+
+def run_startup_benchmark(runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), "--startup-probe"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode()
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {}
+    for key in samples[0]:
+        if key.endswith("_ms"):
+            values = sorted(sample[key] for sample in samples)
+            summary[key] = {"median": values[len(values) // 2], "max": values[-1]}
+    summary["heavy_modules_after_import"] = samples[0]["heavy_modules_after_import"]
+    return {"runs": runs, "summary": summary, "samples": samples}
+
+
+# ---------------------------------------------------------------- near-duplicate JD index
+
+_SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "vo", "qui", "sar", "del", "pon", "zu", "fle", "gri", "mon", "tas", "bel"]
+JD_VOCABULARY = [a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES[:6]]
+JD_REQUIREMENT_OPENERS = [
+    "years of experience with", "strong knowledge of", "hands-on experience building", "familiarity with",
+    "proven track record in", "working knowledge of", "experience designing", "deep understanding of",
+]
+JD_BENEFITS = [
+    "Competitive salary and equity", "Health, dental and vision insurance", "Flexible remote work policy",
+    "Generous parental leave", "Annual learning budget", "Home office stipend", "Paid volunteer days",
+    "401(k) matching", "Unlimited paid time off", "Wellness allowance", "Commuter benefits", "Team offsites",
+]
+
+
+def synthetic_jd(rng):
+    """A plausible posting: shared template phrasing around words unique enough to tell postings apart."""
+    def words(count):
+        return " ".join(rng.choice(JD_VOCABULARY) for _ in range(count))
+
+    lines = [f"{words(2).title()} Engineer", "", "About us", f"We build {words(6)} for {words(4)}.", "",
+             "Requirements"]
+    lines += [f"- {rng.randint(2, 8)}+ {rng.choice(JD_REQUIREMENT_OPENERS)} {words(rng.randint(3, 6))}"
+              for _ in range(rng.randint(5, 9))]
+    lines += ["", "Responsibilities"] + [f"- {words(rng.randint(5, 9))}" for _ in range(rng.randint(3, 6))]
+    lines += ["", "Benefits"] + [f"- {benefit}" for benefit in rng.sample(JD_BENEFITS, rng.randint(3, 6))]
+    return "\n".join(lines)
+
+
+def jd_variant(jd, kind, rng):
+    """The same posting as another user might paste it."""
+    lines = jd.split("\n")
+    if kind in ("reordered", "combined"):
+        benefits = lines.index("Benefits") + 1
+        tail = lines[benefits:]
+        rng.shuffle(tail)
+        lines[benefits:] = tail
+    if kind in ("whitespace", "combined"):
+        lines = [("  " if rng.random() < 0.3 else "") + line.replace(" ", "  " if rng.random() < 0.2 else " ") +
+                 (" \t" if rng.random() < 0.3 else "") for line in lines]
+        lines = [line for pair in ((line, "") if rng.random() < 0.2 else (line,) for line in lines) for line in pair]
+    if kind in ("tracking_footer", "combined"):
+        lines += ["", f"Req ID: R-{rng.randint(10000, 99999)}",
+                  f"Posted {rng.randint(1, 30)} days ago via https://jobs.example.com/{uuid.uuid4().hex[:8]}?utm_source=board"]
+    if kind == "years":
+        # Same wording, one requirement asks for more experience: must not share an id.
+        first = lines.index("Requirements") + 1
+        years = int(lines[first][2:].split("+", 1)[0])
+        lines[first] = lines[first].replace(f"- {years}+", f"- {years + 5}+", 1)
+    if kind == "edited":
+        # A real edit, not a near-duplicate: one requirement rewritten.
+        first = lines.index("Requirements") + 1
+        lines[first] = f"- {rng.choice(JD_REQUIREMENT_OPENERS)} " + " ".join(rng.choice(JD_VOCABULARY) for _ in range(5))
+    return "\n".join(lines)
+
+
+JD_VARIANT_KINDS = ["whitespace", "tracking_footer", "reordered", "combined", "edited", "years"]
+
+
+def run_jd_index_benchmark(entries, queries, backend):
+    """
+    Indexes `entries` synthetic postings, then looks up `queries` variants of each kind and
+    as many unrelated postings. match_rate is the share mapped to their original's id (for
+    "unrelated", to any id); "edited" and "years" should stay near 0.
+    """
+    from jd_index import (
+        NearDuplicateJDIndex, MemoryJDStore, SQLiteJDStore, jd_shingles, minhash_signature, band_keys, canonical_id
+    )
+    from token_budget import normalize_whitespace, strip_boilerplate
+
+    workdir = tempfile.mkdtemp(prefix="hireready_jd_index_")
+    path = os.path.join(workdir, "jd_index.sqlite3")
+    store = SQLiteJDStore(path) if backend == "sqlite" else MemoryJDStore(max_entries=entries)
+    index = NearDuplicateJDIndex(store)
+
+    def posting(i):
+        return synthetic_jd(random.Random(i))
+
+    start = time.perf_counter()
+    ids = {}
+    for i in range(entries):
+        ids[i] = index.canonicalize(posting(i))
+        if (i + 1) % 10000 == 0:
+            print(f"  indexed {i + 1}/{entries} ({(i + 1) / (time.perf_counter() - start):.0f}/s)", flush=True)
+    build_seconds = time.perf_counter() - start
+
+    def lookup(text):
+        began = time.perf_counter()
+        text = strip_boilerplate(normalize_whitespace(text))
+        signature = minhash_signature(jd_shingles(text))
+        match = index.find(signature)
+        jd_id = canonical_id(match[0], text) if match else None
+        elapsed_ms = (time.perf_counter() - began) * 1000
+        return jd_id, elapsed_ms, len(store.candidates(band_keys(signature), index.max_candidates))
+
+    rng = random.Random(0)
+    results = {}
+    for kind in JD_VARIANT_KINDS + ["unrelated"]:
+        hits, latencies, candidate_counts = 0, [], []
+        for _ in range(queries):
+            i = rng.randrange(entries)
+            text = synthetic_jd(random.Random(entries + rng.random())) if kind == "unrelated" else jd_variant(posting(i), kind, rng)
+            jd_id, ms, candidates = lookup(text)
+            latencies.append(ms)
+            candidate_counts.append(candidates)
+            if jd_id and (kind == "unrelated" or jd_id == ids[i]):
+                hits += 1
+        latencies.sort()
+        results[kind] = {
+            "match_rate": round(hits / queries, 4),
+            "lookup_ms": {p: round(percentile(latencies, q), 3) for p, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "mean_candidates": round(sum(candidate_counts) / queries, 2),
+        }
+    return {
+        "entries": entries,
+        "backend": backend,
+        "build_seconds": round(build_seconds, 1),
+        "inserts_per_second": round(entries / build_seconds),
+        "index_bytes": os.path.getsize(path) if backend == "sqlite" else None,
+        "queries_per_kind": queries,
+        "results": results,
+        "stats": index.stats(),
+    }
+
+
+# ---------------------------------------------------------------- runner
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+class SaturationSampler:
+    """
+    Samples how busy the server side is while a scenario runs: requests in flight
+    against the available slots, plus (in-process) the Gemini governor and the pipeline pool queue.
+    """
+
+    def __init__(self, in_flight, slots, app_module=None, interval=0.02):
+        self.in_flight = in_flight
+        self.slots = slots
+        self.app_module = app_module
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            sample = {"in_flight": self.in_flight()}
+            if self.app_module is not None:
+                sample["gemini_in_flight"] = self.app_module.gemini_governor.stats()["in_flight"]
+                sample["pipeline_queue"] = self.app_module.pipeline_executor._work_queue.qsize()
+            self.samples.append(sample)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return {}
+        in_flight = [s["in_flight"] for s in self.samples]
+        result = {
+            "in_flight_mean": round(sum(in_flight) / len(in_flight), 2),
+            "in_flight_max": max(in_flight),
+            "saturation": round(sum(in_flight) / len(in_flight) / self.slots, 3) if self.slots else None,
+        }
+        if self.app_module is not None:
+            result["gemini_in_flight_max"] = max(s["gemini_in_flight"] for s in self.samples)
+            result["pipeline_queue_max"] = max(s["pipeline_queue"] for s in self.samples)
+        return result
+
+
+def run_scenario(client, scenario, token, concurrency, total_requests, slots, app_module=None):
+    latencies = []
+    statuses = {}
+    errors = []
+    lock = threading.Lock()
+    in_flight = [0]
+
+    def one():
+        body = scenario.body() if callable(scenario.body) else scenario.body
+        path = scenario.path() if callable(scenario.path) else scenario.path
+        files = scenario.files() if scenario.files else None
+        headers = {"Authorization": f"Bearer {token}"} if scenario.auth else None
+        with lock:
+            in_flight[0] += 1
+        start = time.perf_counter()
+        try:
+            status, payload = client.request(scenario.method, path, body, headers, files, scenario.stream)
+            if scenario.stream and b"event: error" in payload:
+                status = "stream_error"
+        except Exception as e:
+            status = "exception"
+            with lock:
+                errors.append(str(e)[:200])
+        elapsed = time.perf_counter() - start
+        with lock:
+            in_flight[0] -= 1
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    with SaturationSampler(lambda: in_flight[0], slots, app_module) as sampler:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(one) for _ in range(total_requests)]:
+                future.result()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "rps": round(total_requests / wall, 2) if wall else None,
+        "success_rate": round(ok / total_requests, 4),
+        "statuses": statuses,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1),
+        },
+        "workers": sampler.summary(),
+        "sample_errors": errors[:5],
+    }
+
+
+def prepare_state(client, deletable_count):
+    """Creates the benchmark user and the saved analyses the history/delete scenarios read."""
+    email = f"{uuid.uuid4().hex[:12]}@bench.local"
+    password = "bench-password"
+    status, body = client.request("POST", "/signup", {
+        "username": f"bench_{uuid.uuid4().hex[:12]}", "email": email, "password": password
+    })
+    if status != 201:
+        print(f"❌ Could not create the benchmark user ({status}): {body[:200]}")
+        sys.exit(1)
+    token = json.loads(body)["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def save():
+        _, body = client.request("POST", "/save_analysis", {
+            "analysis_result": {"ats_score": 50, "feedback": {}}, "resume_text": SAMPLE_RESUME,
+            "job_description": SAMPLE_JD, "target_job_title": "Seed"
+        }, headers)
+        return json.loads(body)["id"]
+
+    state = {"email": email, "password": password, "lock": threading.Lock(), "analysis_id": save()}
+    state["deletable"] = [save() for _ in range(deletable_count)]
+    return token, state
+
+
+def start_server(args, fake_config, workdir):
+    """gunicorn (--gunicorn-workers) or uvicorn (--asgi-workers) serving the fake app on args.port."""
+    port = args.port
+    env = {**os.environ, "BENCH_FAKE_CONFIG": json.dumps(fake_config), "BENCH_WORKDIR": workdir}
+    if args.asgi_workers:
+        command = [
+            sys.executable, "-m", "uvicorn", "--factory", "benchmark:fake_asgi_app",
+            "--workers", str(args.asgi_workers), "--port", str(port), "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "gunicorn", "benchmark:fake_app()",
+            "--workers", str(args.gunicorn_workers), "--threads", str(args.threads),
+            "--bind", f"127.0.0.1:{port}", "--timeout", "120", "--log-level", "warning",
+        ]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    import requests
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process, f"http://127.0.0.1:{port}"
+        except requests.RequestException:
+            time.sleep(0.25)
+    process.kill()
+    print(f"❌ {command[2]} did not come up within 60s")
+    sys.exit(1)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline HireReady backend benchmark.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--routes", default="", help="comma-separated scenario names (default: all)")
+    parser.add_argument("--latency", default=FAKE_DEFAULTS["latency"])
+    parser.add_argument("--schema-latency", action="append", default=[], metavar="SCHEMA=SPEC")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of fake calls that hang until their timeout")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of fake answers that break their schema")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--cached", action="store_true", help="repeat identical inputs so the LLM cache serves them")
+    parser.add_argument("--mongo-uri", default=None, help="local mongod instead of mongomock")
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--gunicorn-workers", type=int, default=0, help="launch gunicorn with the fakes and drive it over HTTP")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument("--asgi-workers", type=int, default=0, help="launch uvicorn (asgi.py) with the fakes instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--startup", type=int, default=0, metavar="RUNS", help="measure cold start in RUNS fresh interpreters")
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--jd-index", type=int, default=0, metavar="ENTRIES", help="benchmark the near-duplicate JD index at ENTRIES postings")
+    parser.add_argument("--jd-queries", type=int, default=1000, help="lookups per variant kind with --jd-index")
+    parser.add_argument("--jd-index-backend", default="sqlite", choices=["sqlite", "memory"])
+    args = parser.parse_args()
+
+    if args.startup_probe:
+        startup_probe()
+        return
+    if args.startup:
+        result = run_startup_benchmark(args.startup)
+        print(f"{'cold start':<28} {'median ms':>10} {'max ms':>10}")
+        for key, value in result["summary"].items():
+            if key.endswith("_ms"):
+                print(f"{key:<28} {value['median']:>10} {value['max']:>10}")
+        heavy = result["summary"]["heavy_modules_after_import"]
+        print(f"\nHeavy modules loaded by 'import app': {', '.join(heavy) if heavy else 'none'}")
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "git_revision": git_revision(),
+                "startup": result
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+        return
+
+    if args.jd_index:
+        result = run_jd_index_benchmark(args.jd_index, args.jd_queries, args.jd_index_backend)
+        print(f"\n{args.jd_index} postings indexed in {result['build_seconds']}s ({result['inserts_per_second']}/s)\n")
+        print(f"{'variant':<18} {'matched':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'candidates':>11}")
+        for kind, row in result["results"].items():
+            latency = row["lookup_ms"]
+            print(f"{kind:<18} {row['match_rate']:>8.1%} {latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8} "
+                  f"{row['mean_candidates']:>11}")
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "git_revision": git_revision(),
+                "jd_index": result
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+        return
+
+    fake_config = {
+        "mongo_uri": args.mongo_uri,
+        "gemini": {
+            "latency": args.latency,
+            "schema_latency": dict(item.split("=", 1) for item in args.schema_latency),
+            "error_rate": args.error_rate,
+            "rate_429": args.rate_429,
+            "hang_rate": args.hang_rate,
+            "malformed_rate": args.malformed_rate,
+            "seed": args.seed,
+        },
+    }
+
+    workdir = tempfile.mkdtemp(prefix="hireready_bench_")
+    server = None
+    app_module = None
+    if args.asgi_workers:
+        server, base_url = start_server(args, fake_config, workdir)
+        client = HTTPClient(base_url)
+        slots = None
+        mode = f"uvicorn asgi ({args.asgi_workers} workers)"
+    elif args.gunicorn_workers:
+        server, base_url = start_server(args, fake_config, workdir)
+        client = HTTPClient(base_url)
+        slots = args.gunicorn_workers * args.threads
+        mode = f"gunicorn ({args.gunicorn_workers} workers x {args.threads} threads)"
+    elif args.url:
+        client = HTTPClient(args.url)
+        slots = None
+        mode = f"http {args.url}"
+    else:
+        os.environ["BENCH_WORKDIR"] = workdir
+        os.environ["BENCH_FAKE_CONFIG"] = json.dumps(fake_config)
+        flask_app = fake_app()
+        import app as app_module
+        client = FlaskClient(flask_app)
+        slots = args.concurrency
+        mode = "in-process"
+
+    try:
+        token, state = prepare_state(client, args.requests)
+        scenarios = build_scenarios(state, unique_inputs=not args.cached)
+        wanted = {name.strip() for name in args.routes.split(",") if name.strip()}
+        if wanted:
+            unknown = wanted - {s.name for s in scenarios}
+            if unknown:
+                print(f"❌ Unknown routes: {', '.join(sorted(unknown))}")
+                sys.exit(1)
+            scenarios = [s for s in scenarios if s.name in wanted]
+
+        print(f"Benchmarking {len(scenarios)} routes, {mode}, concurrency {args.concurrency}, {args.requests} requests each\n")
+        print(f"{'route':<32} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ok':>7} {'sat':>6}")
+        results = {}
+        for scenario in scenarios:
+            result = run_scenario(client, scenario, token, args.concurrency, args.requests, slots, app_module)
+            results[scenario.name] = result
+            latency = result["latency_ms"]
+            saturation = result["workers"].get("saturation")
+            print(f"{scenario.name:<32} {result['rps']:>8} {latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} "
+                  f"{result['success_rate']:>7.1%} {saturation if saturation is not None else '-':>6}")
+
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": git_revision(),
+            "mode": mode,
+            "config": {**vars(args), "fake": fake_config},
+            "routes": results,
+        }
+        if app_module is not None:
+            report["token_usage"] = app_module.token_accountant.stats()
+            report["llm_cache"] = app_module.llm_cache.stats()
+            report["gemini"] = {
+                "circuit_breaker": app_module.circuit_breaker.stats(),
+                "hedging": app_module.hedge_policy.stats(),
+                "output_repairs": {"/".join(key): count for key, count in app_module.LLM_OUTPUT_REPAIRS.values().items()}
+            }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n✅ Results written to {args.output}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait(10)
+
+
+if __name__ == "__main__":
+    main()
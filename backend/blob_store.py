@@ -0,0 +1,62 @@
+import zlib
+import hashlib
+from datetime import datetime
+from bson.binary import Binary
+
+CODEC = "zlib"
+
+
+def blob_id_for(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TextBlobStore:
+    """
+    Content-addressed, compressed storage for resume and job description texts.
+    Analyses reference blobs by id, so the same resume saved against thirty JDs is
+    stored once. 'refs' counts referencing analyses; a blob is removed when the
+    last one is deleted.
+    """
+
+    def __init__(self, collection, level=6):
+        self.collection = collection
+        self.level = level
+
+    def put(self, text):
+        blob_id = blob_id_for(text)
+        raw = text.encode('utf-8')
+        self.collection.update_one(
+            {"_id": blob_id},
+            {
+                "$setOnInsert": {
+                    "codec": CODEC,
+                    "data": Binary(zlib.compress(raw, self.level)),
+                    "size": len(raw),
+                    "created_at": datetime.utcnow()
+                },
+                "$inc": {"refs": 1}
+            },
+            upsert=True
+        )
+        return blob_id
+
+    def get(self, blob_id):
+        doc = self.collection.find_one({"_id": blob_id}, {"data": 1})
+        return zlib.decompress(doc['data']).decode('utf-8') if doc else ''
+
+    def release(self, blob_id):
+        self.collection.update_one({"_id": blob_id}, {"$inc": {"refs": -1}})
+        self.collection.delete_one({"_id": blob_id, "refs": {"$lte": 0}})
+
+
+def analysis_texts(doc, blob_store):
+    """(resume_text, job_description) for an analysis, whether stored inline (older saves) or as blobs."""
+    if 'resume_blob_id' in doc:
+        resume_text = blob_store.get(doc['resume_blob_id'])
+    else:
+        resume_text = doc.get('resume_text', '')
+    if 'job_description_blob_id' in doc:
+        job_description = blob_store.get(doc['job_description_blob_id'])
+    else:
+        job_description = doc.get('job_description', '')
+    return resume_text, job_description
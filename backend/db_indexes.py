@@ -0,0 +1,57 @@
+from pymongo import ASCENDING, DESCENDING
+from observability import log_event
+
+# (collection, keys, options). Unique indexes also close the race in signup's
+# find-then-insert duplicate check.
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"unique": True, "name": "email_unique"}),
+    ("users", [("username", ASCENDING)], {"unique": True, "name": "username_unique"}),
+    # get_history filters on user_id and sorts on (created_at, _id); all three keys are needed
+    # for the index to serve the sort and the cursor's _id tiebreak without an in-memory SORT.
+    ("resume_analyses", [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+     {"name": "user_id_1_created_at_-1__id_-1"}),
+]
+
+# Indexes replaced by the ones above; dropped on startup so writes stop maintaining them.
+RETIRED_INDEXES = [
+    ("resume_analyses", "user_id_1_created_at_-1"),
+]
+
+
+def ensure_indexes(db):
+    """
+    Creates the indexes the hot queries rely on. create_index is a no-op when the
+    index already exists, so this is safe to run on every startup.
+    Returns the names of indexes that could not be created.
+    """
+    failed = []
+    for collection_name, keys, options in INDEXES:
+        try:
+            db[collection_name].create_index(keys, **options)
+        except Exception as e:
+            log_event("Could not create index", level="warning", index=options['name'], collection=collection_name, error=str(e))
+            failed.append(options['name'])
+    for collection_name, name in RETIRED_INDEXES:
+        try:
+            if name in db[collection_name].index_information():
+                db[collection_name].drop_index(name)
+        except Exception as e:
+            log_event("Could not drop retired index", level="warning", index=name, collection=collection_name, error=str(e))
+    return failed
+
+
+def plan_stages(plan):
+    """Flattens an explain() winningPlan into the list of stage names it uses."""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if 'stage' in node:
+            stages.append(node['stage'])
+        for key in ('inputStage', 'queryPlan'):
+            if key in node:
+                pending.append(node[key])
+        pending.extend(node.get('inputStages', []))
+    return stages
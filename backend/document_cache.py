@@ -0,0 +1,93 @@
+import os
+import stat
+import hashlib
+import tempfile
+from llm_cache import LLMResponseCache, SQLiteCacheTier, MongoCacheTier
+from document_extractor import EXTRACTOR_VERSION
+from observability import log_event
+
+CACHE_LABEL = "UPLOADED_DOCUMENT"
+
+
+def hash_stream(stream, chunk_size=64 * 1024):
+    """SHA-256 of the upload bytes, read in chunks; leaves the stream rewound."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class DocumentTextCache:
+    """
+    Extracted resume text keyed by the SHA-256 of the uploaded file.
+    Entries remember the extractor version that produced them; uploads only reuse
+    text from the current version, while lookups by hash (analysis requests that
+    send resume_hash instead of the text) accept any version the user has seen.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get_for_upload(self, digest):
+        entry = self.cache.get(digest, CACHE_LABEL)
+        if entry and entry.get('extractor_version') == EXTRACTOR_VERSION:
+            return entry
+        return None
+
+    def get_text(self, digest):
+        entry = self.cache.get(digest, CACHE_LABEL)
+        return entry['text'] if entry else None
+
+    def put(self, digest, text, truncated):
+        self.cache.set(digest, {
+            "text": text,
+            "truncated": truncated,
+            "extractor_version": EXTRACTOR_VERSION
+        }, CACHE_LABEL)
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def private_file(path):
+    """
+    Makes path's directory 0700 and the file 0600, creating them if needed.
+    Returns False when the directory belongs to another user (e.g. planted in /tmp).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.stat(directory).st_uid != os.getuid():
+        return False
+    os.chmod(directory, stat.S_IRWXU)
+    os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+    os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+    return True
+
+
+def build_document_cache(db=None):
+    """
+    DOCUMENT_CACHE_BACKEND: 'memory' (default), 'sqlite' or 'mongo'.
+    Entries are resume text, so persisting them is opt-in. A shared backend is needed
+    for resume_hash lookups to work across gunicorn workers; the sqlite file lives in a
+    directory only the server's user can read.
+    """
+    backend = os.environ.get("DOCUMENT_CACHE_BACKEND", "memory").lower()
+    shared_tier = None
+    if backend == "sqlite":
+        path = os.environ.get("DOCUMENT_CACHE_SQLITE_PATH") or os.path.join(
+            tempfile.gettempdir(), f"hireready-{os.getuid()}", "documents.sqlite3"
+        )
+        if private_file(path):
+            shared_tier = SQLiteCacheTier(path)
+        else:
+            log_event("Document cache directory is not ours; keeping uploads in memory", level="warning", path=path)
+    elif backend == "mongo" and db is not None:
+        shared_tier = MongoCacheTier(db.extracted_documents)
+
+    return DocumentTextCache(LLMResponseCache(
+        max_entries=int(os.environ.get("DOCUMENT_CACHE_MAX_ENTRIES", 256)),
+        default_ttl=int(os.environ.get("DOCUMENT_CACHE_TTL", 24 * 3600)),
+        shared_tier=shared_tier
+    ))
@@ -0,0 +1,120 @@
+import os
+import time
+
+# pypdf and python-docx are imported inside the functions that use them: only the parse
+# worker processes need them, and importing them up front slows every web worker's boot.
+
+# Bump whenever extraction output changes so cached texts from older parsers are re-extracted.
+EXTRACTOR_VERSION = 2
+
+PDF_MIME_TYPES = ['application/pdf']
+DOCX_MIME_TYPES = ['application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'application/msword']
+
+
+class ExtractionLimits:
+    def __init__(self, max_bytes=None, max_pages=None, max_chars=None, max_seconds=None):
+        self.max_bytes = max_bytes or int(os.environ.get("EXTRACT_MAX_BYTES", 10 * 1024 * 1024))
+        self.max_pages = max_pages or int(os.environ.get("EXTRACT_MAX_PAGES", 20))
+        self.max_chars = max_chars or int(os.environ.get("EXTRACT_MAX_CHARS", 200000))
+        self.max_seconds = max_seconds or float(os.environ.get("EXTRACT_MAX_SECONDS", 5))
+
+
+class DocumentTooLarge(Exception):
+    pass
+
+
+def stream_size(stream):
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def iter_pdf_text(reader, max_pages):
+    """Yields one page of text at a time."""
+    for index, page in enumerate(reader.pages):
+        if index >= max_pages:
+            return
+        yield page.extract_text() or ""
+
+
+def _iter_table_text(table):
+    for row in table.rows:
+        cells = []
+        for cell in row.cells:
+            text = cell.text.strip()
+            # Merged cells show up once per grid column; keep a single copy.
+            if text and (not cells or cells[-1] != text):
+                cells.append(text)
+        if cells:
+            yield " | ".join(cells)
+
+
+def iter_docx_text(stream):
+    """
+    Yields headers first, then body paragraphs and tables in document order.
+    document.paragraphs alone skips tables, which many resume templates use for layout.
+    """
+    from docx import Document
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = Document(stream)
+
+    seen_headers = set()
+    for section in document.sections:
+        if section.header.is_linked_to_previous:
+            continue
+        for paragraph in section.header.paragraphs:
+            text = paragraph.text.strip()
+            if text and text not in seen_headers:
+                seen_headers.add(text)
+                yield text
+        for table in section.header.tables:
+            yield from _iter_table_text(table)
+
+    for child in document.element.body.iterchildren():
+        tag = child.tag.rsplit('}', 1)[-1]
+        if tag == 'p':
+            yield Paragraph(child, document).text
+        elif tag == 'tbl':
+            yield from _iter_table_text(Table(child, document))
+
+
+def extract_text(stream, mime_type, limits=None):
+    """
+    Pulls text from an uploaded PDF/DOCX stream without writing it to disk.
+    Pieces are collected in a list and joined once. Extraction stops early
+    (truncated=True) at the page, character or time limit; files over the
+    byte limit are rejected up front.
+    Returns (text, truncated).
+    """
+    limits = limits or ExtractionLimits()
+
+    if stream_size(stream) > limits.max_bytes:
+        raise DocumentTooLarge(f"File is larger than {limits.max_bytes // (1024 * 1024)} MB.")
+
+    truncated = False
+    if mime_type in PDF_MIME_TYPES:
+        from pypdf import PdfReader
+        reader = PdfReader(stream)
+        truncated = len(reader.pages) > limits.max_pages
+        pieces = iter_pdf_text(reader, limits.max_pages)
+    elif mime_type in DOCX_MIME_TYPES:
+        pieces = iter_docx_text(stream)
+    else:
+        raise ValueError(f"Unsupported mime type: {mime_type}")
+
+    deadline = time.monotonic() + limits.max_seconds
+    parts = []
+    total_chars = 0
+    for piece in pieces:
+        parts.append(piece)
+        total_chars += len(piece) + 1
+        if total_chars >= limits.max_chars or time.monotonic() > deadline:
+            truncated = True
+            break
+
+    text = "\n".join(parts).strip()
+    return text[:limits.max_chars], truncated
@@ -0,0 +1,117 @@
+import os
+import threading
+from observability import log_event
+
+DEFAULT_MODEL_NAME = 'gemini-2.5-flash'
+
+
+class GeminiModelRegistry:
+    """
+    Keeps one GenerativeModel per (model name, system instruction) pair and a single
+    pooled keep-alive HTTP session underneath them, so requests don't pay for model
+    construction or a fresh TLS handshake every time.
+    The SDK is imported and configured on first use (it takes most of a second to import).
+    """
+
+    def __init__(self, api_key, pool_size=10):
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self._models = {}
+        self._lock = threading.Lock()
+        self._configured = False
+        self._async_client = None
+
+    def configure(self):
+        with self._lock:
+            if self._configured:
+                return
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key, transport='rest')
+            self._mount_pooled_adapter()
+            self._configured = True
+
+    def _mount_pooled_adapter(self):
+        # The SDK caches one GenerativeServiceClient per process and every model uses it.
+        # Its REST transport wraps a requests session; replacing the adapter gives us a
+        # sized keep-alive pool. pool_block makes extra threads wait for a free connection
+        # instead of opening throwaway ones.
+        try:
+            from google.generativeai import client as genai_client
+            from requests.adapters import HTTPAdapter
+            client = genai_client.get_default_generative_client()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+            client._transport._session.mount("https://", adapter)
+        except Exception as e:
+            log_event("Could not configure pooled Gemini transport, using SDK defaults", level="warning", error=str(e))
+
+    def get_model(self, system_instruction, model_name=DEFAULT_MODEL_NAME):
+        key = (model_name, system_instruction)
+        model = self._models.get(key)
+        if model is None:
+            self.configure()
+            import google.generativeai as genai
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = genai.GenerativeModel(
+                        model_name=model_name,
+                        system_instruction=system_instruction
+                    )
+                    self._models[key] = model
+        return model
+
+    def get_async_model(self, system_instruction, model_name=DEFAULT_MODEL_NAME):
+        """
+        get_model() for generate_content_async. With transport='rest' the SDK's async client
+        wraps the blocking REST transport, so async callers share a grpc_asyncio client instead.
+        It binds to the running event loop, so this must be called from inside it.
+        """
+        model = self.get_model(system_instruction, model_name)
+        if getattr(model, '_async_client', False) is None:
+            model._async_client = self._get_async_client()
+        return model
+
+    def _get_async_client(self):
+        with self._lock:
+            if self._async_client is None:
+                from google.ai import generativelanguage as glm
+                from google.api_core.client_options import ClientOptions
+                self._async_client = glm.GenerativeServiceAsyncClient(
+                    transport="grpc_asyncio",
+                    client_options=ClientOptions(api_key=self.api_key)
+                )
+            return self._async_client
+
+    def stats(self):
+        return {"models": len(self._models), "pool_size": self.pool_size, "async_client": self._async_client is not None}
+
+
+def build_model_registry(api_key):
+    """
+    GEMINI_HTTP_POOL_SIZE sets the keep-alive connections per gunicorn worker.
+    Match it to the worker's thread count.
+    """
+    return GeminiModelRegistry(
+        api_key=api_key,
+        pool_size=int(os.environ.get("GEMINI_HTTP_POOL_SIZE", 10))
+    )
+
+
+ERROR_THROTTLED = "throttled"
+ERROR_CLIENT = "client"
+ERROR_TRANSIENT = "transient"
+
+
+def classify_error(error):
+    """
+    ERROR_THROTTLED for Gemini's 429, ERROR_CLIENT for any other 4xx (the same request
+    will fail the same way, so it is never retried) and ERROR_TRANSIENT for everything
+    else: 5xx, timeouts, dropped connections, unparseable output.
+    google.api_core is imported here rather than at module load.
+    """
+    from google.api_core.exceptions import TooManyRequests, ClientError
+    if isinstance(error, TooManyRequests):
+        return ERROR_THROTTLED
+    if isinstance(error, ClientError):
+        return ERROR_CLIENT
+    return ERROR_TRANSIENT
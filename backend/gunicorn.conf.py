@@ -0,0 +1,15 @@
+# gunicorn reads this file automatically when started from backend/ (e.g. `gunicorn app:app`).
+import sys
+import threading
+
+
+def post_worker_init(worker):
+    """
+    Each worker imports app.py cheaply (no Mongo, no Gemini SDK), starts accepting
+    requests right away and warms its Mongo client, caches and SDK in the background.
+    A request that needs one of them first simply waits for it.
+    """
+    app_module = sys.modules.get("app")
+    if app_module is None or not hasattr(app_module, "warm_up"):
+        return
+    threading.Thread(target=app_module.warm_up, name="warm-up", daemon=True).start()
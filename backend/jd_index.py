@@ -0,0 +1,337 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from datetime import datetime
+from token_budget import normalize_whitespace, strip_boilerplate
+from observability import log_event
+
+# Near-duplicate job description index.
+#
+# Users paste the same posting with trivial differences (whitespace, tracking ids and footers,
+# reordered benefit lines). Each JD is reduced to a set of word shingles, sketched with MinHash,
+# and banded for LSH: a JD whose estimated Jaccard similarity to an indexed one is at least
+# JD_DEDUP_THRESHOLD maps to that JD's canonical id. Only the id is shared: prompts are always
+# built from the caller's own text, and the id keys per-JD derived work that is safe to reuse
+# (the requirements extraction in app.py). The index stores signatures, never posting text.
+#
+# The sketch is one-permutation MinHash with rotation densification: one stable hash per shingle
+# split into NUM_PERM bins, which costs O(shingles) in pure Python instead of O(shingles * NUM_PERM).
+# NUM_PERM, BANDS, SHINGLE_WORDS and _TOKEN are part of the stored format; changing them means a
+# fresh index (new table/collection names).
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+_EMPTY = 0xFFFFFFFF
+
+_URL = re.compile(r"(https?://|www\.)\S+")
+# Whole words, numbers included: "10+ years" and "2+ years" are different requirements.
+# Tracking ids are dropped with their footer lines instead.
+_TOKEN = re.compile(r"(?<![a-z0-9+#])[a-z0-9][a-z0-9+#]*(?![a-z0-9+#])")
+# Footer lines job boards add to a posting they repost.
+_TRACKING_LINE = re.compile(
+    r"^((req(uisition)?|job|posting|ref(erence)?)\s*(id|#|no\b|number|code)|posted\b.*\bago\b|(apply|applied) (at|via|here)\b)"
+)
+_UNIT_BREAK = re.compile(r"(?<=[.!?;])\s+")
+
+
+def jd_units(text):
+    """
+    Lines of a posting as order-free units. Soft-wrapped prose is joined back together,
+    so re-wrapping doesn't change the units while reordering bullet lines doesn't either.
+    """
+    units = []
+    for line in _URL.sub(" ", text.lower()).splitlines():
+        line = line.strip()
+        if not line or _TRACKING_LINE.match(line):
+            continue
+        if units and line[0].isalpha() and line[0].islower() and units[-1][-1:] not in ".!?:;" and not line.startswith("- "):
+            units[-1] += " " + line
+        else:
+            units.append(line)
+    return [unit for line in units for unit in _UNIT_BREAK.split(line)]
+
+
+def jd_shingles(text):
+    """Word shingles (SHINGLE_WORDS words) per unit; shorter units are one shingle."""
+    shingles = set()
+    for unit in jd_units(text):
+        words = _TOKEN.findall(unit)
+        if len(words) <= SHINGLE_WORDS:
+            if words:
+                shingles.add(" ".join(words))
+            continue
+        for i in range(len(words) - SHINGLE_WORDS + 1):
+            shingles.add(" ".join(words[i:i + SHINGLE_WORDS]))
+    return shingles
+
+
+def canonical_id(cluster_id, text):
+    """
+    cluster_id narrowed by the numbers in the posting. One changed number barely moves the
+    Jaccard estimate, but "10+ years" and "2+ years" must never share derived work.
+    """
+    numbers = sorted(token for unit in jd_units(text) for token in _TOKEN.findall(unit) if not token.isalpha())
+    if not numbers:
+        return cluster_id
+    return hashlib.sha256(f"{cluster_id} {' '.join(numbers)}".encode("utf-8")).hexdigest()[:32]
+
+
+def _stable_hash(value):
+    # Python's hash() is salted per process; signatures are shared across workers and restarts.
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(shingles):
+    """NUM_PERM 32-bit minimums, or None for a text with no shingles."""
+    if not shingles:
+        return None
+    bins = [_EMPTY] * NUM_PERM
+    for shingle in shingles:
+        h = _stable_hash(shingle)
+        slot = h % NUM_PERM
+        value = h >> 32
+        if value < bins[slot]:
+            bins[slot] = value
+    # Densify: an empty bin borrows the minimum of the nearest filled bin to its right, offset by
+    # the distance, so short postings still give every band a value to collide on.
+    if _EMPTY in bins:
+        source = list(bins)
+        carry, distance = None, 0
+        for step in range(2 * NUM_PERM - 1, -1, -1):
+            i = step % NUM_PERM
+            if source[i] != _EMPTY:
+                carry, distance = source[i], 0
+            elif carry is not None:
+                distance += 1
+                bins[i] = (carry + distance) & 0xFFFFFFFF
+    return array("I", bins)
+
+
+def band_keys(signature):
+    """One signed 64-bit key per LSH band (fits SQLite INTEGER and Mongo int64)."""
+    data = signature.tobytes()
+    width = ROWS * signature.itemsize
+    return [
+        int.from_bytes(
+            hashlib.blake2b(data[band * width:(band + 1) * width], digest_size=8, salt=bytes([band])).digest(),
+            "little", signed=True
+        )
+        for band in range(BANDS)
+    ]
+
+
+def estimated_similarity(a, b):
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def _load_signature(data):
+    signature = array("I")
+    signature.frombytes(bytes(data))
+    return signature
+
+
+class MemoryJDStore:
+    """Single-process store for development and the offline benchmark; stops indexing once full."""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._bands = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+
+    def contains(self, jd_id):
+        return jd_id in self._entries
+
+    def candidates(self, keys, limit):
+        with self._lock:
+            found = dict.fromkeys(jd_id for band, key in enumerate(keys) for jd_id in self._bands[band].get(key, ()))
+            return [(jd_id, self._entries[jd_id]) for jd_id in list(found)[:limit]]
+
+    def add(self, jd_id, signature, keys, expires_at):
+        with self._lock:
+            if len(self._entries) >= self.max_entries or jd_id in self._entries:
+                return
+            self._entries[jd_id] = signature
+            for band, key in enumerate(keys):
+                self._bands[band].setdefault(key, []).append(jd_id)
+
+    def count(self):
+        return len(self._entries)
+
+
+class SQLiteJDStore:
+    """Local-file store shared by the workers on a host. Rows past their TTL are ignored and swept on insert."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._inserts = 0
+        conn = self._conn()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jd_signatures ("
+            " row INTEGER PRIMARY KEY, jd_id TEXT UNIQUE NOT NULL, signature BLOB NOT NULL,"
+            " expires_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS jd_signature_bands (band_key INTEGER NOT NULL, row INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jd_signature_bands_key ON jd_signature_bands (band_key);"
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Every new posting is an insert; losing the last few to a power cut only costs a re-index.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def contains(self, jd_id):
+        return self._conn().execute(
+            "SELECT 1 FROM jd_signatures WHERE jd_id = ? AND expires_at > ?", (jd_id, time.time())
+        ).fetchone() is not None
+
+    def candidates(self, keys, limit):
+        rows = self._conn().execute(
+            f"SELECT DISTINCT j.jd_id, j.signature FROM jd_signature_bands b JOIN jd_signatures j ON j.row = b.row "
+            f"WHERE b.band_key IN ({','.join('?' * len(keys))}) AND j.expires_at > ? LIMIT ?",
+            (*keys, time.time(), limit)
+        ).fetchall()
+        return [(jd_id, _load_signature(signature)) for jd_id, signature in rows]
+
+    def add(self, jd_id, signature, keys, expires_at):
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jd_signatures (jd_id, signature, expires_at) VALUES (?, ?, ?)",
+                (jd_id, signature.tobytes(), expires_at)
+            )
+            if not cursor.rowcount:
+                return
+            conn.executemany(
+                "INSERT INTO jd_signature_bands (band_key, row) VALUES (?, ?)",
+                [(key, cursor.lastrowid) for key in keys]
+            )
+            self._inserts += 1
+            if self._inserts % 1000 == 0:
+                now = time.time()
+                conn.execute("DELETE FROM jd_signature_bands WHERE row IN (SELECT row FROM jd_signatures WHERE expires_at <= ?)", (now,))
+                conn.execute("DELETE FROM jd_signatures WHERE expires_at <= ?", (now,))
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM jd_signatures").fetchone()[0]
+
+
+class MongoJDStore:
+    """Store shared across hosts: one document per canonical JD, band keys in a multikey index."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        try:
+            self.collection.create_index("bands")
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            log_event("Could not create JD index indexes", level="warning", error=str(e))
+
+    def contains(self, jd_id):
+        return self.collection.find_one({"_id": jd_id}, {"_id": 1}) is not None
+
+    def candidates(self, keys, limit):
+        cursor = self.collection.find({"bands": {"$in": keys}}, {"signature": 1}).limit(limit)
+        return [(doc["_id"], _load_signature(doc["signature"])) for doc in cursor]
+
+    def add(self, jd_id, signature, keys, expires_at):
+        self.collection.update_one(
+            {"_id": jd_id},
+            {"$setOnInsert": {
+                "signature": signature.tobytes(), "bands": keys,
+                "expires_at": datetime.utcfromtimestamp(expires_at)
+            }},
+            upsert=True
+        )
+
+    def count(self):
+        return self.collection.estimated_document_count()
+
+
+class NearDuplicateJDIndex:
+    """Maps job descriptions to the canonical id of the first near-identical one seen."""
+
+    def __init__(self, store, threshold=0.9, ttl=30 * 24 * 3600, max_candidates=50):
+        self.store = store
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "exact": 0, "near_duplicates": 0, "added": 0, "errors": 0}
+
+    def _count(self, field):
+        with self._lock:
+            self._stats[field] += 1
+
+    def find(self, signature):
+        """(jd_id, similarity) of the closest indexed JD at or above the threshold, or None."""
+        best = None
+        for jd_id, candidate in self.store.candidates(band_keys(signature), self.max_candidates):
+            similarity = estimated_similarity(signature, candidate)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (jd_id, similarity)
+        return best
+
+    def canonicalize(self, job_description):
+        """
+        Canonical id for this posting: the id of the indexed near-duplicate it matches, else its
+        own content hash (which is then indexed), narrowed by its numbers (see canonical_id).
+        Index failures fall back to the content hash.
+        """
+        text = strip_boilerplate(normalize_whitespace(job_description))
+        jd_id = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        self._count("lookups")
+        try:
+            if self.store.contains(jd_id):
+                self._count("exact")
+                return canonical_id(jd_id, text)
+            signature = minhash_signature(jd_shingles(text))
+            if signature is None:
+                return canonical_id(jd_id, text)
+            match = self.find(signature)
+            if match:
+                self._count("near_duplicates")
+                return canonical_id(match[0], text)
+            self.store.add(jd_id, signature, band_keys(signature), time.time() + self.ttl)
+            self._count("added")
+        except Exception as e:
+            self._count("errors")
+            log_event("JD index lookup failed", level="warning", error=str(e))
+        return canonical_id(jd_id, text)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            stats["entries"] = self.store.count()
+        except Exception:
+            stats["entries"] = None
+        return {**stats, "threshold": self.threshold, "store": type(self.store).__name__}
+
+
+def build_jd_index(db=None):
+    """JD_INDEX_BACKEND: 'sqlite' (default), 'mongo' or 'memory'."""
+    backend = os.environ.get("JD_INDEX_BACKEND", "sqlite").lower()
+    if backend == "mongo" and db is not None:
+        store = MongoJDStore(db.jd_signatures)
+    elif backend == "memory":
+        store = MemoryJDStore(int(os.environ.get("JD_INDEX_MAX_ENTRIES", 50000)))
+    else:
+        store = SQLiteJDStore(os.environ.get("JD_INDEX_SQLITE_PATH", "/tmp/hireready_jd_index.sqlite3"))
+    return NearDuplicateJDIndex(
+        store,
+        threshold=float(os.environ.get("JD_DEDUP_THRESHOLD", 0.9)),
+        ttl=int(os.environ.get("JD_INDEX_TTL", 30 * 24 * 3600))
+    )
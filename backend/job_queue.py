@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from observability import log_event
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+TERMINAL_STATES = (JOB_DONE, JOB_FAILED)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class SQLiteJobStore:
+    """Job state in a local SQLite file, readable by every gunicorn worker on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "expires_at REAL NOT NULL, owner TEXT)"
+        )
+        try:
+            # Job files created before jobs recorded who submitted them.
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        except sqlite3.OperationalError:
+            pass
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, job_id, kind, expires_at, owner=None):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, created_at, updated_at, expires_at, owner) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, JOB_QUEUED, now, now, expires_at, owner)
+        )
+        conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+        conn.commit()
+
+    def update(self, job_id, status, result=None, error=None):
+        conn = self._conn()
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+        )
+        conn.commit()
+
+    def get(self, job_id):
+        row = self._conn().execute(
+            "SELECT id, kind, status, result, error, created_at, updated_at, expires_at, owner FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if not row or row[7] <= time.time():
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "created_at": row[5],
+            "updated_at": row[6],
+            "owner": row[8]
+        }
+
+
+class MongoJobStore:
+    """Job state in a Mongo collection; a TTL index drops expired jobs."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        try:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            log_event("Could not create job TTL index", level="warning", error=str(e))
+
+    def create(self, job_id, kind, expires_at, owner=None):
+        now = time.time()
+        self.collection.insert_one({
+            "_id": job_id,
+            "kind": kind,
+            "status": JOB_QUEUED,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "owner": owner,
+            "expires_ts": expires_at,
+            "expires_at": datetime.utcfromtimestamp(expires_at)
+        })
+
+    def update(self, job_id, status, result=None, error=None):
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": status, "result": result, "error": error, "updated_at": time.time()}}
+        )
+
+    def get(self, job_id):
+        doc = self.collection.find_one({"_id": job_id})
+        if not doc or doc['expires_ts'] <= time.time():
+            return None
+        return {
+            "job_id": doc['_id'],
+            "kind": doc['kind'],
+            "status": doc['status'],
+            "result": doc.get('result'),
+            "error": doc.get('error'),
+            "created_at": doc['created_at'],
+            "updated_at": doc['updated_at'],
+            "owner": doc.get('owner')
+        }
+
+
+class JobQueue:
+    """
+    Runs LLM work on a dedicated, capped thread pool so request threads return immediately.
+    State lives in a shared store so any worker can answer /jobs/<id>.
+    """
+
+    def __init__(self, store, max_workers=4, max_pending=100, result_ttl=3600):
+        self.store = store
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-job")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, owner=None):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError("Too many queued AI jobs, please retry shortly.")
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.create(job_id, kind, time.time() + self.result_ttl, owner)
+            self._executor.submit(self._run, job_id, fn)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, fn):
+        try:
+            self.store.update(job_id, JOB_RUNNING)
+            result = fn()
+            self.store.update(job_id, JOB_DONE, result=result)
+        except Exception as e:
+            log_event("Job failed", level="error", job_id=job_id, error=str(e))
+            try:
+                self.store.update(job_id, JOB_FAILED, error=str(e))
+            except Exception as store_error:
+                log_event("Could not record job failure", level="error", job_id=job_id, error=str(store_error))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def pending(self):
+        return self._pending
+
+
+def build_job_queue(db=None):
+    """
+    JOB_STORE_BACKEND: 'sqlite' (default) or 'mongo'.
+    JOB_WORKERS caps concurrent LLM jobs per gunicorn worker.
+    """
+    backend = os.environ.get("JOB_STORE_BACKEND", "sqlite").lower()
+    if backend == "mongo" and db is not None:
+        store = MongoJobStore(db.jobs)
+    else:
+        store = SQLiteJobStore(os.environ.get("JOB_STORE_SQLITE_PATH", "/tmp/hireready_jobs.sqlite3"))
+
+    return JobQueue(
+        store,
+        max_workers=int(os.environ.get("JOB_WORKERS", 4)),
+        max_pending=int(os.environ.get("JOB_MAX_PENDING", 100)),
+        result_ttl=int(os.environ.get("JOB_RESULT_TTL", 3600))
+    )
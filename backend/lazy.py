@@ -0,0 +1,30 @@
+import threading
+
+
+class LazyResource:
+    """
+    Stands in for an object that is slow or fork-unsafe to build at import time
+    (Mongo clients, SQLite connections, worker threads). The factory runs once,
+    on first attribute access, in whichever process ends up using it.
+    """
+
+    def __init__(self, factory):
+        self.__factory = factory
+        self.__instance = None
+        self.__lock = threading.Lock()
+
+    def resolve(self):
+        instance = self.__instance
+        if instance is None:
+            with self.__lock:
+                if self.__instance is None:
+                    self.__instance = self.__factory()
+                instance = self.__instance
+        return instance
+
+    @property
+    def resolved(self):
+        return self.__instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from observability import log_event
+
+
+def make_cache_key(schema_name, system_instruction, user_message, generation_config):
+    """
+    Content-addressed key for a Gemini request. Everything that can change the
+    model output goes into the hash, so two identical requests map to the same key.
+    """
+    material = json.dumps({
+        "schema": schema_name,
+        "system": system_instruction,
+        "message": user_message,
+        "config": generation_config
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class SQLiteCacheTier:
+    """Shared tier backed by a local SQLite file, so all gunicorn workers on a host see the same entries."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads, keep one per thread.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None, 0
+        value, expires_at = row
+        if expires_at <= time.time():
+            return None, 0
+        return json.loads(value), expires_at
+
+    def set(self, key, value, expires_at):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at)
+        )
+        # Opportunistic cleanup so the file doesn't grow without bound.
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+
+class MongoCacheTier:
+    """Shared tier backed by a Mongo collection. Expired documents are removed by a TTL index."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        try:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            log_event("Could not create LLM cache TTL index", level="warning", error=str(e))
+
+    def get(self, key):
+        doc = self.collection.find_one({"_id": key})
+        if not doc:
+            return None, 0
+        expires_at = doc['expires_ts']
+        # The TTL monitor only runs once a minute, so check expiry ourselves too.
+        if expires_at <= time.time():
+            return None, 0
+        return doc['value'], expires_at
+
+    def set(self, key, value, expires_at):
+        self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "value": value, "expires_ts": expires_at, "expires_at": datetime.utcfromtimestamp(expires_at)},
+            upsert=True
+        )
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for parsed Gemini responses.
+    Tier 1 is a bounded in-process LRU with TTL; tier 2 is an optional shared store.
+    """
+
+    def __init__(self, max_entries=512, default_ttl=3600, schema_ttls=None, shared_tier=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.schema_ttls = schema_ttls or {}
+        self.shared_tier = shared_tier
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "bypassed": 0, "sets": 0}
+        self._schema_stats = {}
+
+    def ttl_for(self, schema_name):
+        return self.schema_ttls.get(schema_name, self.default_ttl)
+
+    def _count(self, schema_name, field):
+        with self._lock:
+            self._stats[field] += 1
+            counters = self._schema_stats.setdefault(schema_name, {"hits": 0, "misses": 0, "bypassed": 0})
+            if field in counters:
+                counters[field] += 1
+            elif field == "shared_hits":
+                counters["hits"] += 1
+
+    def record_bypass(self, schema_name):
+        self._count(schema_name, "bypassed")
+
+    def get(self, key, schema_name):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+
+        if entry is not None:
+            self._count(schema_name, "hits")
+            return value
+
+        if self.shared_tier is not None:
+            try:
+                value, expires_at = self.shared_tier.get(key)
+            except Exception as e:
+                log_event("LLM cache shared tier read failed", level="warning", error=str(e))
+                value = None
+            if value is not None:
+                self._store_local(key, value, expires_at)
+                self._count(schema_name, "shared_hits")
+                return value
+
+        self._count(schema_name, "misses")
+        return None
+
+    def contains(self, key):
+        """Checks for a live entry without touching LRU order or hit/miss counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return True
+        if self.shared_tier is not None:
+            try:
+                return self.shared_tier.get(key)[0] is not None
+            except Exception:
+                return False
+        return False
+
+    def set(self, key, value, schema_name):
+        ttl = self.ttl_for(schema_name)
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._store_local(key, value, expires_at)
+        with self._lock:
+            self._stats["sets"] += 1
+
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.set(key, value, expires_at)
+            except Exception as e:
+                log_event("LLM cache shared tier write failed", level="warning", error=str(e))
+
+    def _store_local(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["shared_hits"] + self._stats["misses"]
+            hit_rate = (self._stats["hits"] + self._stats["shared_hits"]) / lookups if lookups else 0.0
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(hit_rate, 4),
+                "by_schema": {name: dict(counters) for name, counters in self._schema_stats.items()},
+                "shared_tier": type(self.shared_tier).__name__ if self.shared_tier else None
+            }
+
+
+def build_llm_cache(db=None, schema_ttls=None):
+    """
+    Builds the cache from environment variables.
+    LLM_CACHE_BACKEND: 'memory' (default), 'sqlite' or 'mongo'.
+    """
+    backend = os.environ.get("LLM_CACHE_BACKEND", "memory").lower()
+    shared_tier = None
+
+    if backend == "sqlite":
+        shared_tier = SQLiteCacheTier(os.environ.get("LLM_CACHE_SQLITE_PATH", "/tmp/hireready_llm_cache.sqlite3"))
+    elif backend == "mongo" and db is not None:
+        shared_tier = MongoCacheTier(db.llm_cache)
+
+    return LLMResponseCache(
+        max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 512)),
+        default_ttl=int(os.environ.get("LLM_CACHE_TTL", 3600)),
+        schema_ttls=schema_ttls,
+        shared_tier=shared_tier
+    )
@@ -0,0 +1,234 @@
+import sys
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pymongo import monitoring
+
+# Flask endpoint the current work is done for; set per request, copied into pool threads.
+current_route = contextvars.ContextVar("current_route", default="background")
+# Request id used to correlate log lines, and this request's [(stage, seconds)] when tracing.
+current_request_id = contextvars.ContextVar("current_request_id", default=None)
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that runs each task in a copy of the submitter's contextvars."""
+
+    def submit(self, fn, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+# Structured logs: one JSON object per line on stdout.
+class JSONLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage(),
+            "route": current_route.get(),
+        }
+        request_id = current_request_id.get()
+        if request_id:
+            entry["request_id"] = request_id
+        entry.update(getattr(record, 'fields', {}))
+        return json.dumps(entry, default=str)
+
+
+logger = logging.getLogger("hireready")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(JSONLogFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def log_event(message, level="info", **fields):
+    logger.log(logging.getLevelName(level.upper()), message, extra={"fields": fields})
+
+
+# Prometheus text exposition without the client library. Values are per process;
+# scrape every gunicorn worker (or sum across them) for host totals.
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self):
+        """{label values tuple: count}, for reports that don't go through /metrics."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, counts):
+                    labels = _label_text(self.labelnames, key, [("le", _format_number(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {total!r}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "hireready_http_request_duration_seconds", "Time to produce a response, by route.", ("route", "method", "status")
+)
+STAGE_SECONDS = registry.histogram(
+    "hireready_stage_duration_seconds", "Time spent in one hot-path stage.", ("stage", "route")
+)
+GEMINI_ATTEMPT_SECONDS = registry.histogram(
+    "hireready_gemini_attempt_duration_seconds", "One Gemini generate_content attempt.", ("schema", "outcome")
+)
+MONGO_COMMAND_SECONDS = registry.histogram(
+    "hireready_mongo_command_duration_seconds", "Mongo command round trips.", ("command", "outcome")
+)
+LLM_CACHE_LOOKUPS = registry.counter(
+    "hireready_llm_cache_lookups_total", "LLM response cache lookups.", ("schema", "result")
+)
+GEMINI_RETRIES = registry.counter(
+    "hireready_gemini_retries_total", "Gemini attempts that were retried.", ("schema", "reason")
+)
+GEMINI_FAILURES = registry.counter(
+    "hireready_gemini_failures_total", "Gemini calls that failed after all attempts.", ("schema", "reason")
+)
+GEMINI_HEDGES = registry.counter(
+    "hireready_gemini_hedges_total", "Calls that sent a hedge, by which attempt answered first.", ("schema", "result")
+)
+LLM_OUTPUT_REPAIRS = registry.counter(
+    "hireready_llm_output_repairs_total", "Gemini answers that broke their schema, by how they were fixed.", ("schema", "result")
+)
+GEMINI_TOKENS = registry.counter(
+    "hireready_gemini_tokens_total", "Gemini tokens by direction.", ("schema", "direction")
+)
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage, route=current_route.get())
+    trace = current_trace.get()
+    if trace is not None:
+        trace.append((stage, seconds))
+
+
+@contextmanager
+def timed_stage(stage):
+    """Times the block into hireready_stage_duration_seconds and the request trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def server_timing(trace):
+    """Server-Timing header value, durations summed per stage."""
+    totals = {}
+    for stage, seconds in trace:
+        count, total = totals.get(stage, (0, 0.0))
+        totals[stage] = (count + 1, total + seconds)
+    return ", ".join(
+        f'{stage};dur={total * 1000:.1f};desc="x{count}"' for stage, (count, total) in totals.items()
+    )
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener feeding hireready_mongo_command_duration_seconds and the request trace."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._observe(event, "ok")
+
+    def failed(self, event):
+        self._observe(event, "error")
+
+    def _observe(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, command=event.command_name, outcome=outcome)
+        record_stage("mongo", seconds)
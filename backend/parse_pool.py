@@ -0,0 +1,194 @@
+import io
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from document_extractor import extract_text, stream_size, ExtractionLimits, DocumentTooLarge
+from observability import log_event
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+class ParseCrashed(Exception):
+    pass
+
+
+class ParsePoolBusy(Exception):
+    pass
+
+
+def _worker_main(conn, max_memory_mb):
+    """Runs in the child process: parse whatever arrives on the pipe until it closes."""
+    if max_memory_mb:
+        try:
+            import resource
+            limit = max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except Exception as e:
+            log_event("Could not cap parse worker memory", level="warning", error=str(e))
+
+    while True:
+        try:
+            data, mime_type, limits = conn.recv()
+        except EOFError:
+            return
+        try:
+            text, truncated = extract_text(io.BytesIO(data), mime_type, ExtractionLimits(**limits))
+            conn.send(("ok", (text, truncated)))
+        except DocumentTooLarge as e:
+            conn.send(("too_large", str(e)))
+        except MemoryError:
+            conn.send(("error", "Document needs too much memory to parse."))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, max_memory_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, max_memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        finally:
+            self.conn.close()
+
+
+class DocumentParsePool:
+    """
+    Fixed set of parser processes. pypdf is pure Python and CPU-bound, so parsing in
+    the request thread stalls every other request on the worker through the GIL.
+    Each task gets a hard timeout: a worker that hangs or dies (malformed PDF,
+    memory cap) is killed and replaced, and only that upload fails.
+    Workers start on first use, i.e. after gunicorn has forked.
+    """
+
+    def __init__(self, max_workers=2, task_timeout=10, queue_timeout=5, max_memory_mb=None, start_method="spawn"):
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        self.queue_timeout = queue_timeout
+        self.max_memory_mb = max_memory_mb
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._counters = {"completed": 0, "failed": 0, "timeouts": 0, "crashes": 0, "rejected": 0}
+        self._parse_times = deque(maxlen=500)
+        self._queue_waits = deque(maxlen=500)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if not self._started:
+                for _ in range(self.max_workers):
+                    self._idle.put(_Worker(self._ctx, self.max_memory_mb))
+                self._started = True
+
+    def _count(self, field):
+        with self._lock:
+            self._counters[field] += 1
+
+    def extract(self, stream, mime_type, limits):
+        """Same contract as document_extractor.extract_text, run in a worker process."""
+        if stream_size(stream) > limits.max_bytes:
+            raise DocumentTooLarge(f"File is larger than {limits.max_bytes // (1024 * 1024)} MB.")
+
+        if self.max_workers <= 0:
+            return extract_text(stream, mime_type, limits)
+
+        self._ensure_started()
+        data = stream.read()
+
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            self._count("rejected")
+            raise ParsePoolBusy("Document parser is busy, please retry shortly.")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        self._queue_waits.append(time.perf_counter() - queued_at)
+
+        with self._lock:
+            self._in_flight += 1
+        started_at = time.perf_counter()
+        healthy = False
+        try:
+            worker.conn.send((data, mime_type, vars(limits)))
+            if not worker.conn.poll(self.task_timeout):
+                self._count("timeouts")
+                raise ParseTimeout("Document took too long to parse.")
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                self._count("crashes")
+                raise ParseCrashed("Document parser crashed on this file.")
+            healthy = True
+        except (BrokenPipeError, EOFError):
+            self._count("crashes")
+            raise ParseCrashed("Document parser crashed on this file.")
+        finally:
+            self._parse_times.append(time.perf_counter() - started_at)
+            with self._lock:
+                self._in_flight -= 1
+            if healthy:
+                self._idle.put(worker)
+            else:
+                worker.kill()
+                self._idle.put(_Worker(self._ctx, self.max_memory_mb))
+
+        if status == "ok":
+            self._count("completed")
+            return payload
+        self._count("failed")
+        if status == "too_large":
+            raise DocumentTooLarge(payload)
+        raise Exception(payload)
+
+    def stats(self):
+        parse_times = sorted(self._parse_times)
+        queue_waits = sorted(self._queue_waits)
+
+        def percentile(values, pct):
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(len(values) * pct))] * 1000, 1)
+
+        with self._lock:
+            return {
+                **self._counters,
+                "workers": self.max_workers,
+                "queue_depth": self._waiting,
+                "in_flight": self._in_flight,
+                "parse_ms_p50": percentile(parse_times, 0.5),
+                "parse_ms_p95": percentile(parse_times, 0.95),
+                "queue_wait_ms_p95": percentile(queue_waits, 0.95)
+            }
+
+
+def build_parse_pool():
+    """
+    PARSE_POOL_WORKERS=0 parses inline in the request thread (handy for local development).
+    """
+    max_memory_mb = int(os.environ.get("PARSE_WORKER_MAX_MEMORY_MB", 512))
+    return DocumentParsePool(
+        max_workers=int(os.environ.get("PARSE_POOL_WORKERS", 2)),
+        task_timeout=float(os.environ.get("PARSE_TASK_TIMEOUT", 10)),
+        queue_timeout=float(os.environ.get("PARSE_QUEUE_TIMEOUT", 5)),
+        max_memory_mb=max_memory_mb or None,
+        start_method=os.environ.get("PARSE_POOL_START_METHOD", "spawn")
+    )
@@ -0,0 +1,118 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from observability import record_stage, log_event
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def hash_rounds(password_hash):
+    """Cost factor encoded in a bcrypt hash, e.g. 12 for '$2b$12$...'."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own small thread pool. bcrypt releases the GIL while hashing,
+    so a burst of sign-ins is capped at max_workers CPU cores and queues here
+    instead of occupying every request thread. Requests that would wait longer
+    than queue_timeout are turned away with HasherBusy.
+    """
+
+    def __init__(self, rounds=12, max_workers=2, queue_timeout=10):
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._hash_times = deque(maxlen=500)
+        self._queue_waits = deque(maxlen=500)
+        self._counters = {"hashes": 0, "checks": 0, "rehashes": 0, "rejected": 0}
+
+    def _run(self, fn, *args):
+        submitted_at = time.perf_counter()
+
+        timings = {}
+
+        def timed():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                timings["queue"] = started_at - submitted_at
+                timings["bcrypt"] = finished_at - started_at
+                self._queue_waits.append(timings["queue"])
+                self._hash_times.append(timings["bcrypt"])
+
+        future = self._executor.submit(timed)
+        try:
+            result = future.result(timeout=self.queue_timeout)
+            # Recorded from the request thread so they land on the request's route and trace.
+            record_stage("bcrypt_queue", timings["queue"])
+            record_stage("bcrypt", timings["bcrypt"])
+            return result
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise HasherBusy("Authentication is busy, please retry shortly.")
+
+    def hash(self, password):
+        import bcrypt
+        with self._lock:
+            self._counters["hashes"] += 1
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def check(self, password, password_hash):
+        import bcrypt
+        with self._lock:
+            self._counters["checks"] += 1
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        return hash_rounds(password_hash) != self.rounds
+
+    def rehash_in_background(self, password, on_done):
+        """Re-hashes at the configured cost after the response has gone out; on_done stores it."""
+        def work():
+            import bcrypt
+            try:
+                salt = bcrypt.gensalt(rounds=self.rounds)
+                on_done(bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8'))
+                with self._lock:
+                    self._counters["rehashes"] += 1
+            except Exception as e:
+                log_event("Password rehash failed", level="error", error=str(e))
+        self._executor.submit(work)
+
+    def stats(self):
+        def percentile(values, pct):
+            values = sorted(values)
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(len(values) * pct))] * 1000, 1)
+
+        with self._lock:
+            return {
+                **self._counters,
+                "rounds": self.rounds,
+                "hash_ms_p50": percentile(self._hash_times, 0.5),
+                "hash_ms_p95": percentile(self._hash_times, 0.95),
+                "queue_wait_ms_p95": percentile(self._queue_waits, 0.95)
+            }
+
+
+def build_password_hasher():
+    return PasswordHasher(
+        rounds=int(os.environ.get("BCRYPT_ROUNDS", 12)),
+        max_workers=int(os.environ.get("BCRYPT_WORKERS", 2)),
+        queue_timeout=float(os.environ.get("BCRYPT_QUEUE_TIMEOUT", 10))
+    )
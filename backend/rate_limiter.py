@@ -0,0 +1,246 @@
+import os
+import math
+import time
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from observability import log_event
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+def _refill(tokens, updated_at, capacity, rate, now):
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets for a single process."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take_many(self, requests):
+        """
+        requests: [(name, capacity, rate_per_sec, amount, reserve)]
+        Takes from every bucket or none. Returns 0 on success, else seconds until it would fit.
+        """
+        now = time.time()
+        with self._lock:
+            levels = {}
+            wait = 0.0
+            for name, capacity, rate, amount, reserve in requests:
+                tokens, updated_at = self._buckets.get(name, (capacity, now))
+                tokens = _refill(tokens, updated_at, capacity, rate, now)
+                levels[name] = tokens
+                if tokens - amount < reserve:
+                    wait = max(wait, (amount + reserve - tokens) / rate)
+            if wait == 0:
+                for name, capacity, rate, amount, reserve in requests:
+                    levels[name] -= amount
+            for name, tokens in levels.items():
+                self._buckets[name] = (tokens, now)
+            return wait
+
+    def drain(self, name):
+        with self._lock:
+            self._buckets[name] = (0.0, time.time())
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a local SQLite file so every gunicorn worker on the host
+    draws from the same budget. BEGIN IMMEDIATE serializes the read-modify-write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take_many(self, requests):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = {}
+            wait = 0.0
+            for name, capacity, rate, amount, reserve in requests:
+                row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens = _refill(tokens, updated_at, capacity, rate, now)
+                levels[name] = tokens
+                if tokens - amount < reserve:
+                    wait = max(wait, (amount + reserve - tokens) / rate)
+            if wait == 0:
+                for name, capacity, rate, amount, reserve in requests:
+                    levels[name] -= amount
+            for name, tokens in levels.items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (name, tokens, now)
+                )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def drain(self, name):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, 0, ?)",
+            (name, time.time())
+        )
+
+
+class GeminiGovernor:
+    """
+    Sits in front of every Gemini call:
+    - requests-per-minute and tokens-per-minute token buckets (shared through the bucket store),
+    - a max-in-flight cap for this process,
+    - priority classes: background work can't use the reserved share of either,
+      and gives up sooner than interactive work.
+    When the budget can't be met within the priority's wait allowance it raises
+    RateLimitExceeded so the route can answer 503 + Retry-After right away.
+    """
+
+    def __init__(self, store, rpm, tpm, max_in_flight, reserve_fraction=0.2, max_wait=None):
+        self.store = store
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.reserve_fraction = reserve_fraction
+        self.max_wait = max_wait or {PRIORITY_INTERACTIVE: 5.0, PRIORITY_BACKGROUND: 1.0}
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _slot_limit(self, priority):
+        if priority == PRIORITY_BACKGROUND:
+            return max(1, int(self.max_in_flight * (1 - self.reserve_fraction)))
+        return self.max_in_flight
+
+    def _bucket_requests(self, priority, tokens):
+        reserve = self.reserve_fraction if priority == PRIORITY_BACKGROUND else 0.0
+        return [
+            ("gemini_rpm", self.rpm, self.rpm / 60.0, 1, self.rpm * reserve),
+            ("gemini_tpm", self.tpm, self.tpm / 60.0, min(tokens, self.tpm), self.tpm * reserve),
+        ]
+
+    @contextmanager
+    def acquire(self, priority=PRIORITY_INTERACTIVE, tokens=0):
+        deadline = time.time() + self.max_wait.get(priority, 0)
+        limit = self._slot_limit(priority)
+
+        with self._cond:
+            while self._in_flight >= limit:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise RateLimitExceeded("Too many AI requests in flight, please retry shortly.", 1)
+                self._cond.wait(remaining)
+            self._in_flight += 1
+
+        try:
+            while True:
+                wait = self.store.take_many(self._bucket_requests(priority, tokens))
+                if wait == 0:
+                    break
+                if time.time() + wait > deadline:
+                    raise RateLimitExceeded("AI request budget exhausted, please retry shortly.", wait)
+                time.sleep(wait)
+            yield
+        finally:
+            self._release_slot()
+
+    @asynccontextmanager
+    async def acquire_async(self, priority=PRIORITY_INTERACTIVE, tokens=0, poll_interval=0.05):
+        """
+        acquire() for coroutines. Shares the in-flight count with threaded callers but waits
+        with asyncio.sleep, polling for a free slot, so the event loop keeps serving.
+        """
+        deadline = time.time() + self.max_wait.get(priority, 0)
+        limit = self._slot_limit(priority)
+
+        while not self._try_take_slot(limit):
+            if time.time() >= deadline:
+                raise RateLimitExceeded("Too many AI requests in flight, please retry shortly.", 1)
+            await asyncio.sleep(poll_interval)
+
+        try:
+            while True:
+                # The SQLite store can block on the file lock held by another worker.
+                wait = await asyncio.to_thread(self.store.take_many, self._bucket_requests(priority, tokens))
+                if wait == 0:
+                    break
+                if time.time() + wait > deadline:
+                    raise RateLimitExceeded("AI request budget exhausted, please retry shortly.", wait)
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            self._release_slot()
+
+    def _try_take_slot(self, limit):
+        with self._cond:
+            if self._in_flight >= limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release_slot(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def report_throttled(self):
+        """Gemini answered 429: empty the request bucket so every worker backs off together."""
+        try:
+            self.store.drain("gemini_rpm")
+        except Exception as e:
+            log_event("Could not drain rate limit bucket", level="warning", error=str(e))
+
+    def stats(self):
+        return {"in_flight": self._in_flight, "max_in_flight": self.max_in_flight, "rpm": self.rpm, "tpm": self.tpm}
+
+
+def estimate_tokens(*texts):
+    # Roughly 4 characters per token for English prose; good enough for budgeting.
+    return sum(len(t) for t in texts) // 4 + 1
+
+
+def build_governor():
+    """
+    RATE_LIMIT_BACKEND: 'sqlite' (default, shared by workers on the host) or 'memory'.
+    """
+    backend = os.environ.get("RATE_LIMIT_BACKEND", "sqlite").lower()
+    if backend == "memory":
+        store = MemoryBucketStore()
+    else:
+        store = SQLiteBucketStore(os.environ.get("RATE_LIMIT_SQLITE_PATH", "/tmp/hireready_rate_limit.sqlite3"))
+
+    return GeminiGovernor(
+        store,
+        rpm=int(os.environ.get("GEMINI_RPM", 60)),
+        tpm=int(os.environ.get("GEMINI_TPM", 1000000)),
+        max_in_flight=int(os.environ.get("GEMINI_MAX_IN_FLIGHT", 8)),
+        reserve_fraction=float(os.environ.get("GEMINI_INTERACTIVE_RESERVE", 0.2))
+    )
@@ -0,0 +1,216 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque, defaultdict
+from concurrent.futures import wait, FIRST_COMPLETED
+from rate_limiter import RateLimitExceeded
+from observability import log_event
+
+# Monotonic time by which the current request's Gemini work must be done; set per request
+# from its route's budget and copied into pipeline threads and tasks with the other contextvars.
+current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+class GeminiUnavailable(RateLimitExceeded):
+    """The circuit breaker is open: answer 503 + Retry-After without calling Gemini."""
+
+
+class GeminiDeadlineExceeded(Exception):
+    """The request's Gemini budget ran out before another attempt could fit."""
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-process breaker over Gemini outcomes. Opens when at least failure_ratio of the
+    last `window` calls (and min_calls of them) failed transiently, rejects calls for
+    `cooldown` seconds, then lets one probe through at a time: a success closes it again,
+    a failure re-opens it. 4xx and 429 answers mean Gemini is up and don't count as failures.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window=20, min_calls=10, failure_ratio=0.5, cooldown=30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """Raises GeminiUnavailable unless a call may go out now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self._stats["rejected"] += 1
+        raise GeminiUnavailable("The AI service is degraded, please retry shortly.", max(remaining, 1))
+
+    def record(self, failed):
+        """failed: True for a transient failure, False for a success, None for neither (429s, 4xx)."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                elif failed is False:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if failed is None or self.state == self.OPEN:
+                return
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures >= self.failure_ratio * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._stats["opened"] += 1
+        log_event("Gemini circuit breaker opened", level="warning", cooldown=self.cooldown)
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "recent_failures": sum(self._outcomes), "recent_calls": len(self._outcomes), **self._stats}
+
+
+class HedgePolicy:
+    """
+    Tracks successful attempt latencies per schema and decides when to hedge: a second
+    copy of a call goes out once the first has run past the schema's observed p95, and
+    only while hedges stay under max_ratio of all calls, so a slow Gemini can't double our load.
+    """
+
+    def __init__(self, enabled=False, window=200, min_samples=20, min_delay=0.5, max_ratio=0.1):
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._p95 = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+
+    def observe(self, schema_name, seconds):
+        with self._lock:
+            samples = self._samples[schema_name]
+            samples.append(seconds)
+            # Re-sorting 200 floats is cheap, but there's no need to do it on every call.
+            if len(samples) >= self.min_samples and (schema_name not in self._p95 or len(samples) % 10 == 0):
+                ordered = sorted(samples)
+                self._p95[schema_name] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def hedge_after(self, schema_name):
+        """Seconds to wait before hedging a new call, or None to not hedge it."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._stats["calls"] += 1
+            p95 = self._p95.get(schema_name)
+        return None if p95 is None else max(p95, self.min_delay)
+
+    def try_hedge(self):
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.max_ratio * self._stats["calls"] + 1:
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def record_result(self, hedge_won):
+        if hedge_won:
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+        return "won" if hedge_won else "lost"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "p95_seconds": {name: round(p95, 3) for name, p95 in self._p95.items()}
+            }
+
+
+def run_hedged(executor, fn, hedge_after, policy):
+    """
+    Runs fn() on executor. If it is still running after hedge_after seconds (and the policy
+    allows it) a second fn() races it. Returns (result, hedge) from the first success, where
+    hedge is None, "won" or "lost"; raises the last error if both fail. The losing thread
+    finishes on its own timeout.
+    """
+    first = executor.submit(fn)
+    done, _ = wait([first], timeout=hedge_after)
+    if done or not policy.try_hedge():
+        return first.result(), None
+
+    second = executor.submit(fn)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), policy.record_result(future is second)
+            error = future.exception()
+    raise error
+
+
+async def run_hedged_async(fn, hedge_after, policy):
+    """run_hedged for coroutines; the losing attempt is cancelled instead of left to finish."""
+    first = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait([first], timeout=hedge_after)
+    if done or not policy.try_hedge():
+        return await first, None
+
+    second = asyncio.ensure_future(fn())
+    pending = {first, second}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), policy.record_result(task is second)
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def build_circuit_breaker():
+    return CircuitBreaker(
+        window=int(os.environ.get("GEMINI_BREAKER_WINDOW", 20)),
+        min_calls=int(os.environ.get("GEMINI_BREAKER_MIN_CALLS", 10)),
+        failure_ratio=float(os.environ.get("GEMINI_BREAKER_FAILURE_RATIO", 0.5)),
+        cooldown=float(os.environ.get("GEMINI_BREAKER_COOLDOWN", 30))
+    )
+
+
+def build_hedge_policy():
+    """GEMINI_HEDGE=1 turns hedging on; it costs extra Gemini calls, so it is off by default."""
+    return HedgePolicy(
+        enabled=os.environ.get("GEMINI_HEDGE", "0") == "1",
+        min_samples=int(os.environ.get("GEMINI_HEDGE_MIN_SAMPLES", 20)),
+        min_delay=float(os.environ.get("GEMINI_HEDGE_MIN_DELAY", 0.5)),
+        max_ratio=float(os.environ.get("GEMINI_HEDGE_MAX_RATIO", 0.1))
+    )
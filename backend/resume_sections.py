@@ -0,0 +1,152 @@
+import re
+import hashlib
+
+# Heading text (lowercased, punctuation stripped) -> canonical section name.
+SECTION_HEADINGS = {
+    "summary": "Summary",
+    "professional summary": "Summary",
+    "profile": "Summary",
+    "objective": "Summary",
+    "about me": "Summary",
+    "experience": "Experience",
+    "work experience": "Experience",
+    "professional experience": "Experience",
+    "employment history": "Experience",
+    "work history": "Experience",
+    "internships": "Experience",
+    "skills": "Skills",
+    "technical skills": "Skills",
+    "core competencies": "Skills",
+    "key skills": "Skills",
+    "education": "Education",
+    "academic background": "Education",
+    "projects": "Projects",
+    "personal projects": "Projects",
+    "academic projects": "Projects",
+    "certifications": "Certifications",
+    "licenses and certifications": "Certifications",
+    "awards": "Achievements",
+    "achievements": "Achievements",
+    "honors and awards": "Achievements",
+    "publications": "Publications",
+    "volunteer experience": "Volunteering",
+    "volunteering": "Volunteering",
+    "leadership": "Leadership",
+    "activities": "Activities",
+    "extracurricular activities": "Activities",
+    "languages": "Languages",
+    "interests": "Interests",
+}
+
+# Text above the first heading is usually name and contact details; nothing to analyze there.
+PREAMBLE_SECTION = "Contact"
+
+
+def _heading_key(line):
+    return re.sub(r"[^a-z& ]", "", line.lower().replace("&", " and ")).strip()
+
+
+def _match_heading(line):
+    stripped = line.strip().strip(':').strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    key = re.sub(r"\s+", " ", _heading_key(stripped))
+    return SECTION_HEADINGS.get(key)
+
+
+def split_sections(resume_text):
+    """
+    Splits a resume into [(section name, text)] on recognised headings.
+    Repeated headings get a numeric suffix so every section name is unique.
+    """
+    sections = []
+    current_name = PREAMBLE_SECTION
+    current_lines = []
+    seen = {}
+
+    def flush():
+        text = "\n".join(current_lines).strip()
+        if text:
+            sections.append((current_name, text))
+
+    for line in (resume_text or "").splitlines():
+        heading = _match_heading(line)
+        if heading:
+            flush()
+            seen[heading] = seen.get(heading, 0) + 1
+            current_name = heading if seen[heading] == 1 else f"{heading} {seen[heading]}"
+            current_lines = []
+        else:
+            current_lines.append(line)
+    flush()
+
+    if not any(name != PREAMBLE_SECTION for name, _ in sections):
+        # No headings recognised: treat the whole document as one section.
+        text = (resume_text or "").strip()
+        return [("Resume", text)] if text else []
+    return sections
+
+
+def normalize_section(text):
+    """Drops blank lines and edge whitespace so re-flowed but unchanged sections compare equal."""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def fingerprint(text):
+    return hashlib.sha256(normalize_section(text).encode('utf-8')).hexdigest()[:16]
+
+
+def merge_section_results(requirements, section_results):
+    """
+    Combines per-section results into an ANALYSIS_SCHEMA-shaped response.
+    requirements: [{"keyword", "importance"}] extracted once from the JD.
+    section_results: [(section name, section text, result)]
+    The score blends importance-weighted requirement coverage with the
+    length-weighted quality of the sections; run_incremental_analysis shifts it
+    onto the full analysis's scale.
+    """
+    covered = {}
+    content_improvements = []
+    formatting_advice = []
+    quality_total = 0.0
+    quality_weight = 0
+
+    for name, text, result in section_results:
+        for keyword in result.get('covered_requirements', []):
+            covered.setdefault(keyword.lower(), keyword)
+        for item in result.get('content_improvements', []):
+            content_improvements.append({**item, "detail": f"[{name}] {item.get('detail', '')}"})
+        for item in result.get('formatting_advice', []):
+            formatting_advice.append({**item, "detail": f"[{name}] {item.get('detail', '')}"})
+        if isinstance(result.get('quality_score'), (int, float)):
+            quality_total += result['quality_score'] * len(text)
+            quality_weight += len(text)
+
+    ranked = sorted(requirements, key=lambda r: -int(r.get('importance', 1) or 1))
+    strengths = []
+    gaps = []
+    total_importance = 0
+    covered_importance = 0
+    for requirement in ranked:
+        keyword = requirement.get('keyword', '')
+        importance = int(requirement.get('importance', 1) or 1)
+        total_importance += importance
+        if keyword.lower() in covered:
+            covered_importance += importance
+            strengths.append(keyword)
+        else:
+            gaps.append(keyword)
+
+    coverage = covered_importance / total_importance if total_importance else 0.0
+    quality = quality_total / quality_weight if quality_weight else coverage * 100
+    ats_score = int(round(0.7 * coverage * 100 + 0.3 * quality))
+
+    return {
+        "ats_score": max(1, min(100, ats_score)),
+        "feedback": {
+            "keyword_gaps": gaps,
+            "keyword_strengths": strengths,
+            "content_improvements": content_improvements,
+            "formatting_advice": formatting_advice
+        }
+    }
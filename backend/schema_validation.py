@@ -0,0 +1,240 @@
+import json
+import math
+
+# Validation and local repair of Gemini JSON output against the *_SCHEMA dicts in app.py.
+#
+# A SchemaValidator walks its schema once, up front, into a tree of small fixer functions, so
+# checking an answer is a single pass over the parsed value. Repairs that don't need the model:
+#   - code fences and chatter around the JSON are stripped,
+#   - output cut off mid-generation is closed at the last complete value,
+#   - numbers are coerced and clamped into the bounds given for their field (e.g. ats_score 1-100),
+#   - missing or malformed arrays become [],
+#   - array items that break the schema (enum violations, missing fields) are dropped.
+# What's left is reported as missing top-level fields, which the caller can re-ask for alone.
+
+_INVALID = object()
+
+
+class SchemaViolation(ValueError):
+    """Model output that couldn't be repaired into something usable; regenerate it."""
+
+
+def strip_code_fences(text):
+    """The JSON inside ```json fences or leading/trailing chatter, if there is any."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+        text = text.strip()
+    if text and text[0] not in "{[":
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+        if starts:
+            text = text[min(starts):]
+    return text
+
+
+def close_truncated_json(text, max_tries=32):
+    """
+    Best-effort completion of JSON that was cut off (output token limit, dropped stream):
+    backs up to the last place a value ended and closes whatever is still open.
+    Returns the parsed value, or None when no prefix can be closed.
+    """
+    stack = []
+    cuts = []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == '"':
+            in_string = True
+        elif ch == "{" or ch == "[":
+            stack.append("}" if ch == "{" else "]")
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == "}" or ch == "]":
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    # A trailing number or literal is kept if closing right after it parses.
+    if not in_string:
+        cuts.append((len(text), "".join(reversed(stack))))
+    for end, closers in reversed(cuts[-max_tries:]):
+        try:
+            return json.loads(text[:end].rstrip().rstrip(",") + closers)
+        except ValueError:
+            continue
+    return None
+
+
+def load_model_json(text):
+    """
+    json.loads for model output: the plain parse first, then fence stripping and truncation
+    repair. Returns (value, fixes) where fixes names the repairs applied.
+    """
+    try:
+        return json.loads(text), []
+    except ValueError:
+        pass
+    fixes = []
+    stripped = strip_code_fences(text or "")
+    if stripped != (text or "").strip():
+        fixes.append("stripped")
+        try:
+            return json.loads(stripped), fixes
+        except ValueError:
+            pass
+    value = close_truncated_json(stripped)
+    if value is None:
+        raise SchemaViolation("Model output is not valid JSON.")
+    fixes.append("truncated")
+    return value, fixes
+
+
+def _compile(schema, bounds, name=""):
+    """fixer(value, fixes) -> repaired value or _INVALID, for one schema node."""
+    kind = schema.get("type", "STRING").upper()
+
+    if kind == "OBJECT":
+        fields = [
+            (key, _compile(sub, bounds, key), sub.get("type", "STRING").upper())
+            for key, sub in schema.get("properties", {}).items()
+        ]
+
+        def fix_object(value, fixes, missing=None):
+            if not isinstance(value, dict):
+                return _INVALID
+            fixed = {}
+            for key, fixer, field_kind in fields:
+                item = value.get(key)
+                result = _INVALID if item is None else fixer(item, fixes)
+                if result is _INVALID and field_kind in ("ARRAY", "OBJECT"):
+                    # Absent collections default to empty; an object only if all of its own fields can.
+                    result = [] if field_kind == "ARRAY" else fixer({}, fixes)
+                    if result is not _INVALID and item is not None:
+                        fixes.append(f"reset {key}")
+                if result is _INVALID:
+                    if missing is None:
+                        return _INVALID
+                    missing.append(key)
+                    continue
+                fixed[key] = result
+            return fixed
+        return fix_object
+
+    if kind == "ARRAY":
+        item_fixer = _compile(schema.get("items", {}), bounds, name)
+
+        def fix_array(value, fixes):
+            if not isinstance(value, list):
+                return _INVALID
+            fixed = [item for item in (item_fixer(v, fixes) for v in value) if item is not _INVALID]
+            if len(fixed) != len(value):
+                fixes.append(f"dropped {len(value) - len(fixed)} from {name or 'array'}")
+            return fixed
+        return fix_array
+
+    if kind in ("INTEGER", "NUMBER"):
+        cast = int if kind == "INTEGER" else float
+        low, high = bounds.get(name, (None, None))
+
+        def fix_number(value, fixes):
+            if isinstance(value, bool):
+                return _INVALID
+            if isinstance(value, str):
+                try:
+                    value = float(value.strip().rstrip("%"))
+                except ValueError:
+                    return _INVALID
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                return _INVALID
+            fixed = cast(round(value)) if cast is int else float(value)
+            if low is not None and fixed < low:
+                fixed = cast(low)
+            elif high is not None and fixed > high:
+                fixed = cast(high)
+            if fixed != value:
+                fixes.append(f"clamped {name}")
+            return fixed
+        return fix_number
+
+    if kind == "BOOLEAN":
+        def fix_boolean(value, fixes):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+            return _INVALID
+        return fix_boolean
+
+    enum = schema.get("enum")
+    options = set(enum or ())
+    # Models like to change case or trim the longer options; match those back to the exact value.
+    by_lower = {option.lower(): option for option in options}
+
+    def fix_string(value, fixes):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            return _INVALID
+        if enum is None or value in options:
+            return value
+        wanted = value.strip().lower()
+        option = by_lower.get(wanted)
+        if option is None and wanted:
+            option = next((o for o in enum if o.lower().startswith(wanted)), None)
+        if option is None:
+            return _INVALID
+        fixes.append(f"matched {name or 'enum'}")
+        return option
+    return fix_string
+
+
+class SchemaValidator:
+    """
+    Compiled check-and-repair for one Gemini response_schema. bounds maps field names to
+    (low, high) for numeric fields whose range the schema only states in prose.
+    """
+
+    def __init__(self, schema, bounds=None):
+        self.schema = schema
+        self.kind = schema.get("type", "STRING").upper()
+        self._fix = _compile(schema, bounds or {})
+
+    def validate(self, text):
+        """
+        Parses and repairs one model answer. Returns (value, missing, fixes): missing lists the
+        top-level fields that are absent and have no safe default. Raises SchemaViolation when
+        nothing usable came back.
+        """
+        value, fixes = load_model_json(text)
+        if self.kind == "OBJECT":
+            if not isinstance(value, dict) or not value.keys() & self.schema.get("properties", {}).keys():
+                raise SchemaViolation("Model output has none of the expected fields.")
+            missing = []
+            return self._fix(value, fixes, missing), missing, fixes
+
+        if self.kind == "ARRAY" and isinstance(value, dict) and len(value) == 1:
+            # {"suggestions": [...]} for a bare-array schema.
+            (inner,) = value.values()
+            if isinstance(inner, list):
+                value = inner
+                fixes.append("unwrapped")
+        fixed = self._fix(value, fixes)
+        if fixed is _INVALID:
+            raise SchemaViolation(f"Model output is not a valid {self.kind}.")
+        return fixed, [], fixes
+
+    def missing_schema(self, missing):
+        """response_schema asking for just the missing top-level fields."""
+        properties = self.schema.get("properties", {})
+        return {"type": "OBJECT", "properties": {key: properties[key] for key in missing}}
@@ -0,0 +1,103 @@
+import re
+import json
+
+_decoder = json.JSONDecoder()
+
+
+def sse_event(event, data, event_id=None):
+    """Formats one Server-Sent Event frame; event_id is what a reconnecting client sends as Last-Event-ID."""
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{frame}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class IncrementalJSONFields:
+    """
+    Watches a JSON document as it streams in and reports named fields as soon as
+    their values are complete, e.g. 'ats_score' long before 'formatting_advice'.
+    Field names are matched anywhere in the document, so they should be unique keys
+    in the schema.
+    """
+
+    def __init__(self, field_names):
+        self.pending = list(field_names)
+        self._patterns = {name: re.compile(r'"%s"\s*:\s*' % re.escape(name)) for name in field_names}
+
+    def feed(self, buffer):
+        completed = []
+        for name in list(self.pending):
+            match = self._patterns[name].search(buffer)
+            if not match:
+                continue
+            try:
+                value, end = _decoder.raw_decode(buffer, match.end())
+            except ValueError:
+                # Value is still being generated.
+                continue
+            if not isinstance(value, (str, list, dict)):
+                # Numbers and literals aren't self-terminating: "7" may still become "78".
+                rest = buffer[end:].lstrip()
+                if not rest or rest[0] not in ",}]":
+                    continue
+            self.pending.remove(name)
+            completed.append((name, value))
+        return completed
+
+
+class IncrementalJSONString:
+    """
+    Decodes the value of one long string field while it is still open, so text
+    like 'modified_draft' can be forwarded as it is produced.
+    """
+
+    def __init__(self, field_name):
+        self._pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field_name))
+        self._emitted = 0
+
+    def feed(self, buffer):
+        match = self._pattern.search(buffer)
+        if not match:
+            return ""
+        raw = buffer[match.end():]
+        end = _find_string_end(raw)
+        if end is not None:
+            raw = raw[:end]
+        else:
+            # Don't cut an escape sequence in half.
+            raw = _trim_partial_escape(raw)
+        try:
+            text = json.loads('"' + raw + '"')
+        except ValueError:
+            return ""
+        delta = text[self._emitted:]
+        self._emitted = len(text)
+        return delta
+
+
+def _find_string_end(raw):
+    escaped = False
+    for i, ch in enumerate(raw):
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '"':
+            return i
+    return None
+
+
+def _trim_partial_escape(raw):
+    backslash = raw.rfind('\\')
+    if backslash == -1:
+        return raw
+    # Count consecutive backslashes to know whether the last one starts an escape.
+    run = 0
+    i = backslash
+    while i >= 0 and raw[i] == '\\':
+        run += 1
+        i -= 1
+    tail = raw[backslash + 1:]
+    if run % 2 == 0:
+        return raw
+    if tail.startswith('u'):
+        return raw if len(tail) >= 5 else raw[:backslash]
+    return raw if tail else raw[:backslash]
@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported flat (`import token_budget`), as app.py does.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """app.py on mongomock and the benchmark's fake Gemini, with process-local backends."""
+    os.environ["BENCH_WORKDIR"] = str(tmp_path_factory.mktemp("app"))
+    os.environ["BENCH_FAKE_CONFIG"] = json.dumps({"gemini": {"latency": "fixed:0"}})
+    import benchmark
+    benchmark.fake_app()
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def auth(app_module):
+    """Authorization headers for a (created on first use) user with the given 24-hex-digit id."""
+    from bson import ObjectId
+
+    def headers(user_id):
+        app_module.users_collection.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$setOnInsert": {"username": "user-" + user_id, "email": user_id + "@example.com"}}, upsert=True
+        )
+        return {"Authorization": f"Bearer {app_module.issue_token(user_id, 'user-' + user_id)}"}
+    return headers
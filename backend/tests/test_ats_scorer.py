@@ -0,0 +1,18 @@
+from ats_scorer import quick_score
+
+JD = "Requirements: Docker and Salesforce experience."
+
+
+def test_generic_words_are_partial_evidence_not_the_product():
+    partial = quick_score("Deployed services in containers and ran the CRM migration.", JD)
+    assert partial["feedback"]["keyword_strengths"] == []
+    assert set(partial["feedback"]["keyword_gaps"]) == {"docker", "salesforce"}
+
+    exact = quick_score("Deployed services with Docker and ran the Salesforce migration.", JD)
+    missing = quick_score("Wrote Python scripts.", JD)
+    assert missing["coverage"] < partial["coverage"] < exact["coverage"]
+
+
+def test_posting_with_generic_words_does_not_ask_for_products():
+    result = quick_score("Python", "Experience with containers, dashboards and experimentation.")
+    assert result["feedback"]["keyword_gaps"] == []
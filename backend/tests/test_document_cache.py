@@ -0,0 +1,22 @@
+import os
+import stat
+
+from document_cache import build_document_cache
+
+
+def test_default_keeps_resume_text_in_memory(monkeypatch):
+    monkeypatch.delenv("DOCUMENT_CACHE_BACKEND", raising=False)
+    assert build_document_cache().cache.shared_tier is None
+
+
+def test_sqlite_tier_is_private_to_the_server_user(monkeypatch, tmp_path):
+    path = tmp_path / "cache" / "documents.sqlite3"
+    monkeypatch.setenv("DOCUMENT_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("DOCUMENT_CACHE_SQLITE_PATH", str(path))
+
+    cache = build_document_cache()
+    cache.put("digest", "Jane Doe, 555-0100", truncated=False)
+
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert cache.get_text("digest") == "Jane Doe, 555-0100"
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+
+def test_history_pages_through_ties_on_created_at(app_module, client, auth):
+    user_id = "d" * 24
+    headers = auth(user_id)
+    created_at = datetime(2026, 5, 1, 12, 0, 0)
+    inserted = app_module.analyses_collection.insert_many([
+        {"user_id": ObjectId(user_id), "ats_score": score, "target_job_title": f"Job {score}",
+         "analysis_json": {}, "created_at": created_at}
+        for score in range(5)
+    ]).inserted_ids
+
+    seen = []
+    cursor = None
+    for _ in range(len(inserted) + 1):
+        body = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        page = client.post("/get_history", json=body, headers=headers).get_json()
+        seen += [item["id"] for item in page["history"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [str(doc_id) for doc_id in sorted(inserted, reverse=True)]
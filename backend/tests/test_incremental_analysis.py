@@ -0,0 +1,58 @@
+import threading
+import time
+
+RESUME = (
+    "Dana Rivera\ndana@example.com\n\n"
+    "Experience\nBuilt billing services in Python and PostgreSQL at Acme.\n\n"
+    "Skills\nPython, PostgreSQL, Docker\n"
+)
+JD = "Backend engineer: Python, PostgreSQL and Kubernetes."
+
+
+def schema_calls(app_module):
+    return {name: totals["calls"] for name, totals in app_module.token_accountant.stats()["schemas"].items()}
+
+
+def calls_since(app_module, before):
+    return {name: count - before.get(name, 0) for name, count in schema_calls(app_module).items() if count != before.get(name, 0)}
+
+
+def wait_for_anchor(app_module, resume_text):
+    key = app_module.incremental_anchor_key(app_module.split_sections(resume_text), JD)
+    for _ in range(100):
+        anchor = app_module.llm_cache.get(key, "INCREMENTAL_ANCHOR")
+        if anchor is not None:
+            return anchor
+        time.sleep(0.05)
+    raise AssertionError("section cache was not seeded")
+
+
+def test_first_run_is_the_single_call_analysis_then_edits_reuse_sections(app_module, client):
+    before = schema_calls(app_module)
+    first = client.post("/analyze_resume/incremental", json={"resume": RESUME, "job_description": JD})
+    assert first.status_code == 200
+    assert [s["reused"] for s in first.get_json()["sections"]] == [False, False]
+    anchor = wait_for_anchor(app_module, RESUME)
+    # One answer call; the seeding prefetch is one requirements call plus one packed section call.
+    assert calls_since(app_module, before) == {
+        "ANALYSIS_SCHEMA": 1, "JD_REQUIREMENTS_SCHEMA": 1, "SECTIONS_ANALYSIS_SCHEMA": 1
+    }
+
+    edited = RESUME.replace("Python, PostgreSQL, Docker", "Python, PostgreSQL, Docker, Kubernetes")
+    before = schema_calls(app_module)
+    second = client.post("/analyze_resume/incremental", json={"resume": edited, "job_description": JD}).get_json()
+    assert [s["reused"] for s in second["sections"]] == [True, False]
+    assert calls_since(app_module, before) == {"SECTION_ANALYSIS_SCHEMA": 1}
+    assert isinstance(anchor["offset"], int) and 1 <= second["ats_score"] <= 100
+
+
+def test_seed_is_dropped_when_its_pool_is_busy(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "seed_slots", threading.BoundedSemaphore(1))
+    app_module.seed_slots.acquire()
+    resume = RESUME.replace("Dana Rivera", "Sam Okafor")
+
+    before = schema_calls(app_module)
+    response = client.post("/analyze_resume/incremental", json={"resume": resume, "job_description": JD})
+    assert response.status_code == 200
+    time.sleep(0.2)
+    assert calls_since(app_module, before) == {"ANALYSIS_SCHEMA": 1}
@@ -0,0 +1,37 @@
+from jd_index import MemoryJDStore, NearDuplicateJDIndex
+
+POSTING = (
+    "Platform Engineer\n"
+    "We build developer tooling for payments teams across three regions.\n"
+    "Requirements\n"
+    "- 10+ years of experience with Python and PostgreSQL\n"
+    "- Hands-on experience building Kubernetes operators\n"
+    "- Deep understanding of observability and incident response\n"
+    "Benefits\n"
+    "- Flexible remote work policy\n"
+    "- Annual learning budget"
+)
+
+
+def build_index():
+    return NearDuplicateJDIndex(MemoryJDStore())
+
+
+def test_reposted_jd_shares_the_canonical_id():
+    index = build_index()
+    original = index.canonicalize(POSTING)
+    reposted = "  " + POSTING.replace("\n", "\n\n") + "\n\nReq ID: R-48213\nPosted 3 days ago via https://jobs.example.com/x"
+    assert index.canonicalize(reposted) == original
+
+
+def test_changed_years_get_a_different_id():
+    index = build_index()
+    original = index.canonicalize(POSTING)
+    assert index.canonicalize(POSTING.replace("10+ years", "2+ years")) != original
+
+
+def test_index_stores_signatures_not_text():
+    store = MemoryJDStore()
+    NearDuplicateJDIndex(store).canonicalize(POSTING)
+    assert store.count() == 1
+    assert not any(isinstance(entry, str) for entry in store._entries.values())
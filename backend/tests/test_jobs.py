@@ -0,0 +1,38 @@
+import time
+
+
+def submit(client, headers=None):
+    body = {"resume": "Python developer", "job_description": "Python engineer wanted"}
+    response = client.post("/analyze_resume?async=1", json=body, headers=headers or {})
+    assert response.status_code == 202
+    return response.get_json()["job_id"]
+
+
+def wait_for(client, job_id, headers=None):
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}", headers=headers or {}).get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_signed_in_job_is_only_visible_to_its_owner(auth, client):
+    owner = auth("a" * 24)
+    job_id = submit(client, owner)
+
+    job = wait_for(client, job_id, owner)
+    assert job["status"] == "done" and job["result"]["status_code"] == 200 and "owner" not in job
+    assert client.get(f"/jobs/{job_id}").status_code == 401
+    assert client.get(f"/jobs/{job_id}", headers=auth("b" * 24)).status_code == 404
+    assert client.get(f"/jobs/{job_id}/events", headers=auth("b" * 24)).status_code == 404
+
+
+def test_events_resume_after_last_event_id(client):
+    job_id = submit(client)
+    wait_for(client, job_id)
+
+    stream = client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "running"}).get_data(as_text=True)
+    assert stream.startswith("retry: ")
+    assert "id: done\nevent: status" in stream
+    assert "id: running" not in stream
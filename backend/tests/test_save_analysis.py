@@ -0,0 +1,34 @@
+from blob_store import blob_id_for
+
+BODY = {
+    "analysis_result": {"ats_score": 70},
+    "resume_text": "Resume kept only by this save",
+    "job_description": "Job description kept only by this save",
+}
+
+
+class FailingCollection:
+    def insert_one(self, doc):
+        raise RuntimeError("write concern timeout")
+
+
+def blob_refs(app_module, text):
+    doc = app_module.text_blobs.collection.find_one({"_id": blob_id_for(text)})
+    return doc["refs"] if doc else 0
+
+
+def test_failed_insert_releases_blob_refs(app_module, client, auth, monkeypatch):
+    monkeypatch.setattr(app_module, "analyses_collection", FailingCollection())
+    response = client.post("/save_analysis", json=BODY, headers=auth("c" * 24))
+
+    assert response.status_code == 500
+    assert blob_refs(app_module, BODY["resume_text"]) == 0
+    assert blob_refs(app_module, BODY["job_description"]) == 0
+
+
+def test_saved_analysis_holds_one_ref_per_text(app_module, client, auth):
+    response = client.post("/save_analysis", json=BODY, headers=auth("c" * 24))
+
+    assert response.status_code == 201
+    assert blob_refs(app_module, BODY["resume_text"]) == 1
+    assert blob_refs(app_module, BODY["job_description"]) == 1
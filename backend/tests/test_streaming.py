@@ -0,0 +1,14 @@
+from streaming import IncrementalJSONFields
+
+
+def test_number_split_across_chunks_waits_for_its_delimiter():
+    fields = IncrementalJSONFields(["ats_score", "keyword_gaps"])
+    assert fields.feed('{"ats_score": 7') == []
+    assert fields.feed('{"ats_score": 78') == []
+    assert fields.feed('{"ats_score": 78, ') == [("ats_score", 78)]
+
+
+def test_literal_and_string_fields():
+    fields = IncrementalJSONFields(["done", "title"])
+    assert fields.feed('{"title": "Backend", "done": tru') == [("title", "Backend")]
+    assert fields.feed('{"title": "Backend", "done": true}') == [("done", True)]
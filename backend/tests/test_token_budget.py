@@ -0,0 +1,26 @@
+from token_budget import fit_documents, strip_boilerplate
+
+SINGLE_PARAGRAPH_JD = (
+    "Senior Backend Engineer\n"
+    "Requirements: 5+ years of Python, PostgreSQL and Kubernetes in production.\n"
+    "We are an equal opportunity employer.\n"
+    "Offers are contingent on a background check."
+)
+
+
+def test_single_paragraph_jd_keeps_its_requirements():
+    resume, jd, trimmed = fit_documents("resume text python", SINGLE_PARAGRAPH_JD, 12000)
+    assert "5+ years of Python, PostgreSQL and Kubernetes" in jd
+    assert "equal opportunity" not in jd
+    assert "background check" not in jd
+    assert (resume, trimmed) == ("resume text python", False)
+
+
+def test_boilerplate_sentence_is_cut_from_a_mixed_line():
+    text = "Python and Go required. We are an equal opportunity employer. Kafka is a plus."
+    assert strip_boilerplate(text) == "Python and Go required. Kafka is a plus."
+
+
+def test_posting_that_would_be_emptied_is_kept_whole():
+    text = "We are an equal opportunity employer and run a background check on every hire."
+    assert strip_boilerplate(text) == text
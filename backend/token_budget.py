@@ -0,0 +1,210 @@
+import os
+import re
+import threading
+from collections import deque, defaultdict
+from rate_limiter import estimate_tokens
+from observability import current_route, log_event, GEMINI_TOKENS
+
+CHARS_PER_TOKEN = 4
+
+
+# Paragraphs in job postings that say nothing about the role itself.
+BOILERPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r"equal (employment )?opportunity",
+    r"without regard to (race|age|sex|religion|color)",
+    r"reasonable accommodation",
+    r"\b(eeo|e-verify)\b",
+    r"privacy (policy|notice)",
+    r"background check",
+    r"(recruit(ment|ing)? agenc|unsolicited resumes)",
+    r"(click|press) (the )?apply",
+    r"how to apply",
+    r"(all|qualified) applicants will receive",
+]]
+
+# Heading keyword -> priority when a JD has to be cut. Higher survives longer.
+JD_SECTION_PRIORITIES = [
+    (re.compile(r"requirement|qualification|must have|what you.?ll need|skills|experience|you have|you bring", re.IGNORECASE), 3),
+    (re.compile(r"responsibilit|what you.?ll do|the role|duties|day to day|you will", re.IGNORECASE), 2),
+    (re.compile(r"nice to have|preferred|bonus|plus", re.IGNORECASE), 1),
+    (re.compile(r"about (us|the company|the team)|who we are|benefits|perks|compensation|salary|why join|our culture", re.IGNORECASE), 0),
+]
+DEFAULT_BLOCK_PRIORITY = 1
+# A posting that is mostly "boilerplate" was probably misread as such; keep it whole.
+MIN_KEPT_SHARE = 0.25
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+def normalize_whitespace(text):
+    """Collapses runs of spaces/tabs, strips line edges and keeps at most one blank line in a row."""
+    lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in (text or "").splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _paragraphs(text):
+    return [p for p in text.split("\n\n") if p.strip()]
+
+
+def _is_boilerplate(text):
+    return any(pattern.search(text) for pattern in BOILERPLATE_PATTERNS)
+
+
+def strip_boilerplate(job_description):
+    """
+    Drops EEO statements, legal notices and application instructions from a posting, one
+    sentence at a time so a notice on the same line or paragraph as real requirements
+    doesn't take them along. Returns the posting unchanged if stripping would leave
+    less than MIN_KEPT_SHARE of it.
+    """
+    kept_lines = []
+    for line in job_description.split("\n"):
+        if not line.strip() or not _is_boilerplate(line):
+            kept_lines.append(line)
+            continue
+        sentences = [s for s in _SENTENCE_BREAK.split(line) if not _is_boilerplate(s)]
+        if sentences:
+            kept_lines.append(" ".join(sentences))
+    stripped = re.sub(r"\n{3,}", "\n\n", "\n".join(kept_lines)).strip()
+    if len(stripped) < MIN_KEPT_SHARE * len(job_description.strip()):
+        return job_description
+    return stripped
+
+
+def _heading_priority(line):
+    for pattern, priority in JD_SECTION_PRIORITIES:
+        if pattern.search(line):
+            return priority
+    return None
+
+
+def truncate_by_priority(job_description, max_chars):
+    """
+    Cuts a posting down to max_chars keeping the paragraphs that matter most for matching
+    (requirements, then responsibilities, ...) and leaving company blurb and perks for last.
+    Paragraphs a heading introduces share its priority. Kept paragraphs stay in their original order.
+    """
+    if len(job_description) <= max_chars:
+        return job_description
+
+    blocks = []
+    priority = DEFAULT_BLOCK_PRIORITY
+    for paragraph in _paragraphs(job_description):
+        first_line = paragraph.split("\n", 1)[0]
+        heading_priority = _heading_priority(first_line) if len(first_line) <= 60 else None
+        if heading_priority is not None:
+            priority = heading_priority
+        blocks.append((priority, paragraph))
+
+    order = sorted(range(len(blocks)), key=lambda i: (-blocks[i][0], i))
+    keep = set()
+    used = 0
+    for i in order:
+        size = len(blocks[i][1]) + 2
+        if used + size > max_chars:
+            continue
+        keep.add(i)
+        used += size
+
+    text = "\n\n".join(blocks[i][1] for i in sorted(keep))
+    if not text:
+        # A single paragraph larger than the whole budget: keep its head.
+        text = blocks[order[0]][1][:max_chars]
+    return text
+
+
+def truncate_at_line(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars]
+
+
+def fit_documents(resume_text, job_description, budget_tokens, min_jd_share=0.4):
+    """
+    Normalizes both documents and trims them so together they fit budget_tokens.
+    The JD gives way first (boilerplate, then low-priority paragraphs) but keeps at
+    least min_jd_share of the budget; the resume is only cut if it alone is too big.
+    Returns (resume_text, job_description, trimmed).
+    """
+    resume = normalize_whitespace(resume_text)
+    jd = strip_boilerplate(normalize_whitespace(job_description))
+    if not budget_tokens or estimate_tokens(resume, jd) <= budget_tokens:
+        return resume, jd, False
+
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    jd_chars = max(int(budget_chars * min_jd_share), budget_chars - len(resume))
+    jd = truncate_by_priority(jd, jd_chars)
+    resume = truncate_at_line(resume, max(0, budget_chars - len(jd)))
+    return resume, jd, True
+
+
+def fit_job_description(job_description, budget_tokens):
+    jd = strip_boilerplate(normalize_whitespace(job_description))
+    if budget_tokens and estimate_tokens(jd) > budget_tokens:
+        return truncate_by_priority(jd, budget_tokens * CHARS_PER_TOKEN)
+    return jd
+
+
+def response_token_counts(response, prompt_text, response_text):
+    """(input, output) tokens from the response's usage metadata, estimated when it is missing."""
+    usage = getattr(response, 'usage_metadata', None)
+    input_tokens = getattr(usage, 'prompt_token_count', 0) or estimate_tokens(prompt_text)
+    output_tokens = getattr(usage, 'candidates_token_count', 0) or estimate_tokens(response_text)
+    return input_tokens, output_tokens
+
+
+class TokenAccountant:
+    """
+    Records input/output tokens for every Gemini call, keyed by route and by schema,
+    keeping the last `window` calls per route for percentiles.
+    """
+
+    def __init__(self, window=1000, log_calls=True):
+        self.window = window
+        self.log_calls = log_calls
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._route_totals = defaultdict(lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0, "trimmed_prompts": 0})
+        self._schema_totals = defaultdict(lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+
+    def record(self, schema_name, input_tokens, output_tokens):
+        route = current_route.get()
+        with self._lock:
+            self._samples[route].append((input_tokens, output_tokens))
+            for totals in (self._route_totals[route], self._schema_totals[schema_name]):
+                totals["calls"] += 1
+                totals["input_tokens"] += input_tokens
+                totals["output_tokens"] += output_tokens
+        GEMINI_TOKENS.inc(input_tokens, schema=schema_name, direction="input")
+        GEMINI_TOKENS.inc(output_tokens, schema=schema_name, direction="output")
+        if self.log_calls:
+            log_event("Gemini tokens", schema=schema_name, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def record_trim(self):
+        with self._lock:
+            self._route_totals[current_route.get()]["trimmed_prompts"] += 1
+
+    def stats(self):
+        def percentile(values, pct):
+            if not values:
+                return None
+            return values[min(len(values) - 1, int(len(values) * pct))]
+
+        with self._lock:
+            routes = {}
+            for route, totals in self._route_totals.items():
+                inputs = sorted(s[0] for s in self._samples[route])
+                outputs = sorted(s[1] for s in self._samples[route])
+                routes[route] = {
+                    **totals,
+                    **{f"input_p{p}": percentile(inputs, p / 100) for p in (50, 95, 99)},
+                    **{f"output_p{p}": percentile(outputs, p / 100) for p in (50, 95, 99)}
+                }
+            return {"routes": routes, "schemas": {name: dict(t) for name, t in self._schema_totals.items()}}
+
+
+def build_token_accountant():
+    return TokenAccountant(
+        window=int(os.environ.get("TOKEN_STATS_WINDOW", 1000)),
+        log_calls=os.environ.get("TOKEN_LOG_CALLS", "1") == "1"
+    )
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+from pymongo import MongoClient
+from datetime import datetime
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from db_indexes import ensure_indexes, plan_stages
+
+# Checks that every hot query in app.py is served by an index, without a COLLSCAN or an
+# in-memory SORT stage.
+# Usage: python verify_indexes.py [--create] [--runs N]
+#   --create  create missing indexes first (same as app startup)
+#   --runs    timed executions per query for the latency column (default 20)
+
+load_dotenv()
+
+mongo_uri = os.environ.get("MONGO_URI")
+
+if not mongo_uri:
+    print("❌ MONGO_URI not found in .env file")
+    exit(1)
+
+runs = 20
+if "--runs" in sys.argv:
+    runs = int(sys.argv[sys.argv.index("--runs") + 1])
+
+client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+db = client.get_database("hireready")
+users = db.users
+analyses = db.resume_analyses
+
+if "--create" in sys.argv:
+    failed = ensure_indexes(db)
+    print("Indexes ensured." if not failed else f"⚠️ Could not create: {', '.join(failed)}")
+
+# Probe values don't need to exist; the planner picks the same plan either way.
+probe_user_id = ObjectId()
+probe_email = "probe@example.com"
+probe_username = "probe_user"
+probe_cursor = (datetime.utcnow(), ObjectId())
+
+HOT_QUERIES = [
+    ("signup duplicate check", users, lambda c: c.find({"$or": [{"email": probe_email}, {"username": probe_username}]}).limit(1)),
+    ("signin lookup", users, lambda c: c.find({"email": probe_email}).limit(1)),
+    ("token_required lookup", users, lambda c: c.find({"_id": probe_user_id}).limit(1)),
+    ("get_history first page", analyses, lambda c: c.find(
+        {"user_id": probe_user_id}, {"target_job_title": 1, "ats_score": 1, "created_at": 1}
+    ).sort([("created_at", -1), ("_id", -1)]).limit(21)),
+    # Later pages, with the (created_at, _id) cursor filter get_history adds.
+    ("get_history next page", analyses, lambda c: c.find(
+        {"user_id": probe_user_id, "$or": [
+            {"created_at": {"$lt": probe_cursor[0]}},
+            {"created_at": probe_cursor[0], "_id": {"$lt": probe_cursor[1]}}
+        ]}, {"target_job_title": 1, "ats_score": 1, "created_at": 1}
+    ).sort([("created_at", -1), ("_id", -1)]).limit(21)),
+    ("get_analysis / delete_analysis", analyses, lambda c: c.find({"_id": ObjectId(), "user_id": probe_user_id}).limit(1)),
+]
+
+print(f"{'query':<34} {'plan':<40} {'avg ms':>8}")
+failures = []
+for name, collection, build in HOT_QUERIES:
+    explain = build(collection).explain()
+    stages = plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {}))
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        list(build(collection))
+    avg_ms = (time.perf_counter() - start) * 1000 / runs
+
+    # A blocking SORT means the index can't provide the order and every match is sorted in memory.
+    ok = "COLLSCAN" not in stages and "SORT" not in stages
+    if not ok:
+        failures.append(name)
+    print(f"{'✅' if ok else '❌'} {name:<32} {' > '.join(reversed(stages)):<40} {avg_ms:>8.2f}")
+
+if failures:
+    print(f"\n❌ COLLSCAN or in-memory SORT in: {', '.join(failures)}. Run with --create or check db_indexes.py.")
+    exit(1)
+
+print("\n✅ All hot queries are served by an index.")
@@ -362,8 +362,11 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState('');
     const [isDeleting, setIsDeleting] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
+    const [loadingDraftId, setLoadingDraftId] = useState(null);
 
-    const fetchHistory = useCallback(async () => {
+    const fetchHistory = useCallback(async (cursor = null) => {
         if (user?.isGuest || !user?.token) {
             setError('Sign in or Sign up to view your history.');
             setHistory([]);
@@ -371,7 +374,11 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
             return;
         }
 
-        setIsLoading(true);
+        if (cursor) {
+            setIsLoadingMore(true);
+        } else {
+            setIsLoading(true);
+        }
         setError('');
 
         try {
@@ -381,7 +388,7 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
                     'Content-Type': 'application/json',
                     'Authorization': `Bearer ${user.token}`
                 },
-                body: JSON.stringify({}),
+                body: JSON.stringify(cursor ? { cursor } : {}),
             });
 
             if (!response.ok) {
@@ -390,15 +397,42 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
             }
 
             const data = await response.json();
-            setHistory(data.history || []);
+            setHistory(prev => cursor ? [...prev, ...(data.history || [])] : (data.history || []));
+            setNextCursor(data.next_cursor || null);
         } catch (err) {
             console.error('History fetch failed:', err);
             setError(`Could not retrieve history: ${err.message}. Check Flask logs.`);
         } finally {
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     }, [user]);
 
+    // The history list only carries id/title/score/date; fetch the full draft on demand.
+    const handleLoad = useCallback(async (draftId) => {
+        setLoadingDraftId(draftId);
+        setError('');
+
+        try {
+            const response = await fetch(`${API_BASE_URL}/get_analysis/${draftId}`, {
+                headers: { 'Authorization': `Bearer ${user.token}` },
+            });
+
+            const data = await response.json();
+
+            if (!response.ok) {
+                throw new Error(data.error || 'Failed to load draft.');
+            }
+
+            onLoadAnalysis(data);
+        } catch (err) {
+            console.error('Draft load failed:', err);
+            setError(`Load Failed: ${err.message}`);
+        } finally {
+            setLoadingDraftId(null);
+        }
+    }, [user, onLoadAnalysis]);
+
     const handleDelete = useCallback(async (draftId) => {
         if (!window.confirm("Are you sure you want to delete this draft? This action cannot be undone.")) {
             return;
@@ -495,7 +529,7 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
         <div className="space-y-4 max-w-4xl mx-auto">
             <h2 className="text-2xl font-bold text-gray-900 flex items-center mb-6">
                 <History className="w-6 h-6 mr-2 text-indigo-600" />
-                Analysis History ({history.length} drafts)
+                Analysis History ({history.length}{nextCursor ? '+' : ''} drafts)
             </h2>
             {/* Show deletion error at the top if present */}
             {error && <div className="p-3 text-red-600 bg-red-50 rounded-lg border border-red-200 text-sm mb-4">{error}</div>}
@@ -511,7 +545,6 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
                             </p>
                             <p className="text-xs text-gray-600 mt-1 italic">
                                 ATS Score: {draft.ats_score}%
-                                - JD Preview: {draft.job_description.substring(0, 50)}...
                             </p>
                         </div>
 
@@ -524,10 +557,11 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
                                 {draft.ats_score}%
                             </span>
                             <button
-                                onClick={() => onLoadAnalysis(draft)}
-                                className="px-3 py-2 text-sm font-medium text-indigo-600 bg-indigo-200 rounded-full hover:bg-indigo-300 transition duration-150"
+                                onClick={() => handleLoad(draft.id)}
+                                disabled={loadingDraftId === draft.id}
+                                className="px-3 py-2 text-sm font-medium text-indigo-600 bg-indigo-200 rounded-full hover:bg-indigo-300 transition duration-150 disabled:opacity-50"
                             >
-                                Load & View
+                                {loadingDraftId === draft.id ? 'Loading...' : 'Load & View'}
                             </button>
                             <button
                                 onClick={() => handleDelete(draft.id)}
@@ -545,6 +579,18 @@ const HistorySection = ({ onLoadAnalysis, historyVersion, setHistoryVersion }) =
                     </div>
                 ))}
             </div>
+
+            {nextCursor && (
+                <div className="text-center pt-2">
+                    <button
+                        onClick={() => fetchHistory(nextCursor)}
+                        disabled={isLoadingMore}
+                        className="px-6 py-2 text-sm font-medium text-indigo-600 bg-indigo-100 rounded-full hover:bg-indigo-200 transition duration-150 disabled:opacity-50"
+                    >
+                        {isLoadingMore ? 'Loading...' : 'Load More'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 }